@@ -1,26 +1,22 @@
+import numpy as np
 import pandas as pd
-import itertools
+
+from truth_table_export import csv_header, export_truth_table, gate_function, iter_truth_table
 
 # Define the number of inputs for the OR gate
 num_inputs = 5
 
-# Generate all possible combinations of 0 and 1 for 5 inputs
-input_combinations = list(itertools.product([0, 1], repeat=num_inputs))
-
-# Calculate the output for each combination using the OR operation
-outputs = [int(any(combination)) for combination in input_combinations]
-
-# Create a DataFrame to display the truth table
-columns = [f"Input {i+1}" for i in range(num_inputs)] + ["Output"]
-data = [list(combination) + [output] for combination, output in zip(input_combinations, outputs)]
-
-# Create the DataFrame
-truth_table = pd.DataFrame(data, columns=columns)
+# OR of all inputs, evaluated a block of rows at a time
+or_gate = gate_function("OR")
 
-# Display the DataFrame
-print(truth_table)
+# Display the truth table (small tables only; wide ones are just written to the file)
+if num_inputs <= 10:
+    inputs, outputs = next(iter_truth_table(num_inputs, or_gate))
+    columns = csv_header(num_inputs).strip().split(",")
+    truth_table = pd.DataFrame(np.column_stack((inputs, outputs)), columns=columns)
+    print(truth_table)
 
-# Save the truth table to a CSV file
-truth_table.to_csv('5_input_OR_gate_truth_table.csv', index=False)
+# Save the truth table to a CSV file (streamed in blocks, so memory stays bounded)
+export_truth_table('5_input_OR_gate_truth_table.csv', num_inputs, or_gate)
 
-print("Truth table saved as '5_input_OR_gate_truth_table.csv'.")
\ No newline at end of file
+print("Truth table saved as '5_input_OR_gate_truth_table.csv'.")
@@ -1,6 +1,7 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
+from waveform_viewer import WaveformViewer
+
 # Time period for the signals
 time = np.linspace(0, 10, 1000)
 
@@ -11,29 +12,16 @@ B = np.where((np.sin(2 * np.pi * 1.5 * time) > 0), 1, 0)  # Signal B (higher fre
 # AND gate output (Z)
 Z = A & B  # Logical AND operation
 
-# Plotting the signals
-plt.figure(figsize=(10, 6))
+# Plotting the signals (only the transitions are drawn, re-decimated on zoom)
+viewer = WaveformViewer(3, figsize=(10, 6))
 
 # Plot A
-plt.subplot(3, 1, 1)
-plt.plot(time, A, label='A', color='blue')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal A')
-plt.grid(True)
+viewer.add_signal(0, A, x=time, title='Signal A', label='A', color='blue')
 
 # Plot B
-plt.subplot(3, 1, 2)
-plt.plot(time, B, label='B', color='orange')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal B')
-plt.grid(True)
+viewer.add_signal(1, B, x=time, title='Signal B', label='B', color='orange')
 
 # Plot Z (output of AND gate)
-plt.subplot(3, 1, 3)
-plt.plot(time, Z, label='Z (A AND B)', color='green')
-plt.ylim(-0.5, 1.5)
-plt.title('Output Z (A AND B)')
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+viewer.add_signal(2, Z, x=time, title='Output Z (A AND B)', label='Z (A AND B)', color='green')
+
+viewer.show()
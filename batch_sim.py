@@ -0,0 +1,70 @@
+import argparse
+import sys
+
+from circuit_compiler import compile_circuit
+from netlist_format import load_netlist
+
+# Headless batch runner: loads a circuit and evaluates a file of input vectors.
+# Only the netlist core is imported here (never pygame), so it starts fast on CI machines.
+# Loop-free circuits are compiled to a single Python function, so each vector is one call;
+# circuits with feedback loops (latches) or flip-flops keep their state between vectors and
+# are simulated.
+
+
+# Function to read input vectors, one per line ("0101", "0 1 0 1" or "0,1,0,1"; '#' starts a comment)
+def read_vectors(lines, num_inputs):
+    for line_number, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0]
+        bits = [char for char in line if char in "01"]
+        if not bits:
+            continue
+        if len(bits) != num_inputs:
+            raise ValueError(
+                f"Line {line_number}: expected {num_inputs} input values, got {len(bits)}"
+            )
+        yield [char == "1" for char in bits]
+
+
+# Function to format one result line: the inputs, then the outputs
+def format_result(vector, outputs):
+    return (
+        "".join("1" if bit else "0" for bit in vector)
+        + " "
+        + "".join("1" if bit else "0" for bit in outputs)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Evaluate input vectors against a saved circuit"
+    )
+    parser.add_argument("circuit", help="circuit netlist file (JSON or binary)")
+    parser.add_argument("vectors", help="input vector file ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    circuit = load_netlist(args.circuit)
+    num_inputs = len(circuit.inputs)
+
+    vector_file = sys.stdin if args.vectors == "-" else open(args.vectors)
+    output_file = open(args.output, "w") if args.output else sys.stdout
+    if circuit.engine.loops() or circuit.sequential:
+        evaluate = circuit.evaluate
+    else:
+        compiled = compile_circuit(circuit)
+
+        def evaluate(vector):
+            return compiled(*vector)
+
+    try:
+        for vector in read_vectors(vector_file, num_inputs):
+            output_file.write(format_result(vector, evaluate(vector)) + "\n")
+    finally:
+        if vector_file is not sys.stdin:
+            vector_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == "__main__":
+    main()
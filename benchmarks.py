@@ -0,0 +1,634 @@
+import argparse
+import datetime
+import functools
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bitparallel_truth_table import truth_table
+from flip_flop import simulate_toggle_register
+from netlist_format import build_circuit, save_netlist
+from stimulus import generate_clock_signal
+from timing_diagram_2 import simulate_shift_register
+from timing_sim import TimingSimulator, counter_stimulus
+
+# Performance benchmarks for the hot paths, run headless.
+# Each benchmark is timed several times and reported as one result row (best and mean
+# seconds plus benchmark-specific counters); the whole run is written as JSON together with
+# the commit and environment, so two runs can be compared with --compare.
+#
+#   python benchmarks.py -o results.json
+#   python benchmarks.py --quick --only netlist,draw
+#   python benchmarks.py -o new.json --compare old.json
+
+GROUPS = ("netlist", "draw", "waveform", "truth_table", "subcircuit", "timing")
+DEFAULT_REPEATS = 5
+REGRESSION_THRESHOLD = 1.10  # --compare flags benchmarks that got 10% slower or more
+
+GATE_CHOICES = ("AND", "OR", "NAND", "NOR", "XOR", "XNOR", "NOT")
+GRID_SPACING = 120  # Layout of generated netlists, so they can also be drawn
+
+
+# Function to lay records out on a grid: (column, row) -> (x, y)
+def _position(column, row):
+    return 60 + column * GRID_SPACING, 80 + row * GRID_SPACING // 2
+
+
+# Function to generate a random loop-free netlist, each gate fed from the last `window` signals
+def random_netlist(num_inputs, num_gates, seed=0, window=64):
+    rng = random.Random(seed)
+    records = [(n, "INPUT", *_position(0, n), [], None) for n in range(num_inputs)]
+    signals = list(range(num_inputs))
+    for n in range(num_inputs, num_inputs + num_gates):
+        gate_type = rng.choice(GATE_CHOICES)
+        fan_in = 1 if gate_type == "NOT" else 2
+        inputs = rng.sample(signals[-window:], fan_in)
+        records.append(
+            (
+                n,
+                gate_type,
+                *_position(1 + (n - num_inputs) // 32, (n - num_inputs) % 32),
+                inputs,
+                None,
+            )
+        )
+        signals.append(n)
+    next_id = num_inputs + num_gates
+    for row, source in enumerate(signals[-8:]):
+        records.append(
+            (
+                next_id + row,
+                "OUTPUT",
+                *_position(2 + num_gates // 32, row),
+                [source],
+                None,
+            )
+        )
+    return records
+
+
+# Function to generate an n-bit ripple-carry adder: inputs A0..An-1, B0..Bn-1, outputs S0..Sn
+def ripple_carry_adder(bits):
+    records = []
+    ids = itertools.count()
+
+    def add(kind, column, row, inputs):
+        component_id = next(ids)
+        records.append((component_id, kind, *_position(column, row), inputs, None))
+        return component_id
+
+    a = [add("INPUT", 0, 2 * bit, []) for bit in range(bits)]
+    b = [add("INPUT", 0, 2 * bit + 1, []) for bit in range(bits)]
+    carry = None
+    sums = []
+    for bit in range(bits):
+        half = add("XOR", 1, 2 * bit, [a[bit], b[bit]])
+        generate = add("AND", 1, 2 * bit + 1, [a[bit], b[bit]])
+        if carry is None:
+            sums.append(half)
+            carry = generate
+            continue
+        sums.append(add("XOR", 2, 2 * bit, [half, carry]))
+        propagate = add("AND", 2, 2 * bit + 1, [half, carry])
+        carry = add("OR", 3, 2 * bit + 1, [generate, propagate])
+    for bit, source in enumerate(sums + [carry]):
+        add("OUTPUT", 4, 2 * bit, [source])
+    return records
+
+
+# Function to generate a one-bit full adder: inputs A, B, Cin, outputs S, Cout
+def full_adder():
+    return [
+        (0, "INPUT", *_position(0, 0), [], None),
+        (1, "INPUT", *_position(0, 1), [], None),
+        (2, "INPUT", *_position(0, 2), [], None),
+        (3, "XOR", *_position(1, 0), [0, 1], None),
+        (4, "AND", *_position(1, 1), [0, 1], None),
+        (5, "XOR", *_position(2, 0), [3, 2], None),
+        (6, "AND", *_position(2, 1), [3, 2], None),
+        (7, "OR", *_position(3, 1), [4, 6], None),
+        (8, "OUTPUT", *_position(4, 0), [5], None),
+        (9, "OUTPUT", *_position(4, 1), [7], None),
+    ]
+
+
+# Function to generate the same n-bit adder as ripple_carry_adder out of full adder blocks
+# (the netlist saved at `block_path`); the first block's carry-in is left unconnected (low)
+def block_adder(bits, block_path):
+    records = []
+    ids = itertools.count()
+
+    def add(kind, column, row, inputs, fan_in=None):
+        component_id = next(ids)
+        records.append((component_id, kind, *_position(column, row), inputs, fan_in))
+        return component_id
+
+    a = [add("INPUT", 0, 2 * bit, []) for bit in range(bits)]
+    b = [add("INPUT", 0, 2 * bit + 1, []) for bit in range(bits)]
+    carry = None
+    sums = []
+    for bit in range(bits):
+        block = add(
+            "SUBCIRCUIT",
+            1,
+            2 * bit,
+            [a[bit], b[bit]] + ([carry] if carry is not None else []),
+            block_path,
+        )
+        sums.append(add("PIN", 2, 2 * bit, [block]))
+        carry = add("PIN", 2, 2 * bit + 1, [block], 1)
+    for bit, source in enumerate(sums + [carry]):
+        add("OUTPUT", 3, 2 * bit, [source])
+    return records
+
+
+# Function to generate a balanced XOR parity tree over `num_inputs` inputs
+def parity_tree(num_inputs):
+    records = [(n, "INPUT", *_position(0, n), [], None) for n in range(num_inputs)]
+    level = list(range(num_inputs))
+    next_id = num_inputs
+    column = 1
+    while len(level) > 1:
+        paired = []
+        for row in range(0, len(level) - 1, 2):
+            records.append(
+                (
+                    next_id,
+                    "XOR",
+                    *_position(column, row),
+                    [level[row], level[row + 1]],
+                    None,
+                )
+            )
+            paired.append(next_id)
+            next_id += 1
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+        column += 1
+    records.append((next_id, "OUTPUT", *_position(column, 0), level, None))
+    return records
+
+
+# Function to generate a rows x columns mesh in which every node combines its left and upper
+# neighbours, so each input reaches the far corner along many reconvergent paths
+def reconvergent_mesh(rows, columns):
+    records = [(row, "INPUT", *_position(0, row), [], None) for row in range(rows)]
+    grid = {}
+    next_id = rows
+    for column in range(columns):
+        for row in range(rows):
+            left = grid.get((row, column - 1), row)
+            up = grid.get((row - 1, column))
+            gate_type = ("NAND", "XOR", "NOR")[(row + column) % 3]
+            inputs = [left, up] if up is not None else [left]
+            records.append(
+                (
+                    next_id,
+                    gate_type if up is not None else "NOT",
+                    *_position(column + 1, row),
+                    inputs,
+                    None,
+                )
+            )
+            grid[(row, column)] = next_id
+            next_id += 1
+    for row in range(rows):
+        records.append(
+            (
+                next_id + row,
+                "OUTPUT",
+                *_position(columns + 1, row),
+                [grid[(row, columns - 1)]],
+                None,
+            )
+        )
+    return records
+
+
+# Function to time `function` `repeats` times (after one warm-up call) and summarize it
+def measure(function, repeats):
+    function()
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return {"best": min(times), "mean": sum(times) / len(times), "repeats": repeats}
+
+
+def _result(group, name, params, timing, **counters):
+    return {"group": group, "name": name, "params": params, **timing, **counters}
+
+
+# Netlists driven through the event-driven engine: every input is toggled in turn (via
+# Input.toggle -> propagate), and every gate is re-driven with Gate.update
+def bench_netlists(quick, repeats):
+    scale = 1 if quick else 4
+    netlists = {
+        "random": (random_netlist, {"num_inputs": 32, "num_gates": 500 * scale}),
+        "adder": (ripple_carry_adder, {"bits": 16 * scale}),
+        "parity_tree": (parity_tree, {"num_inputs": 64 * scale}),
+        "mesh": (reconvergent_mesh, {"rows": 8 * scale, "columns": 8 * scale}),
+    }
+    results = []
+    for name, (generate, params) in netlists.items():
+        circuit = build_circuit(generate(**params))
+        inputs = circuit.inputs
+        gates = [
+            component
+            for component in circuit.components
+            if hasattr(component, "gate_type")
+        ]
+        engine = circuit.engine
+
+        def toggle_all(inputs=inputs):
+            for component in inputs:
+                component.toggle()
+
+        def update_all(gates=gates):
+            for component in gates:
+                component.update()
+
+        for label, function, count in (
+            ("toggle", toggle_all, len(inputs)),
+            ("update", update_all, len(gates)),
+        ):
+            before = engine.evaluations
+            timing = measure(function, repeats)
+            evaluations = (engine.evaluations - before) / (repeats + 1)
+            results.append(
+                _result(
+                    "netlist",
+                    f"{name}_{label}",
+                    dict(params, components=len(circuit.components)),
+                    timing,
+                    per_call_us=timing["best"] / count * 1e6,
+                    evaluations_per_call=evaluations / count,
+                )
+            )
+    return results
+
+
+# Designer frame time: full redraws (at normal zoom and zoomed far out, where components are
+# drawn as boxes) and small damaged regions of a laid-out netlist, drawn into an offscreen
+# surface
+def bench_draw(quick, repeats):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault(
+        "PYGAME_HIDE_SUPPORT_PROMPT", "1"
+    )  # Keep stdout clean for the JSON
+    try:
+        import pygame
+    except ImportError:
+        return [
+            {"group": "draw", "name": "skipped", "reason": "pygame is not installed"}
+        ]
+
+    import logic_gate_designer as designer
+    from camera import Camera
+    from spatial_index import SpatialIndex
+    from wire_layer import WireLayer
+
+    pygame.init()
+    screen = pygame.Surface((designer.WIDTH, designer.HEIGHT))
+    results = []
+    sizes = (50, 200) if quick else (50, 200, 1000, 10_000)
+    for num_gates in sizes:
+        board = build_circuit(
+            random_netlist(8, num_gates, seed=1), designer.GUI_COMPONENT_CLASSES
+        )
+        index = SpatialIndex()
+        order = itertools.count()
+        for component in board.components:
+            designer.index_component(index, component, next(order))
+        wires = WireLayer(index)
+        for component in board.components:
+            wires.refresh(component)
+
+        full = [screen.get_rect()]
+        partial = [pygame.Rect(100, 100, 120, 80)]
+        cases = (
+            ("full_frame", Camera(), full),
+            ("zoomed_out", Camera(zoom=0.125), full),
+            ("damaged_region", Camera(), partial),
+        )
+        for label, camera, regions in cases:
+            timing = measure(
+                functools.partial(
+                    designer.draw_scene, screen, index, wires, camera, regions, None
+                ),
+                repeats,
+            )
+            results.append(
+                _result(
+                    "draw",
+                    label,
+                    {"components": len(board.components)},
+                    timing,
+                    fps=1 / timing["best"] if timing["best"] else None,
+                )
+            )
+
+        # Panning renders the cached wire layer afresh every frame
+        camera = Camera()
+
+        def pan_frame(camera=camera, index=index, wires=wires, full=full):
+            camera.pan(1, 0)
+            designer.draw_scene(screen, index, wires, camera, full, None)
+
+        timing = measure(pan_frame, repeats)
+        results.append(
+            _result(
+                "draw",
+                "panning",
+                {"components": len(board.components)},
+                timing,
+                fps=1 / timing["best"] if timing["best"] else None,
+            )
+        )
+    return results
+
+
+# Scaling of the waveform generators and register simulators with the trace length
+def bench_waveforms(quick, repeats):
+    steps_per_period = 100
+    periods_list = (100, 1_000, 10_000) if quick else (100, 1_000, 10_000, 100_000)
+    results = []
+    for periods in periods_list:
+        params = {
+            "periods": periods,
+            "steps_per_period": steps_per_period,
+            "samples": periods * steps_per_period,
+        }
+        timing = measure(
+            functools.partial(generate_clock_signal, periods, steps_per_period), repeats
+        )
+        results.append(
+            _result(
+                "waveform",
+                "generate_clock_signal",
+                params,
+                timing,
+                samples_per_second=params["samples"] / timing["best"],
+            )
+        )
+
+        clock = generate_clock_signal(periods, steps_per_period)
+        timing = measure(
+            functools.partial(
+                simulate_toggle_register, clock, periods, steps_per_period
+            ),
+            repeats,
+        )
+        results.append(
+            _result(
+                "waveform",
+                "simulate_toggle_register",
+                params,
+                timing,
+                samples_per_second=params["samples"] / timing["best"],
+            )
+        )
+        for register_type in ("SISO", "PIPO"):
+            timing = measure(
+                functools.partial(
+                    simulate_shift_register,
+                    clock,
+                    periods,
+                    steps_per_period,
+                    register_type,
+                    False,
+                ),
+                repeats,
+            )
+            results.append(
+                _result(
+                    "waveform",
+                    "simulate_shift_register",
+                    dict(params, register_type=register_type),
+                    timing,
+                    samples_per_second=params["samples"] / timing["best"],
+                )
+            )
+    return results
+
+
+# Bit-parallel truth tables of parity trees and random netlists, across input widths
+def bench_truth_tables(quick, repeats):
+    widths = (4, 8, 12, 16) if quick else (4, 8, 12, 16, 20)
+    results = []
+    for width in widths:
+        for name, records in (
+            ("parity_tree", parity_tree(width)),
+            ("random", random_netlist(width, 200, seed=width)),
+        ):
+            circuit = build_circuit(records)
+            timing = measure(
+                functools.partial(truth_table, circuit.inputs, circuit.outputs), repeats
+            )
+            results.append(
+                _result(
+                    "truth_table",
+                    name,
+                    {"inputs": width, "components": len(circuit.components)},
+                    timing,
+                    rows_per_second=(1 << width) / timing["best"],
+                )
+            )
+    return results
+
+
+# Hierarchical against flat: an adder built from full adder blocks (one table lookup per
+# block) against the same adder as primitive gates, both driven through the engine by
+# toggling every input in turn
+def bench_subcircuits(quick, repeats):
+    bit_counts = (16, 64) if quick else (16, 64, 256)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        block_path = os.path.join(directory, "full_adder.json")
+        save_netlist(build_circuit(full_adder()), block_path)
+        for bits in bit_counts:
+            for name, records in (
+                ("flat_adder", ripple_carry_adder(bits)),
+                ("block_adder", block_adder(bits, block_path)),
+            ):
+                circuit = build_circuit(records)
+                inputs = circuit.inputs
+                engine = circuit.engine
+
+                def toggle_all(inputs=inputs):
+                    for component in inputs:
+                        component.toggle()
+
+                before = engine.evaluations
+                timing = measure(toggle_all, repeats)
+                evaluations = (engine.evaluations - before) / (repeats + 1)
+                results.append(
+                    _result(
+                        "subcircuit",
+                        f"{name}_toggle",
+                        {"bits": bits, "components": len(circuit.components)},
+                        timing,
+                        per_call_us=timing["best"] / len(inputs) * 1e6,
+                        evaluations_per_call=evaluations / len(inputs),
+                    )
+                )
+    return results
+
+
+# Delay-aware timing simulation driven by a counting stimulus, in events per second
+def bench_timing(quick, repeats):
+    scale = 1 if quick else 4
+    netlists = {
+        "random": random_netlist(16, 200 * scale, seed=4),
+        "adder": ripple_carry_adder(8 * scale),
+        "mesh": reconvergent_mesh(8 * scale, 8 * scale),
+    }
+    period = 20
+    results = []
+    for name, records in netlists.items():
+        circuit = build_circuit(records)
+        num_inputs = len(circuit.inputs)
+        until = period * min(1 << num_inputs, 1024)
+        stimulus = counter_stimulus(num_inputs, period, until)
+        simulator = TimingSimulator(circuit)
+        simulator.run(stimulus, until)
+        events = simulator.events
+        timing = measure(functools.partial(simulator.run, stimulus, until), repeats)
+        results.append(
+            _result(
+                "timing",
+                name,
+                {"components": len(circuit.components), "until": until},
+                timing,
+                events=events,
+                events_per_second=events / timing["best"],
+            )
+        )
+    return results
+
+
+BENCHMARKS = {
+    "netlist": bench_netlists,
+    "draw": bench_draw,
+    "waveform": bench_waveforms,
+    "truth_table": bench_truth_tables,
+    "subcircuit": bench_subcircuits,
+    "timing": bench_timing,
+}
+
+
+# Function to describe where the results came from
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+# Function to run the selected benchmark groups
+def run_benchmarks(groups=GROUPS, quick=False, repeats=DEFAULT_REPEATS):
+    results = []
+    for group in groups:
+        started = time.perf_counter()
+        results.extend(BENCHMARKS[group](quick, repeats))
+        print(f"{group}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {"environment": environment(), "quick": quick, "results": results}
+
+
+# Function to key a result by its benchmark and parameters, for matching across runs
+def _result_key(result):
+    return (
+        result["group"],
+        result["name"],
+        json.dumps(result.get("params", {}), sort_keys=True),
+    )
+
+
+# Function to compare two runs: (key, old best, new best, new / old) for every shared benchmark
+def compare_results(old, new):
+    old_best = {
+        _result_key(result): result["best"]
+        for result in old["results"]
+        if "best" in result
+    }
+    rows = []
+    for result in new["results"]:
+        key = _result_key(result)
+        if "best" in result and key in old_best:
+            rows.append(
+                (key, old_best[key], result["best"], result["best"] / old_best[key])
+            )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless performance benchmarks")
+    parser.add_argument(
+        "-o", "--output", help="write the results as JSON (default: stdout)"
+    )
+    parser.add_argument(
+        "--only", help=f"comma-separated groups to run ({', '.join(GROUPS)})"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="smaller sizes, for a fast check"
+    )
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(",") if args.only else GROUPS
+    unknown = [group for group in groups if group not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+
+    report = run_benchmarks(groups, args.quick, args.repeats)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = 0
+        for (group, name, params), old_best, new_best, ratio in compare_results(
+            old, report
+        ):
+            flag = "  REGRESSION" if ratio >= REGRESSION_THRESHOLD else ""
+            regressions += bool(flag)
+            print(
+                f"{group:12} {name:28} {params:48} {old_best * 1e3:10.3f}ms -> {new_best * 1e3:10.3f}ms  x{ratio:.2f}{flag}",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
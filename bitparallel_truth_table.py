@@ -0,0 +1,145 @@
+import numpy as np
+
+from simulation_engine import SimulationEngine
+
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Within one 64-bit word, the pattern for each of the six lowest row-counter bits
+_WORD_PATTERNS = [
+    np.uint64(sum(1 << j for j in range(64) if (j >> bit) & 1)) for bit in range(6)
+]
+
+
+# Function to build the packed bit-plane of one input over all 2^num_inputs rows.
+# Row r has bit (num_inputs - 1 - position) of r as the value of the input, so the first
+# input is the most significant, matching itertools.product([0, 1], repeat=num_inputs).
+def input_plane(position, num_inputs):
+    words = max(1, (1 << num_inputs) // 64)
+    bit = num_inputs - 1 - position
+    if bit < 6:
+        plane = np.full(words, _WORD_PATTERNS[bit], dtype=np.uint64)
+    else:
+        block = 1 << (bit - 6)
+        plane = np.resize(
+            np.concatenate(
+                [
+                    np.zeros(block, dtype=np.uint64),
+                    np.full(block, ALL_ONES, dtype=np.uint64),
+                ]
+            ),
+            words,
+        )
+    return plane & row_mask(num_inputs)
+
+
+# Function to get the mask of valid rows (only the last word is partial, when num_inputs < 6)
+def row_mask(num_inputs):
+    rows = 1 << num_inputs
+    if rows >= 64:
+        return ALL_ONES
+    return np.uint64((1 << rows) - 1)
+
+
+# Function to put the components feeding the outputs into evaluation order
+def evaluation_order(inputs, outputs):
+    engine = SimulationEngine.for_components(list(inputs) + list(outputs))
+    if engine.loops():
+        raise ValueError("Cannot build a truth table for a circuit with feedback loops")
+    if any(getattr(component, "clocked", False) for component in engine.components):
+        raise ValueError(
+            "Cannot build a truth table for a circuit with clocked components"
+        )
+    return engine.topological_order()
+
+
+# Function to apply one gate to the packed planes of its inputs, mirroring Gate.evaluate
+def _gate_plane(component, planes, words, mask):
+    gate_type = component.gate_type
+    sources = [planes[id(source)] for source in component.inputs]
+    zeros = np.zeros(words, dtype=np.uint64)
+    count = len(sources)
+    complete = count == component.max_inputs
+
+    if gate_type in ("AND", "NAND"):
+        value = np.bitwise_and.reduce(sources) if complete and count else zeros
+    elif gate_type in ("OR", "NOR"):
+        value = np.bitwise_or.reduce(sources) if count else zeros
+    elif gate_type in ("XOR", "XNOR"):
+        if not complete or not count:
+            return zeros
+        value = np.bitwise_xor.reduce(sources)
+    elif gate_type in ("NOT", "BUFFER"):
+        if count != 1:
+            return zeros
+        value = sources[0]
+    else:
+        raise ValueError(f"Unknown gate type: {gate_type}")
+
+    if gate_type in ("NAND", "NOR", "XNOR", "NOT"):
+        value = ~value & mask
+    return value
+
+
+# Function to evaluate every signal of the circuit over all 2^N input combinations at once.
+# Returns a dict mapping id(component) to its packed uint64 bit-plane.
+def evaluate_planes(inputs, outputs):
+    num_inputs = len(inputs)
+    words = max(1, (1 << num_inputs) // 64)
+    mask = row_mask(num_inputs)
+
+    planes = {}
+    for position, component in enumerate(inputs):
+        planes[id(component)] = input_plane(position, num_inputs)
+
+    for component in evaluation_order(inputs, outputs):
+        if id(component) in planes:
+            continue
+        if hasattr(component, "gate_type"):
+            planes[id(component)] = _gate_plane(component, planes, words, mask)
+        elif hasattr(component, "definition"):
+            # Subcircuit blocks run their compiled function over the planes of their inputs
+            # (unconnected pins read low); the block's "plane" is the tuple of its outputs
+            zeros = np.zeros(words, dtype=np.uint64)
+            sources = [planes[id(source)] for source in component.inputs]
+            sources += [zeros] * (component.max_inputs - len(sources))
+            planes[id(component)] = tuple(
+                zeros | value
+                for value in component.definition.function(*sources, mask=mask)
+            )
+        elif hasattr(component, "output_index") and component.inputs:
+            planes[id(component)] = planes[id(component.inputs[0])][
+                component.output_index
+            ]
+        elif component.inputs:
+            # Outputs (and anything else that ORs its inputs together)
+            planes[id(component)] = np.bitwise_or.reduce(
+                [planes[id(source)] for source in component.inputs]
+            )
+        else:
+            # Unconnected sources keep their current state for every row
+            fill = mask if component.state else np.uint64(0)
+            planes[id(component)] = np.full(words, fill, dtype=np.uint64)
+
+    return planes
+
+
+# Function to unpack a bit-plane into one 0/1 value per row
+def unpack_plane(plane, num_rows):
+    bits = np.unpackbits(
+        plane.astype("<u8", copy=False).view(np.uint8), bitorder="little"
+    )
+    return bits[:num_rows]
+
+
+# Function to build the full truth table of a circuit: one row per input combination,
+# with the input columns followed by the output columns
+def truth_table(inputs, outputs):
+    num_rows = 1 << len(inputs)
+    planes = evaluate_planes(inputs, outputs)
+    columns = [
+        unpack_plane(planes[id(component)], num_rows)
+        for component in list(inputs) + list(outputs)
+    ]
+    return (
+        np.column_stack(columns) if columns else np.zeros((num_rows, 0), dtype=np.uint8)
+    )
@@ -0,0 +1,67 @@
+import math
+
+import pygame
+
+# Camera over the designer's world-coordinate canvas.
+# Components, wires and the spatial index all live in world coordinates; the camera maps them
+# to the screen at draw time as screen = (world - position) * zoom. Zoom moves through a fixed
+# set of levels so that scaled sprites can be cached per level. Below DETAIL_ZOOM components
+# are drawn as plain boxes, without labels or truth tables.
+
+ZOOM_LEVELS = (0.0625, 0.125, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0)
+DETAIL_ZOOM = 0.5
+
+
+class Camera:
+    def __init__(self, x=0, y=0, zoom=1.0):
+        self.x = x  # World point shown at the screen's top-left corner
+        self.y = y
+        self.zoom = zoom
+
+    # Function to tell whether components should be drawn in full or as boxes
+    @property
+    def detailed(self):
+        return self.zoom >= DETAIL_ZOOM
+
+    def to_screen(self, pos):
+        return (
+            round((pos[0] - self.x) * self.zoom),
+            round((pos[1] - self.y) * self.zoom),
+        )
+
+    def to_world(self, pos):
+        return (round(pos[0] / self.zoom + self.x), round(pos[1] / self.zoom + self.y))
+
+    def to_screen_rect(self, rect):
+        left, top = self.to_screen((rect.x, rect.y))
+        right, bottom = self.to_screen((rect.x + rect.width, rect.y + rect.height))
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    # Function to get the world area a screen rect shows, rounded outwards
+    def to_world_rect(self, rect):
+        left = math.floor(rect.x / self.zoom + self.x)
+        top = math.floor(rect.y / self.zoom + self.y)
+        right = math.ceil((rect.x + rect.width) / self.zoom + self.x)
+        bottom = math.ceil((rect.y + rect.height) / self.zoom + self.y)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    # Function to scroll the view by a number of screen pixels
+    def pan(self, dx, dy):
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+
+    # Function to step the zoom level up (positive steps) or down, keeping the world point
+    # under the screen position `pos` where it is. Returns whether the zoom changed.
+    def zoom_at(self, pos, steps):
+        level = min(
+            range(len(ZOOM_LEVELS)), key=lambda n: abs(ZOOM_LEVELS[n] - self.zoom)
+        )
+        zoom = ZOOM_LEVELS[max(0, min(level + steps, len(ZOOM_LEVELS) - 1))]
+        if zoom == self.zoom:
+            return False
+        world_x = pos[0] / self.zoom + self.x
+        world_y = pos[1] / self.zoom + self.y
+        self.zoom = zoom
+        self.x = world_x - pos[0] / zoom
+        self.y = world_y - pos[1] / zoom
+        return True
@@ -0,0 +1,479 @@
+from simulation_engine import SimulationEngine
+
+# Netlist and simulation core for the logic gate designer.
+# Nothing in here imports pygame, so circuits can be built, loaded and simulated headless
+# (batch jobs, CI); logic_gate_designer.py subclasses these classes to draw them.
+
+GATE_TYPES = ("AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR", "BUFFER")
+SINGLE_INPUT_GATES = ("NOT", "BUFFER")
+MAX_FAN_IN = 32
+GATE_WIDTH = 80
+PIN_SPACING = 15  # Gates grow taller once their input pins would be closer than this
+
+# Clocked parts: each has its data pins followed by a clock pin, and only changes state on a
+# rising edge of the clock pin
+SEQUENTIAL_TYPES = ("DFF", "TFF", "JKFF", "REGISTER")
+SEQUENTIAL_PINS = {
+    "DFF": ("D", ">"),
+    "TFF": ("T", ">"),
+    "JKFF": ("J", "K", ">"),
+    "REGISTER": ("D", ">"),
+}
+DEFAULT_REGISTER_WIDTH = 4
+MAX_REGISTER_WIDTH = 32
+
+# Subcircuit blocks: a saved netlist used as one component, with a small pin component per
+# output hanging off its right edge
+PIN_SIZE = 12
+MAX_BLOCK_OUTPUTS = 256  # Pin numbers are stored in a byte
+
+
+# Function to get the number of input pins a gate type has unless told otherwise
+def default_fan_in(gate_type):
+    return 1 if gate_type in SINGLE_INPUT_GATES else 2
+
+
+# Function to get the body height of a gate with the given number of input pins
+def gate_height(fan_in):
+    return max(60, PIN_SPACING * fan_in)
+
+
+# Minimal stand-in for pygame.Rect, enough for positions, dragging and hit-testing
+class Rect:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def collidepoint(self, pos):
+        return (
+            self.x <= pos[0] < self.x + self.width
+            and self.y <= pos[1] < self.y + self.height
+        )
+
+    def copy(self):
+        return Rect(self.x, self.y, self.width, self.height)
+
+
+# Component classes
+class Component:
+    # The GUI swaps this for pygame.Rect
+    make_rect = Rect
+
+    def __init__(self, x, y, width, height, color=None):
+        self.rect = self.make_rect(x, y, width, height)
+        self.color = color
+        self.inputs = []
+        self.outputs = []
+        self.state = False
+        self.dragging = False
+        self.offset_x = 0
+        self.offset_y = 0
+        self.engine = None
+        self.id = None  # Stable netlist id, assigned by the Circuit it is added to
+        self.high_inputs = 0  # How many input connections are currently high
+
+    # Function to compute the state this component should have, without propagating it
+    def evaluate(self):
+        return self.state
+
+    # Function to change state and tell every fan-out component, so each can keep its count
+    # of high inputs up to date in O(1)
+    def set_state(self, state):
+        state = bool(state)
+        if state == self.state:
+            return
+        self.state = state
+        delta = 1 if state else -1
+        for output in self.outputs:
+            output.high_inputs += delta
+
+    # Function to wire this component's output into one more input of target
+    def connect_to(self, target):
+        self.outputs.append(target)
+        target.inputs.append(self)
+        if self.state:
+            target.high_inputs += 1
+
+    def update(self):
+        self.set_state(self.evaluate())
+        self.propagate()
+
+    # Function to settle everything downstream of this component, each gate evaluated once
+    def propagate(self):
+        engine = self.engine or SimulationEngine.for_components([self])
+        return engine.propagate(self)
+
+    def start_drag(self, mouse_pos):
+        self.dragging = True
+        self.offset_x = self.rect.x - mouse_pos[0]
+        self.offset_y = self.rect.y - mouse_pos[1]
+
+    def end_drag(self):
+        self.dragging = False
+
+    def drag(self, mouse_pos):
+        if self.dragging:
+            self.rect.x = mouse_pos[0] + self.offset_x
+            self.rect.y = mouse_pos[1] + self.offset_y
+
+    def remove_connections(self):
+        for input_component in self.inputs:
+            input_component.outputs.remove(self)
+        for output_component in self.outputs:
+            output_component.inputs.remove(self)
+            if self.state:
+                output_component.high_inputs -= 1
+
+
+class Input(Component):
+    def __init__(self, x, y):
+        super().__init__(x, y, 50, 50)
+
+    def toggle(self):
+        self.set_state(not self.state)
+        return self.propagate()
+
+
+# Gates with any number of inputs. AND, NAND, XOR and XNOR only drive a result once every
+# input pin is connected; OR and NOR once any is. Evaluation only looks at the count of
+# high inputs (AND/OR families) or its parity (XOR family), so it is O(1) at any fan-in.
+class Gate(Component):
+    def __init__(self, x, y, gate_type, fan_in=None):
+        fan_in = default_fan_in(gate_type) if fan_in is None else max(fan_in, 1)
+        super().__init__(x, y, GATE_WIDTH, gate_height(fan_in))
+        self.gate_type = gate_type
+        self.max_inputs = fan_in
+
+    # Function to change the number of input pins (never below the pins already connected).
+    # Returns the set of components whose state changed.
+    def set_fan_in(self, fan_in):
+        if self.gate_type in SINGLE_INPUT_GATES:
+            return set()
+        fan_in = max(len(self.inputs), 1, min(fan_in, MAX_FAN_IN))
+        self.max_inputs = fan_in
+        self.rect.height = gate_height(fan_in)
+        if self.engine is None:
+            self.set_state(self.evaluate())
+            return set()
+        self.engine.invalidate()
+        return self.engine.settle([self])
+
+    def evaluate(self):
+        connected = len(self.inputs)
+        high = self.high_inputs
+        if self.gate_type == "AND":
+            return connected == self.max_inputs and high == connected
+        elif self.gate_type == "OR":
+            return high > 0
+        elif self.gate_type == "NOT":
+            return connected == 1 and high == 0
+        elif self.gate_type == "NAND":
+            return not (connected == self.max_inputs and high == connected)
+        elif self.gate_type == "NOR":
+            return high == 0
+        elif self.gate_type == "XOR":
+            return connected == self.max_inputs and high % 2 == 1
+        elif self.gate_type == "XNOR":
+            return connected == self.max_inputs and high % 2 == 0
+        elif self.gate_type == "BUFFER":
+            return connected == 1 and high == 1
+        return self.state
+
+
+class Output(Component):
+    def __init__(self, x, y):
+        super().__init__(x, y, 50, 50)
+
+    def evaluate(self):
+        if self.inputs:
+            return self.high_inputs > 0
+        return self.state
+
+
+# A free-running clock source: flips state on every Circuit.tick()
+class Clock(Component):
+    def __init__(self, x, y):
+        super().__init__(x, y, 50, 50)
+
+
+# Flip-flops and a serial-in shift register. Nothing happens when their inputs change except
+# on a rising edge of the clock pin (the last pin, used once every pin is connected); the
+# engine then samples every clocked component before updating any of them, so a chain of
+# flip-flops shifts by one stage per edge. REGISTER keeps `width` bits, shifting D into
+# bit 0, and its output is the last stage.
+class Sequential(Component):
+    clocked = (
+        True  # The engine evaluates these on clock edges instead of levelizing them
+    )
+
+    def __init__(self, x, y, sequential_type, width=None):
+        self.sequential_type = sequential_type
+        self.max_inputs = len(SEQUENTIAL_PINS[sequential_type])
+        super().__init__(x, y, GATE_WIDTH, gate_height(self.max_inputs))
+        if sequential_type == "REGISTER":
+            self.width = (
+                DEFAULT_REGISTER_WIDTH
+                if width is None
+                else max(1, min(width, MAX_REGISTER_WIDTH))
+            )
+        else:
+            self.width = 1
+        self.bits = 0
+        self.clock_source = None  # What drove the clock pin at the last evaluation
+        self.clock_level = False  # ... and its level then
+
+    # Function to check the clock pin for a rising edge and, if there is one, sample the data
+    # pins. Returns the new contents, or None when nothing is clocked in. Wiring up the clock
+    # pin is not an edge, even if the new source is already high.
+    def clock_edge(self):
+        source = self.inputs[-1] if len(self.inputs) == self.max_inputs else None
+        clock = source is not None and source.state
+        rising = clock and not self.clock_level and source is self.clock_source
+        self.clock_source = source
+        self.clock_level = clock
+        if not rising:
+            return None
+        pins = [source.state for source in self.inputs[:-1]]
+        if self.sequential_type == "DFF":
+            return int(pins[0])
+        if self.sequential_type == "TFF":
+            return self.bits ^ pins[0]
+        if self.sequential_type == "JKFF":
+            j, k = pins
+            return (self.bits ^ 1) if j and k else int(j) if j or k else self.bits
+        return ((self.bits << 1) | pins[0]) & ((1 << self.width) - 1)
+
+    # Function to store new contents and drive the output. Returns True if anything changed.
+    def load(self, bits):
+        if bits == self.bits:
+            return False
+        self.bits = bits
+        self.set_state((bits >> (self.width - 1)) & 1)
+        return True
+
+    # Function to change a register's width, keeping the low bits. Returns the set of
+    # components whose state changed.
+    def set_width(self, width):
+        if self.sequential_type != "REGISTER":
+            return set()
+        before = self.state
+        self.width = max(1, min(width, MAX_REGISTER_WIDTH))
+        self.bits &= (1 << self.width) - 1
+        self.set_state((self.bits >> (self.width - 1)) & 1)
+        if self.state == before or self.engine is None:
+            return set()
+        return {self} | self.engine.settle(self.outputs)
+
+
+# A user-defined block: a saved combinational netlist behind input pins (see subcircuit.py
+# for the definition). The block's state is its packed output vector, output k in bit k,
+# looked up in the definition's memoized truth table by the packed input vector, so a block
+# evaluates in one lookup however many gates it stands for. Each output is driven by a
+# SubcircuitPin connected to the block; the rest of the circuit wires to the pins, never to
+# the block itself.
+class Subcircuit(Component):
+    def __init__(self, x, y, definition):
+        if definition.num_outputs > MAX_BLOCK_OUTPUTS:
+            raise ValueError(f"Blocks can have at most {MAX_BLOCK_OUTPUTS} outputs")
+        self.definition = definition
+        self.max_inputs = definition.num_inputs
+        super().__init__(
+            x,
+            y,
+            GATE_WIDTH,
+            gate_height(max(definition.num_inputs, definition.num_outputs, 1)),
+        )
+
+    # Function to pack the input pins into one integer, the first pin most significant (the
+    # row number of the truth table). Unconnected pins read low.
+    def input_vector(self):
+        vector = 0
+        for source in self.inputs:
+            vector = (vector << 1) | source.state
+        return vector << (self.max_inputs - len(self.inputs))
+
+    def evaluate(self):
+        return self.definition.evaluate(self.input_vector())
+
+    # The pins read their bit of the output vector themselves; there are no high-input
+    # counts to keep, here or when wiring pins on and off
+    def set_state(self, state):
+        self.state = state
+
+    def connect_to(self, target):
+        self.outputs.append(target)
+        target.inputs.append(self)
+
+    def remove_connections(self):
+        for input_component in self.inputs:
+            input_component.outputs.remove(self)
+        for output_component in self.outputs:
+            output_component.inputs.remove(self)
+
+    # Function to get the top-left corner of the pin for output `index`
+    def pin_position(self, index):
+        pin_y = (
+            self.rect.y + self.rect.height * (index + 0.5) / self.definition.num_outputs
+        )
+        return (self.rect.x + self.rect.width + PIN_SIZE, int(pin_y - PIN_SIZE / 2))
+
+
+# One output of a Subcircuit block: its state is bit `output_index` of the block's state
+class SubcircuitPin(Component):
+    def __init__(self, x, y, output_index=0):
+        super().__init__(x, y, PIN_SIZE, PIN_SIZE)
+        self.output_index = output_index
+
+    def evaluate(self):
+        if self.inputs:
+            return bool((self.inputs[0].state >> self.output_index) & 1)
+        return self.state
+
+
+# Default classes used to build each component type; the GUI passes its drawable subclasses
+COMPONENT_CLASSES = {
+    "INPUT": Input,
+    "OUTPUT": Output,
+    "GATE": Gate,
+    "CLOCK": Clock,
+    "SEQUENTIAL": Sequential,
+    "SUBCIRCUIT": Subcircuit,
+    "PIN": SubcircuitPin,
+}
+
+
+# Function to create a component of the given type ("INPUT", "OUTPUT", "CLOCK", a gate type,
+# a sequential type, "SUBCIRCUIT" or "PIN"). `fan_in` sets the number of gate input pins, a
+# register's width, a pin's output number, or a block's netlist path (None for the default).
+def create_component(component_type, x, y, classes=None, fan_in=None):
+    classes = classes or COMPONENT_CLASSES
+    if component_type in ("INPUT", "OUTPUT", "CLOCK"):
+        return classes[component_type](x, y)
+    if component_type in GATE_TYPES:
+        return classes["GATE"](x, y, component_type, fan_in)
+    if component_type in SEQUENTIAL_TYPES:
+        return classes["SEQUENTIAL"](x, y, component_type, fan_in)
+    if component_type == "SUBCIRCUIT":
+        from subcircuit import (
+            load_definition,  # subcircuit.py loads netlists, which import this module
+        )
+
+        return classes["SUBCIRCUIT"](x, y, load_definition(fan_in))
+    if component_type == "PIN":
+        return classes["PIN"](x, y, fan_in or 0)
+    raise ValueError(f"Unknown component type: {component_type}")
+
+
+# Function to get the type name used for a component in netlists and the toolbar
+def component_type(component):
+    if isinstance(component, Gate):
+        return component.gate_type
+    if isinstance(component, Input):
+        return "INPUT"
+    if isinstance(component, Output):
+        return "OUTPUT"
+    if isinstance(component, Clock):
+        return "CLOCK"
+    if isinstance(component, Sequential):
+        return component.sequential_type
+    if isinstance(component, Subcircuit):
+        return "SUBCIRCUIT"
+    if isinstance(component, SubcircuitPin):
+        return "PIN"
+    raise ValueError(f"Unknown component: {component!r}")
+
+
+# A whole circuit: its components (in creation order) plus the engine that simulates them
+class Circuit:
+    def __init__(self, components=()):
+        self.components = []
+        self.engine = SimulationEngine()
+        self.next_id = 0
+        for component in components:
+            self.add(component)
+
+    def add(self, component):
+        if component.id is None:
+            component.id = self.next_id
+        self.next_id = max(self.next_id, component.id + 1)
+        self.components.append(component)
+        self.engine.add(component)
+        return self.engine.settle([component])
+
+    def remove(self, component):
+        self.components.remove(component)
+        return self.engine.remove(component)
+
+    def connect(self, source, target):
+        return self.engine.connect(source, target)
+
+    # Function to add a subcircuit block together with one pin per block output, lined up
+    # down its right edge. Returns the pins.
+    def add_subcircuit(self, block, pin_class=SubcircuitPin):
+        self.add(block)
+        pins = []
+        for index in range(block.definition.num_outputs):
+            pin = pin_class(*block.pin_position(index), index)
+            self.add(pin)
+            self.connect(block, pin)
+            pins.append(pin)
+        return pins
+
+    @property
+    def inputs(self):
+        return [
+            component for component in self.components if isinstance(component, Input)
+        ]
+
+    @property
+    def outputs(self):
+        return [
+            component for component in self.components if isinstance(component, Output)
+        ]
+
+    @property
+    def clocks(self):
+        return [
+            component for component in self.components if isinstance(component, Clock)
+        ]
+
+    @property
+    def sequential(self):
+        return [
+            component
+            for component in self.components
+            if isinstance(component, Sequential)
+        ]
+
+    # Function to advance the simulation by `count` clock ticks: every clock flips state and
+    # the circuit settles after each flip. Returns the set of components whose state changed.
+    def tick(self, count=1):
+        clocks = self.clocks
+        changed = set(clocks)
+        for _ in range(count):
+            dirty = []
+            for clock in clocks:
+                clock.set_state(not clock.state)
+                dirty.extend(clock.outputs)
+            changed |= self.engine.settle(dirty)
+        return changed
+
+    # Function to drive the circuit inputs (in creation order) and settle only what changed
+    def set_inputs(self, values):
+        dirty = []
+        for component, value in zip(self.inputs, values):
+            value = bool(value)
+            if component.state != value:
+                component.set_state(value)
+                dirty.extend(component.outputs)
+        return self.engine.settle(dirty)
+
+    def output_values(self):
+        return [component.state for component in self.outputs]
+
+    # Function to simulate one input vector and read back the outputs
+    def evaluate(self, values):
+        self.set_inputs(values)
+        return self.output_values()
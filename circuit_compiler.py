@@ -0,0 +1,112 @@
+import weakref
+
+from bitparallel_truth_table import evaluation_order
+
+# Circuit compiler: turns a loop-free component graph into one generated, straight-line
+# Python function over local variables. Each gate becomes a single bitwise expression with
+# its input count resolved at compile time, so evaluating an input vector is one function
+# call with no attribute lookups, string comparisons or generator expressions.
+#
+# The generated code only uses & | ^, so the same function works on 0/1 ints, on NumPy 0/1
+# arrays (one element per input vector) and on packed uint64 bit-planes (pass
+# mask=np.uint64(0xFFFFFFFFFFFFFFFF)). Inversion is written as x ^ mask.
+#
+# compile_circuit() caches the function per circuit and rebuilds it only when the netlist
+# revision of the circuit's engine changes (components added, removed or rewired).
+
+_cache = weakref.WeakKeyDictionary()
+
+
+# Function to write the expression for one gate, mirroring Gate.evaluate
+def _gate_expression(gate_type, operands, fan_in):
+    count = len(operands)
+    complete = count == fan_in and count > 0
+    if gate_type in ("AND", "NAND"):
+        value = " & ".join(operands) if complete else "0"
+    elif gate_type in ("OR", "NOR"):
+        value = " | ".join(operands) if count else "0"
+    elif gate_type in ("XOR", "XNOR"):
+        if not complete:
+            return "0"
+        value = " ^ ".join(operands)
+    elif gate_type in ("NOT", "BUFFER"):
+        if count != 1:
+            return "0"
+        value = operands[0]
+    else:
+        raise ValueError(f"Unknown gate type: {gate_type}")
+
+    if gate_type in ("NAND", "NOR", "XNOR", "NOT"):
+        return f"({value}) ^ mask"
+    return value
+
+
+# Function to generate the source of the evaluation function for the given inputs and outputs.
+# The function takes one argument per input (in order) plus `mask`, and returns a tuple with
+# one value per output. Subcircuit blocks become calls to their definitions' compiled
+# functions, which are put into `namespace` under the names the source uses.
+def generate_source(inputs, outputs, name="evaluate", namespace=None):
+    names = {}
+    arguments = []
+    for position, component in enumerate(inputs):
+        names[id(component)] = f"i{position}"
+        arguments.append(f"i{position}")
+
+    lines = [f"def {name}({', '.join(arguments + ['mask=1'])}):"]
+    for number, component in enumerate(evaluation_order(inputs, outputs)):
+        if id(component) in names:
+            continue
+        variable = f"s{number}"
+        operands = [names[id(source)] for source in component.inputs]
+        if hasattr(component, "gate_type"):
+            expression = _gate_expression(
+                component.gate_type, operands, component.max_inputs
+            )
+        elif hasattr(component, "definition"):
+            # Unconnected block pins read low; the block's variable holds its output tuple
+            if namespace is None:
+                raise ValueError(
+                    "Circuits with subcircuits need a namespace for the block functions"
+                )
+            function = f"block{number}"
+            namespace[function] = component.definition.function
+            operands += ["0"] * (component.max_inputs - len(operands))
+            expression = f"{function}({', '.join(operands + ['mask=mask'])})"
+        elif hasattr(component, "output_index") and operands:
+            expression = f"{operands[0]}[{component.output_index}]"
+        elif operands:
+            # Outputs (and anything else that ORs its inputs together)
+            expression = " | ".join(operands)
+        else:
+            # Unconnected sources keep their current state
+            expression = "mask" if component.state else "0"
+        lines.append(f"    {variable} = {expression}")
+        names[id(component)] = variable
+
+    results = "".join(f"{names[id(component)]}, " for component in outputs)
+    lines.append(f"    return ({results})")
+    return "\n".join(lines) + "\n"
+
+
+# Function to compile the given inputs and outputs into a Python function
+def compile_function(inputs, outputs, name="evaluate"):
+    namespace = {}
+    source = generate_source(inputs, outputs, name, namespace)
+    # The source is generated above from the netlist structure alone (gate types, pin counts
+    # and generated variable names); no user-supplied text reaches it
+    exec(compile(source, f"<compiled {name}>", "exec"), namespace)  # nosec B102
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+# Function to get the compiled evaluation function of a circuit (inputs and outputs in
+# creation order), reusing the cached one while the netlist is unchanged
+def compile_circuit(circuit):
+    revision = circuit.engine.revision
+    cached = _cache.get(circuit)
+    if cached is not None and cached[0] == revision:
+        return cached[1]
+    function = compile_function(circuit.inputs, circuit.outputs)
+    _cache[circuit] = (revision, function)
+    return function
@@ -0,0 +1,69 @@
+import pygame
+
+# Past this many damaged regions a single bounding rect is cheaper than many small updates
+MAX_DIRTY_RECTS = 32
+
+
+# Function to get the rect covering a straight line (plus its stroke width)
+def line_rect(start, end, width=2):
+    left = min(start[0], end[0])
+    top = min(start[1], end[1])
+    rect = pygame.Rect(
+        int(left),
+        int(top),
+        int(abs(end[0] - start[0])) + 1,
+        int(abs(end[1] - start[1])) + 1,
+    )
+    return rect.inflate(2 * width, 2 * width)
+
+
+# Function to get the rect covering a polyline (plus its stroke width)
+def polyline_rect(points, width=2):
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return line_rect((min(xs), min(ys)), (max(xs), max(ys)), width)
+
+
+# Tracks which parts of the screen changed since the last frame
+class DamageTracker:
+    def __init__(self, screen_rect, camera=None):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.camera = camera
+        self.rects = []
+
+    def __bool__(self):
+        return bool(self.rects)
+
+    def add(self, rect):
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    # Function to damage an area given in world coordinates, mapped to the screen through the
+    # camera (grown by a pixel for rounding at fractional zoom levels)
+    def add_world(self, rect):
+        if self.camera is None:
+            self.add(rect)
+        else:
+            self.add(self.camera.to_screen_rect(pygame.Rect(rect)).inflate(2, 2))
+
+    # Function to damage the whole window (first frame, window exposed, etc.)
+    def add_all(self):
+        self.rects = [self.screen_rect.copy()]
+
+    # Function to merge overlapping rects and hand back the list to redraw
+    def pop(self):
+        rects = self.rects
+        self.rects = []
+        if len(rects) > MAX_DIRTY_RECTS:
+            return [rects[0].unionall(rects[1:])]
+
+        merged = []
+        for rect in rects:
+            for i, other in enumerate(merged):
+                if rect.colliderect(other):
+                    rect = rect.union(other)
+                    merged[i] = None
+            merged = [other for other in merged if other is not None]
+            merged.append(rect)
+        return merged
@@ -1,6 +1,7 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
+from waveform_viewer import WaveformViewer
+
 # Define the time range for the signals
 time = np.linspace(0, 10, 1000)
 
@@ -18,38 +19,21 @@ Z = A & B
 # Z with Inverted A: AND operation between Inverted A and B
 Z_inverted_A = A_inverted & B
 
-# Plotting the signals
-plt.figure(figsize=(12, 10))
+# Plotting the signals (only the transitions are drawn, re-decimated on zoom)
+viewer = WaveformViewer(4, figsize=(12, 10))
 
 # Plot A
-plt.subplot(4, 1, 1)
-plt.plot(time, A, label='A', color='blue')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal A')
-plt.grid(True)
+viewer.add_signal(0, A, x=time, title='Signal A', label='A', color='blue')
 
 # Plot B
-plt.subplot(4, 1, 2)
-plt.plot(time, B, label='B', color='orange')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal B')
-plt.grid(True)
+viewer.add_signal(1, B, x=time, title='Signal B', label='B', color='orange')
 
 # Plot Inverted A
-plt.subplot(4, 1, 3)
-plt.plot(time, A_inverted, label='Inverted A', color='red')
-plt.ylim(-0.5, 1.5)
-plt.title('Inverted A')
-plt.grid(True)
+viewer.add_signal(2, A_inverted, x=time, title='Inverted A', label='Inverted A', color='red')
 
 # Plot Z and Z with Inverted A
-plt.subplot(4, 1, 4)
-plt.plot(time, Z, label='Z (A AND B)', color='green')
-plt.plot(time, Z_inverted_A, label='Z with Inverted A (Inverted A AND B)', color='purple', linestyle='--')
-plt.ylim(-0.5, 1.5)
-plt.title('Output Z and Z with Inverted A')
-plt.grid(True)
-plt.legend()
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+viewer.add_signal(3, Z, x=time, title='Output Z and Z with Inverted A', label='Z (A AND B)', color='green')
+viewer.add_signal(3, Z_inverted_A, x=time, label='Z with Inverted A (Inverted A AND B)', color='purple', linestyle='--')
+viewer.axes[3].legend()
+
+viewer.show()
@@ -1,10 +1,21 @@
 import pygame
+import argparse
 import sys
 import os
 import datetime
-
-# Initialize Pygame
-pygame.init()
+import functools
+import itertools
+
+import circuit
+import render_cache
+from camera import Camera
+from dirty_rects import DamageTracker, line_rect
+from netlist_format import AutosaveJournal, load_netlist, save_netlist
+from profiler import FrameProfiler
+from spatial_index import SpatialIndex
+from subcircuit import load_definition
+from tick_scheduler import DEFAULT_TICK_RATE, TickScheduler
+from wire_layer import WireLayer
 
 # Constants
 WIDTH, HEIGHT = 1024, 768
@@ -14,189 +25,296 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
+BOX_COLOR = (210, 210, 210)  # Gate bodies when zoomed out too far for detail
+
+# Frame pacing: redraws are capped at FRAME_CAP per second, and when nothing changes the
+# main loop sleeps on the event queue for up to IDLE_WAIT_MS at a time
+FRAME_CAP = 60
+IDLE_WAIT_MS = 500
+
+# Autosave: changed components are appended to a journal next to this snapshot every few seconds
+AUTOSAVE_PATH = "saved_diagrams/autosave.eenl"
+AUTOSAVE_INTERVAL_MS = 5000
+
+TOOLBAR_ITEMS = ("INPUT", "CLOCK", "AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR", "BUFFER", "DFF", "TFF", "JKFF", "REGISTER", "BLOCK", "OUTPUT", "SAVE", "PRINT")
+TOOLBAR_COLORS = (RED, (0, 128, 0), BLUE, GREEN, (255, 165, 0), (255, 0, 255), (0, 255, 255), (128, 0, 128), (255, 192, 203), (165, 42, 42), (0, 0, 128), (0, 128, 128), (128, 128, 0), (128, 0, 0), (75, 0, 130), BLACK, (100, 100, 100), (150, 150, 150))
+TOOLBAR_BUTTON_WIDTH = WIDTH // len(TOOLBAR_ITEMS)
+TOOLBAR_HEIGHT = 50
+
+# Labels drawn on the flip-flop and register boxes
+SEQUENTIAL_LABELS = {"DFF": "D FF", "TFF": "T FF", "JKFF": "JK FF", "REGISTER": "REG"}
+
+# Subcircuits: the BLOCK button places the selected netlist from the block library (the
+# --block files, or every netlist saved in BLOCK_DIR) as one component; B selects the next one
+BLOCK_DIR = "saved_diagrams/blocks"
+BLOCK_KEY = pygame.K_b
+
+# Simulation keys: run/pause the clocks, single-step one tick, and slow down or speed up 10x
+RUN_KEY = pygame.K_SPACE
+STEP_KEY = pygame.K_PERIOD
+RATE_KEYS = {pygame.K_LEFTBRACKET: 0.1, pygame.K_RIGHTBRACKET: 10}
+
+# Profiling HUD: F3 shows or hides it, F4 exports the rolling frame log (JSON, or CSV with Shift)
+HUD_KEY = pygame.K_F3
+EXPORT_KEY = pygame.K_F4
+HUD_RECT = pygame.Rect(WIDTH - 300, 60, 290, 200)
+HUD_REFRESH_MS = 250
+HUD_SLOWEST = 4  # Slowest components listed
+
+# Navigating the canvas: drag with the middle button or use the arrow keys to pan, the mouse
+# wheel zooms around the pointer and Home goes back to the starting view
+PAN_BUTTON = 2
+PAN_KEYS = {pygame.K_LEFT: (1, 0), pygame.K_RIGHT: (-1, 0), pygame.K_UP: (0, 1), pygame.K_DOWN: (0, -1)}
+PAN_STEP = 100  # Screen pixels per arrow key press
+HOME_KEY = pygame.K_HOME
+
+# Keys that add (+) or remove (-) an input pin on the gate under the mouse
+FAN_IN_KEYS = {pygame.K_PLUS: 1, pygame.K_EQUALS: 1, pygame.K_KP_PLUS: 1, pygame.K_MINUS: -1, pygame.K_KP_MINUS: -1}
+
+# Truth tables are drawn under gates with up to this many inputs (wider ones just show pins)
+MAX_TABLE_INPUTS = 3
+
+# Function to generate the truth table rows of a fully connected gate: header, then one row
+# per input combination in counting order
+@functools.lru_cache(maxsize=None)
+def truth_table_rows(gate_type, fan_in):
+    names = " ".join(chr(ord("A") + i) for i in range(fan_in))
+    rows = [f"{names} | Q"]
+    inverted = gate_type in ("NAND", "NOR", "XNOR")
+    base_type = gate_type.replace("N", "", 1) if inverted else gate_type
+    for bits in itertools.product((0, 1), repeat=fan_in):
+        high = sum(bits)
+        value = {
+            "AND": high == fan_in,
+            "OR": high > 0,
+            "XOR": high % 2 == 1,
+            "NOT": high == 0,
+            "BUFFER": high == 1,
+        }[base_type]
+        if inverted:
+            value = not value
+        rows.append(" ".join(str(bit) for bit in bits) + f" | {int(value)}")
+    return tuple(rows)
+
+# Drawable versions of the circuit components (the netlist and simulation live in circuit.py)
+class Component(circuit.Component):
+    make_rect = pygame.Rect
+
+    def __init__(self, x, y, width, height, color=None):
+        super().__init__(x, y, width, height, color)
+        self.spatial_index = None
+
+    def draw(self, screen, camera):
+        rect = camera.to_screen_rect(self.rect)
+        pygame.draw.rect(screen, GREEN if self.state else RED, rect)
+        if camera.detailed:
+            text = render_cache.scaled(render_cache.render_text("1" if self.state else "0", 36), camera.zoom)
+            text_rect = text.get_rect(center=rect.center)
+            screen.blit(text, text_rect)
 
-# Component classes
-class Component:
-    def __init__(self, x, y, width, height, color):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.color = color
-        self.inputs = []
-        self.outputs = []
-        self.state = False
-        self.dragging = False
-        self.offset_x = 0
-        self.offset_y = 0
-
-    def draw(self, screen):
-        pygame.draw.rect(screen, GREEN if self.state else RED, self.rect)
-        font = pygame.font.Font(None, 36)
-        text = font.render("1" if self.state else "0", True, BLACK)
-        text_rect = text.get_rect(center=self.rect.center)
-        screen.blit(text, text_rect)
-
-    def update(self):
-        pass
-
-    def start_drag(self, mouse_pos):
-        self.dragging = True
-        self.offset_x = self.rect.x - mouse_pos[0]
-        self.offset_y = self.rect.y - mouse_pos[1]
-
-    def end_drag(self):
-        self.dragging = False
+    # Function to draw the level-of-detail stand-in used when zoomed far out: the body only,
+    # outlined in the colour of the output
+    def draw_box(self, screen, camera):
+        rect = camera.to_screen_rect(self.rect)
+        pygame.draw.rect(screen, BOX_COLOR, rect)
+        pygame.draw.rect(screen, GREEN if self.state else RED, rect, 1)
 
-    def drag(self, mouse_pos):
-        if self.dragging:
-            self.rect.x = mouse_pos[0] + self.offset_x
-            self.rect.y = mouse_pos[1] + self.offset_y
-
-    def remove_connections(self):
-        for input_component in self.inputs:
-            input_component.outputs.remove(self)
-        for output_component in self.outputs:
-            output_component.inputs.remove(self)
-
-class Input(Component):
-    def __init__(self, x, y):
-        super().__init__(x, y, 50, 50, RED)
-
-    def toggle(self):
-        self.state = not self.state
-        self.propagate()
-
-    def propagate(self):
-        for output in self.outputs:
-            output.update()
-
-class Gate(Component):
-    def __init__(self, x, y, gate_type):
-        super().__init__(x, y, 80, 60, BLUE)
-        self.gate_type = gate_type
-        self.max_inputs = 1 if gate_type in ["NOT", "BUFFER"] else 2
-
-    def draw(self, screen):
-        if self.gate_type in ["AND", "NAND"]:
-            pygame.draw.line(screen, BLACK, (self.rect.left, self.rect.top), (self.rect.left, self.rect.bottom), 2)
-            pygame.draw.line(screen, BLACK, (self.rect.left, self.rect.top), (self.rect.centerx, self.rect.top), 2)
-            pygame.draw.line(screen, BLACK, (self.rect.left, self.rect.bottom), (self.rect.centerx, self.rect.bottom), 2)
-            pygame.draw.arc(screen, BLACK, (self.rect.left, self.rect.top, self.rect.width, self.rect.height), -1.57, 1.57, 2)
-            if self.gate_type == "NAND":
-                pygame.draw.circle(screen, BLACK, (self.rect.right + 5, self.rect.centery), 5)
-        elif self.gate_type in ["OR", "NOR", "XOR", "XNOR"]:
-            pygame.draw.arc(screen, BLACK, (self.rect.left - 40, self.rect.top, self.rect.width + 40, self.rect.height), -1.57, 1.57, 2)
-            pygame.draw.arc(screen, BLACK, (self.rect.left - 20, self.rect.top, 40, self.rect.height), 1.57, 4.71, 2)
-            if self.gate_type in ["NOR", "XNOR"]:
-                pygame.draw.circle(screen, BLACK, (self.rect.right + 5, self.rect.centery), 5)
-            if self.gate_type in ["XOR", "XNOR"]:
-                pygame.draw.arc(screen, BLACK, (self.rect.left - 30, self.rect.top, 40, self.rect.height), 1.57, 4.71, 2)
-        elif self.gate_type in ["NOT", "BUFFER"]:
-            pygame.draw.polygon(screen, BLACK, [(self.rect.left, self.rect.top), (self.rect.left, self.rect.bottom), (self.rect.right - 10, self.rect.centery)], 2)
-            if self.gate_type == "NOT":
-                pygame.draw.circle(screen, BLACK, (self.rect.right, self.rect.centery), 5)
-
-        # Draw input lines
-        if self.gate_type not in ["NOT", "BUFFER"]:
-            pygame.draw.line(screen, BLACK, (self.rect.left - 20, self.rect.top + self.rect.height * 0.25), (self.rect.left, self.rect.top + self.rect.height * 0.25), 2)
-            pygame.draw.line(screen, BLACK, (self.rect.left - 20, self.rect.top + self.rect.height * 0.75), (self.rect.left, self.rect.top + self.rect.height * 0.75), 2)
-        else:
-            pygame.draw.line(screen, BLACK, (self.rect.left - 20, self.rect.centery), (self.rect.left, self.rect.centery), 2)
-        
-        # Draw output line
-        pygame.draw.line(screen, BLACK, (self.rect.right, self.rect.centery), (self.rect.right + 20, self.rect.centery), 2)
+    # Function to get the screen area this component draws into
+    def bounds(self):
+        return self.rect.copy()
 
-        # Draw gate label
-        font = pygame.font.Font(None, 24)
-        text = font.render(self.gate_type, True, BLACK)
-        text_rect = text.get_rect(center=self.rect.center)
-        screen.blit(text, text_rect)
+    # Functions to get where wires out of and into (pin `index` of) this component end
+    def output_pin(self):
+        return (self.rect.right + 20, self.rect.centery)
+
+    def input_pin(self, index):
+        return self.rect.midleft
+
+    def drag(self, mouse_pos):
+        super().drag(mouse_pos)
+        if self.dragging and self.spatial_index is not None:
+            self.spatial_index.move(self, self.bounds())
+
+class Input(circuit.Input, Component):
+    pass
+
+class Gate(circuit.Gate, Component):
+    # Function to get the height of the truth table under the gate (0 when none is drawn)
+    def truth_table_height(self):
+        if self.max_inputs > MAX_TABLE_INPUTS:
+            return 0
+        return max(60, 16 * ((1 << self.max_inputs) + 1))
+
+    # Function to get where the wire into input pin `index` ends
+    def input_pin(self, index):
+        return (self.rect.left - 20, render_cache.input_pin_y(self.rect, index, self.max_inputs))
+
+    def bounds(self):
+        table_height = self.truth_table_height()
+        return pygame.Rect(
+            self.rect.left - render_cache.SPRITE_MARGIN_LEFT,
+            self.rect.top - render_cache.SPRITE_MARGIN_Y,
+            render_cache.SPRITE_MARGIN_LEFT + self.rect.width + render_cache.SPRITE_MARGIN_RIGHT,
+            self.rect.height + 10 + table_height + render_cache.SPRITE_MARGIN_Y,
+        )
+
+    def draw(self, screen, camera):
+        if not camera.detailed:
+            self.draw_box(screen, camera)
+            return
+
+        # Outline, pin stubs and label come from a sprite rendered once per gate type
+        sprite = render_cache.gate_sprite(self.gate_type, self.rect.width, self.rect.height, self.max_inputs)
+        position = camera.to_screen((self.rect.left - render_cache.SPRITE_MARGIN_LEFT, self.rect.top - render_cache.SPRITE_MARGIN_Y))
+        screen.blit(render_cache.scaled(sprite, camera.zoom), position)
 
         # Draw truth table
-        self.draw_truth_table(screen)
+        self.draw_truth_table(screen, camera)
 
-    def draw_truth_table(self, screen):
-        font = pygame.font.Font(None, 20)
-        table_width = 60
-        table_height = 80 if self.max_inputs == 2 else 60
+    def draw_truth_table(self, screen, camera):
+        table_height = self.truth_table_height()
+        if not table_height:
+            return
+        table_width = 60 if self.max_inputs < 3 else 72
         table_left = self.rect.left + (self.rect.width - table_width) // 2
         table_top = self.rect.bottom + 10
 
-        pygame.draw.rect(screen, WHITE, (table_left, table_top, table_width, table_height))
-        pygame.draw.rect(screen, BLACK, (table_left, table_top, table_width, table_height), 1)
-
-        truth_tables = {
-            "AND": ["A B | Q", "0 0 | 0", "0 1 | 0", "1 0 | 0", "1 1 | 1"],
-            "OR": ["A B | Q", "0 0 | 0", "0 1 | 1", "1 0 | 1", "1 1 | 1"],
-            "NOT": ["A | Q", "0 | 1", "1 | 0"],
-            "NAND": ["A B | Q", "0 0 | 1", "0 1 | 1", "1 0 | 1", "1 1 | 0"],
-            "NOR": ["A B | Q", "0 0 | 1", "0 1 | 0", "1 0 | 0", "1 1 | 0"],
-            "XOR": ["A B | Q", "0 0 | 0", "0 1 | 1", "1 0 | 1", "1 1 | 0"],
-            "XNOR": ["A B | Q", "0 0 | 1", "0 1 | 0", "1 0 | 0", "1 1 | 1"],
-            "BUFFER": ["A | Q", "0 | 0", "1 | 1"]
-        }
-
-        rows = truth_tables[self.gate_type]
-
-        for i, row in enumerate(rows):
-            bg_color = WHITE
-            if i > 0:  # Skip header row
-                if self.max_inputs == 2:
-                    input_a = int(row[0])
-                    input_b = int(row[2])
-                    if len(self.inputs) == 2 and self.inputs[0].state == bool(input_a) and self.inputs[1].state == bool(input_b):
-                        bg_color = YELLOW
-                elif self.max_inputs == 1:
-                    input_a = int(row[0])
-                    if len(self.inputs) == 1 and self.inputs[0].state == bool(input_a):
-                        bg_color = YELLOW
-
-            pygame.draw.rect(screen, bg_color, (table_left, table_top + i * table_height // len(rows), table_width, table_height // len(rows)))
-            text = font.render(row, True, BLACK)
-            text_rect = text.get_rect(midleft=(table_left + 5, table_top + (i + 0.5) * table_height / len(rows)))
-            screen.blit(text, text_rect)
-
-    def update(self):
-        if self.gate_type == "AND":
-            self.state = len(self.inputs) == 2 and all(input.state for input in self.inputs)
-        elif self.gate_type == "OR":
-            self.state = len(self.inputs) > 0 and any(input.state for input in self.inputs)
-        elif self.gate_type == "NOT":
-            self.state = len(self.inputs) == 1 and not self.inputs[0].state
-        elif self.gate_type == "NAND":
-            self.state = not (len(self.inputs) == 2 and all(input.state for input in self.inputs))
-        elif self.gate_type == "NOR":
-            self.state = not (len(self.inputs) > 0 and any(input.state for input in self.inputs))
-        elif self.gate_type == "XOR":
-            self.state = len(self.inputs) == 2 and (self.inputs[0].state != self.inputs[1].state)
-        elif self.gate_type == "XNOR":
-            self.state = len(self.inputs) == 2 and (self.inputs[0].state == self.inputs[1].state)
-        elif self.gate_type == "BUFFER":
-            self.state = len(self.inputs) == 1 and self.inputs[0].state
-        self.propagate()
-
-    def propagate(self):
-        for output in self.outputs:
-            output.update()
-
-class Output(Component):
-    def __init__(self, x, y):
-        super().__init__(x, y, 50, 50, RED)
-
-    def update(self):
-        if self.inputs:
-            self.state = any(input.state for input in self.inputs)
+        rows = truth_table_rows(self.gate_type, self.max_inputs)
+
+        # Highlight the row matching the current inputs (rows are listed in counting order)
+        highlighted_row = None
+        if len(self.inputs) == self.max_inputs:
+            row_index = 0
+            for input_component in self.inputs:
+                row_index = row_index * 2 + (1 if input_component.state else 0)
+            highlighted_row = row_index + 1  # Skip header row
+
+        table = render_cache.truth_table_surface(rows, highlighted_row, table_width, table_height)
+        screen.blit(render_cache.scaled(table, camera.zoom), camera.to_screen((table_left, table_top)))
+
+class Output(circuit.Output, Component):
+    pass
+
+class Clock(circuit.Clock, Component):
+    def draw(self, screen, camera):
+        rect = camera.to_screen_rect(self.rect)
+        pygame.draw.rect(screen, GREEN if self.state else RED, rect)
+        if not camera.detailed:
+            return
+        zoom = camera.zoom
+        pygame.draw.rect(screen, BLACK, rect, 2)
+        label = render_cache.scaled(render_cache.render_text("CLK", 20), zoom)
+        screen.blit(label, label.get_rect(midtop=(rect.centerx, rect.top + round(4 * zoom))))
+        text = render_cache.scaled(render_cache.render_text("1" if self.state else "0", 28), zoom)
+        screen.blit(text, text.get_rect(midbottom=(rect.centerx, rect.bottom - round(4 * zoom))))
+
+class Sequential(circuit.Sequential, Component):
+    # Function to get where the wire into input pin `index` ends
+    def input_pin(self, index):
+        return (self.rect.left - 20, render_cache.input_pin_y(self.rect, index, self.max_inputs))
+
+    def bounds(self):
+        return pygame.Rect(
+            self.rect.left - render_cache.SPRITE_MARGIN_LEFT,
+            self.rect.top - render_cache.SPRITE_MARGIN_Y,
+            render_cache.SPRITE_MARGIN_LEFT + self.rect.width + render_cache.SPRITE_MARGIN_RIGHT,
+            self.rect.height + 2 * render_cache.SPRITE_MARGIN_Y,
+        )
+
+    def draw(self, screen, camera):
+        if not camera.detailed:
+            self.draw_box(screen, camera)
+            return
+
+        zoom = camera.zoom
+        pins = circuit.SEQUENTIAL_PINS[self.sequential_type]
+        sprite = render_cache.sequential_sprite(SEQUENTIAL_LABELS[self.sequential_type], pins, self.rect.width, self.rect.height)
+        position = camera.to_screen((self.rect.left - render_cache.SPRITE_MARGIN_LEFT, self.rect.top - render_cache.SPRITE_MARGIN_Y))
+        screen.blit(render_cache.scaled(sprite, zoom), position)
+
+        # Contents: Q for flip-flops; the stages of a register, last stage first (hex when long)
+        if self.sequential_type != "REGISTER":
+            contents = f"Q={int(self.state)}"
+        elif self.width <= 8:
+            contents = format(self.bits, f"0{self.width}b")
+        else:
+            contents = format(self.bits, f"0{(self.width + 3) // 4}X") + "h"
+        text = render_cache.scaled(render_cache.render_text(contents, 20, GREEN if self.state else RED), zoom)
+        screen.blit(text, text.get_rect(midbottom=camera.to_screen((self.rect.centerx + 6, self.rect.bottom - 4))))
+
+class Subcircuit(circuit.Subcircuit, Component):
+    # Function to get where the wire into input pin `index` ends
+    def input_pin(self, index):
+        return (self.rect.left - 20, render_cache.input_pin_y(self.rect, index, self.max_inputs))
+
+    def bounds(self):
+        return pygame.Rect(
+            self.rect.left - render_cache.SPRITE_MARGIN_LEFT,
+            self.rect.top - render_cache.SPRITE_MARGIN_Y,
+            render_cache.SPRITE_MARGIN_LEFT + self.rect.width + render_cache.SPRITE_MARGIN_RIGHT,
+            self.rect.height + 2 * render_cache.SPRITE_MARGIN_Y,
+        )
+
+    def draw(self, screen, camera):
+        if not camera.detailed:
+            self.draw_box(screen, camera)
+            return
+        definition = self.definition
+        sprite = render_cache.block_sprite(definition.name, definition.num_inputs, definition.num_outputs, self.rect.width, self.rect.height, circuit.PIN_SIZE)
+        position = camera.to_screen((self.rect.left - render_cache.SPRITE_MARGIN_LEFT, self.rect.top - render_cache.SPRITE_MARGIN_Y))
+        screen.blit(render_cache.scaled(sprite, camera.zoom), position)
+
+    # The pins travel with the block
+    def drag(self, mouse_pos):
+        super().drag(mouse_pos)
+        if not self.dragging:
+            return
+        for pin in self.outputs:
+            pin.rect.topleft = self.pin_position(pin.output_index)
+            if pin.spatial_index is not None:
+                pin.spatial_index.move(pin, pin.bounds())
+
+class SubcircuitPin(circuit.SubcircuitPin, Component):
+    def output_pin(self):
+        return self.rect.midright
+
+    def draw(self, screen, camera):
+        rect = camera.to_screen_rect(self.rect)
+        pygame.draw.rect(screen, GREEN if self.state else RED, rect)
+        if camera.detailed:
+            pygame.draw.rect(screen, BLACK, rect, 1)
+
+# Function to get a component together with the parts that move and go with it (a block's pins)
+def component_parts(component):
+    if isinstance(component, Subcircuit):
+        return [component] + list(component.outputs)
+    return [component]
+
+# Function to list the netlists offered by the BLOCK button: the given paths, or else every
+# netlist saved in BLOCK_DIR
+def block_library(paths):
+    if paths:
+        return list(paths)
+    if not os.path.isdir(BLOCK_DIR):
+        return []
+    return sorted(os.path.join(BLOCK_DIR, name) for name in os.listdir(BLOCK_DIR) if name.endswith((".json", ".eenl")))
+
+# Function to create a block for a library netlist (None, after saying why, when it cannot)
+def create_block(library, selected, x, y):
+    if not library:
+        print(f"No subcircuits to place: save a netlist into {BLOCK_DIR} or pass --block")
+        return None
+    path = library[selected % len(library)]
+    try:
+        return Subcircuit(x, y, load_definition(path))
+    except (OSError, ValueError) as error:
+        print(f"Cannot use {path} as a subcircuit: {error}")
+        return None
 
 def draw_toolbar(screen):
-    gate_types = ["INPUT", "AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR", "BUFFER", "OUTPUT", "SAVE", "PRINT"]
-    colors = [RED, BLUE, GREEN, (255, 165, 0), (255, 0, 255), (0, 255, 255), (128, 0, 128), (255, 192, 203), (165, 42, 42), BLACK, (100, 100, 100), (150, 150, 150)]
-    
-    for i, (gate_type, color) in enumerate(zip(gate_types, colors)):
-        pygame.draw.rect(screen, color, (i * 85, 0, 85, 50))
-        font = pygame.font.Font(None, 24)
-        text = font.render(gate_type, True, WHITE)
-        text_rect = text.get_rect(center=(i * 85 + 42, 25))
-        screen.blit(text, text_rect)
-
-def save_diagram(screen):
+    screen.blit(render_cache.toolbar_surface(TOOLBAR_ITEMS, TOOLBAR_COLORS, TOOLBAR_BUTTON_WIDTH, TOOLBAR_HEIGHT, 16), (0, 0))
+
+def save_diagram(screen, board=None):
     if not os.path.exists("saved_diagrams"):
         os.makedirs("saved_diagrams")
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -204,6 +322,12 @@ def save_diagram(screen):
     pygame.image.save(screen, filename)
     print(f"Diagram saved as {filename}")
 
+    # Save the netlist too, so the circuit can be reopened and simulated again
+    if board is not None:
+        netlist_filename = f"saved_diagrams/diagram_{timestamp}.json"
+        save_netlist(board, netlist_filename)
+        print(f"Netlist saved as {netlist_filename}")
+
 def print_diagram(screen):
     import tempfile
     import subprocess
@@ -222,17 +346,169 @@ def print_diagram(screen):
 
     print("Opening diagram for printing. Please use your system's print dialog to print the diagram.")
 
-def main():
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Logic Gate Designer")
+# Function to damage a component's drawing area together with every wire attached to it
+def damage_component(damage, wires, component):
+    damage.add_world(component.bounds())
+    for rect in wires.rects_of(component):
+        damage.add_world(rect)
+
+# Function to damage components whose state changed, plus the gates whose truth table highlights them
+def damage_changed(damage, changed):
+    for component in changed:
+        damage.add_world(component.bounds())
+        for output in component.outputs:
+            damage.add_world(output.bounds())
+
+# Function to journal the components whose saved state changed (input and clock levels,
+# flip-flop and register contents)
+def mark_state_changed(autosave, changed):
+    if autosave is None:
+        return
+    for component in changed:
+        if isinstance(component, (Input, Clock, Sequential)):
+            autosave.mark_changed(component)
+
+# Function to add a component to the spatial index, stacked above everything already there
+def index_component(index, component, order):
+    component.spatial_index = index
+    index.insert(component, component.bounds(), (order, 0))
+
+# Function to drop a component and its wires from the spatial index
+def unindex_component(index, wires, component):
+    wires.remove_component(component)
+    index.remove(component)
+    component.spatial_index = None
+
+# Function to find the topmost component under a point
+def pick_component(index, pos, kinds=None):
+    for key in index.query_point(pos):
+        if isinstance(key, tuple):  # Wires
+            continue
+        if key.rect.collidepoint(pos) and (kinds is None or isinstance(key, kinds)):
+            return key
+    return None
+
+# Function to redraw the scene through the camera, restricted to the given screen regions.
+# The cached wire layer fills each region first; then only components whose world rect
+# overlaps a region are drawn. With a profiler, every component's draw call is timed.
+def draw_scene(screen, index, wires, camera, regions, rubber_band, profiler=None):
+    wires.draw(screen, regions, camera)
+    for region in regions:
+        screen.set_clip(region)
+
+        # Draw components that overlap this region, in stacking order
+        for key in index.query_rect(camera.to_world_rect(region)):
+            if isinstance(key, tuple):  # Wires, already drawn
+                continue
+            elif profiler is None:
+                key.draw(screen, camera)
+            else:
+                started = profiler.timer()
+                key.draw(screen, camera)
+                profiler.record_draw(key, profiler.timer() - started)
+
+        # Draw toolbar with labels, over anything scrolled underneath it
+        if region.top < TOOLBAR_HEIGHT:
+            draw_toolbar(screen)
 
-    components = []
+        # Draw connection in progress
+        if rubber_band:
+            pygame.draw.line(screen, BLUE, rubber_band[0], rubber_band[1], 2)
+    screen.set_clip(None)
+
+# Function to draw the profiling HUD: FPS, per-phase timings, the last input toggle and the
+# slowest components to draw
+def draw_hud(screen, profiler):
+    phases = profiler.phase_averages()
+    lines = [
+        f"FPS {profiler.fps():5.1f}   frame {phases['frame_ms']:6.2f} ms",
+        f"events {phases['events_ms']:5.2f}  sim {phases['sim_ms']:5.2f}  draw {phases['draw_ms']:5.2f} ms",
+        f"max propagation depth {profiler.max_depth()}",
+    ]
+    if profiler.toggles:
+        toggle = profiler.toggles[-1]
+        lines.append(f"last toggle: {toggle['evaluations']} evaluations, depth {toggle['depth']}")
+    lines.append("slowest to draw:")
+    for component, seconds in profiler.slowest_components(HUD_SLOWEST):
+        lines.append(f"  {circuit.component_type(component)} #{component.id}  {seconds * 1e3:.3f} ms")
+
+    panel = pygame.Surface(HUD_RECT.size, pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 190))
+    font = render_cache.get_font(20)
+    for row, line in enumerate(lines):
+        panel.blit(font.render(line, True, WHITE), (8, 6 + 18 * row))
+    screen.blit(panel, HUD_RECT.topleft)
+
+# Function to write the profiler's frame log into saved_diagrams
+def export_profile(profiler, as_csv):
+    os.makedirs("saved_diagrams", exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"saved_diagrams/profile_{timestamp}.{'csv' if as_csv else 'json'}"
+    profiler.export(filename)
+    print(f"Profile saved as {filename}")
+
+# Classes the designer uses when it builds or loads components
+GUI_COMPONENT_CLASSES = {
+    "INPUT": Input, "OUTPUT": Output, "GATE": Gate, "CLOCK": Clock, "SEQUENTIAL": Sequential,
+    "SUBCIRCUIT": Subcircuit, "PIN": SubcircuitPin,
+}
+
+# Function to show the simulation rate, whether the clocks are running and the zoom level in
+# the window title
+def update_caption(scheduler, camera):
+    status = "running" if scheduler.running else "paused"
+    pygame.display.set_caption(f"Logic Gate Designer - {scheduler.tick_rate} ticks/s ({status}) - {camera.zoom:.0%}")
+
+def main(netlist_path=None, frame_cap=FRAME_CAP, dirty_rect_rendering=True, autosave_path=AUTOSAVE_PATH, tick_rate=DEFAULT_TICK_RATE, block_paths=()):
+    # Initialize Pygame (only the interactive designer needs a display)
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    clock = pygame.time.Clock()
+    scheduler = TickScheduler(tick_rate)
+    camera = Camera()
+    update_caption(scheduler, camera)
+    damage = DamageTracker(screen.get_rect(), camera)
+    damage.add_all()
+
+    if netlist_path:
+        board = load_netlist(netlist_path, GUI_COMPONENT_CLASSES)
+    else:
+        board = circuit.Circuit()
+    profiler = FrameProfiler(board.engine)
+    show_hud = False
+    last_hud_refresh = 0
+    spatial_index = SpatialIndex()
+    stacking_order = itertools.count()
+    for component in board.components:
+        index_component(spatial_index, component, next(stacking_order))
+    wires = WireLayer(spatial_index)
+    for component in board.components:
+        wires.refresh(component)
+
+    autosave = None
+    last_autosave = pygame.time.get_ticks()
+    if autosave_path:
+        os.makedirs(os.path.dirname(autosave_path) or ".", exist_ok=True)
+        autosave = AutosaveJournal(autosave_path)
+        if os.path.exists(autosave_path):
+            print(f"The last session's autosave will be kept as {autosave.previous_path}")
     connecting = False
     start_component = None
     dragging_component = None
+    rubber_band = None
+    panning = False
+    library = block_library(block_paths)
+    selected_block = 0
 
     while True:
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if not events and not damage and not scheduler.running:
+            # Nothing to do: sleep until the next event instead of spinning
+            events = [pygame.event.wait(HUD_REFRESH_MS if show_hud else IDLE_WAIT_MS)]
+        profiler.begin_frame()
+        profiler.start()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -240,94 +516,224 @@ def main():
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
                     x, y = event.pos
-                    if y < 50:  # Toolbar area
-                        gate_types = ["INPUT", "AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR", "BUFFER", "OUTPUT", "SAVE", "PRINT"]
-                        index = x // 85
-                        if index < len(gate_types):
-                            if gate_types[index] == "INPUT":
-                                components.append(Input(x, 100))
-                            elif gate_types[index] == "OUTPUT":
-                                components.append(Output(x, 100))
-                            elif gate_types[index] == "SAVE":
-                                save_diagram(screen)
-                            elif gate_types[index] == "PRINT":
+                    if y < TOOLBAR_HEIGHT:  # Toolbar area
+                        index = x // TOOLBAR_BUTTON_WIDTH
+                        if index < len(TOOLBAR_ITEMS):
+                            item = TOOLBAR_ITEMS[index]
+                            new_component = None
+                            x, y = camera.to_world((x, 100))  # Below the button, wherever the view is
+                            if item == "INPUT":
+                                new_component = Input(x, y)
+                            elif item == "OUTPUT":
+                                new_component = Output(x, y)
+                            elif item == "CLOCK":
+                                new_component = Clock(x, y)
+                            elif item == "SAVE":
+                                save_diagram(screen, board)
+                            elif item == "PRINT":
                                 print_diagram(screen)
-                            elif index < 10:  # Other gates
-                                components.append(Gate(x, 100, gate_types[index]))
+                            elif item == "BLOCK":
+                                new_component = create_block(library, selected_block, x, y)
+                            elif item in circuit.SEQUENTIAL_TYPES:
+                                new_component = Sequential(x, y, item)
+                            else:  # Gates
+                                new_component = Gate(x, y, item)
+                            if new_component is not None:
+                                index_component(spatial_index, new_component, next(stacking_order))
+                                if isinstance(new_component, Subcircuit):
+                                    pins = board.add_subcircuit(new_component, SubcircuitPin)
+                                    for pin in pins:
+                                        index_component(spatial_index, pin, next(stacking_order))
+                                else:
+                                    board.add(new_component)
+                                for part in component_parts(new_component):
+                                    if autosave is not None:
+                                        autosave.mark_changed(part)
+                                    damage.add_world(part.bounds())
                     else:
-                        for component in components:
-                            if component.rect.collidepoint(event.pos):
-                                if not connecting:
-                                    if isinstance(component, (Input, Gate)):
-                                        connecting = True
-                                        start_component = component
-                                    component.start_drag(event.pos)
+                        world_pos = camera.to_world(event.pos)
+                        component = pick_component(spatial_index, world_pos)
+                        if component is not None:
+                            if not connecting:
+                                if isinstance(component, (Input, Gate, Clock, Sequential, SubcircuitPin)):
+                                    connecting = True
+                                    start_component = component
+                                if not isinstance(component, SubcircuitPin):  # Pins stay on their block
+                                    component.start_drag(world_pos)
                                     dragging_component = component
-                                else:
-                                    if start_component != component and isinstance(component, (Gate, Output)):
-                                        if component not in start_component.outputs and (not isinstance(component, Gate) or len(component.inputs) < component.max_inputs):
-                                            start_component.outputs.append(component)
-                                            component.inputs.append(start_component)
-                                            start_component.update()  # Update the state after connection
-                                    connecting = False
-                                    start_component = None
-                                break
+                            else:
+                                if start_component != component and isinstance(component, (Gate, Output, Sequential, Subcircuit)):
+                                    if component not in start_component.outputs and (isinstance(component, Output) or len(component.inputs) < component.max_inputs):
+                                        changed = board.connect(start_component, component)  # Settles the new fan-out
+                                        for rect in wires.refresh(component):
+                                            damage.add_world(rect)
+                                        if autosave is not None:
+                                            autosave.mark_changed(component)  # Its input list changed
+                                        damage.add_world(component.bounds())
+                                        damage_changed(damage, changed)
+                                connecting = False
+                                start_component = None
                 elif event.button == 3:  # Right click
                     connecting = False
                     start_component = None
-                    for component in components:
-                        if isinstance(component, Input) and component.rect.collidepoint(event.pos):
-                            component.toggle()
-                            break
+                    component = pick_component(spatial_index, camera.to_world(event.pos), Input)
+                    if component is not None:
+                        evaluations = board.engine.evaluations
+                        changed = component.toggle()
+                        mark_state_changed(autosave, changed | {component})
+                        profiler.record_toggle(component, board.engine.evaluations - evaluations, board.engine.last_depth)
+                        damage_changed(damage, changed | {component})
+                elif event.button == PAN_BUTTON:
+                    panning = True
             
             elif event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1:
                     if dragging_component:
                         dragging_component.end_drag()
+                        if autosave is not None:
+                            autosave.mark_changed(dragging_component)
                         dragging_component = None
+                elif event.button == PAN_BUTTON:
+                    panning = False
             
             elif event.type == pygame.MOUSEMOTION:
-                if dragging_component:
-                    dragging_component.drag(event.pos)
+                if panning:
+                    camera.pan(*event.rel)
+                    damage.add_all()
+                elif dragging_component:
+                    parts = component_parts(dragging_component)
+                    for part in parts:
+                        damage.add_world(part.bounds())
+                    dragging_component.drag(camera.to_world(event.pos))  # Keeps the spatial index in sync
+                    for part in parts:
+                        for rect in wires.refresh(part):  # Old and new routes
+                            damage.add_world(rect)
+                        damage.add_world(part.bounds())
+
+            elif event.type == pygame.MOUSEWHEEL:
+                if camera.zoom_at(pygame.mouse.get_pos(), event.y):
+                    damage.add_all()
+                    update_caption(scheduler, camera)
             
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_DELETE:
-                    mouse_pos = pygame.mouse.get_pos()
-                    for component in components[:]:
-                        if component.rect.collidepoint(mouse_pos):
-                            component.remove_connections()
-                            components.remove(component)
-                            break
-
-        screen.fill(WHITE)
-
-        # Draw toolbar with labels
-        draw_toolbar(screen)
-
-        # Draw components and connections
-        for component in components:
-            component.draw(screen)
-            if isinstance(component, (Input, Gate)):
-                output_pos = (component.rect.right + 20, component.rect.centery)
-            else:
-                output_pos = component.rect.midright
-            
-            for output in component.outputs:
-                if isinstance(output, Gate):
-                    input_index = output.inputs.index(component)
-                    if output.gate_type in ["NOT", "BUFFER"]:
-                        input_pos = (output.rect.left - 20, output.rect.centery)
-                    else:
-                        input_pos = (output.rect.left - 20, output.rect.top + output.rect.height * (0.25 if input_index == 0 else 0.75))
-                else:
-                    input_pos = output.rect.midleft
-                pygame.draw.line(screen, BLACK, output_pos, input_pos, 2)
-
-        # Draw connection in progress
+                    component = pick_component(spatial_index, camera.to_world(pygame.mouse.get_pos()))
+                    if isinstance(component, SubcircuitPin) and component.inputs:
+                        component = component.inputs[0]  # A pin goes with its block
+                    for part in component_parts(component) if component is not None else ():
+                        damage_component(damage, wires, part)
+                        damage_changed(damage, [part])
+                        unindex_component(spatial_index, wires, part)
+                        targets = list(dict.fromkeys(part.outputs))
+                        if autosave is not None:
+                            for output in targets:
+                                autosave.mark_changed(output)  # Their input lists change
+                            autosave.mark_removed(part)
+                        changed = board.remove(part)
+                        for target in targets:  # Their remaining inputs move up a pin
+                            for rect in wires.refresh(target):
+                                damage.add_world(rect)
+                        profiler.forget(part)
+                        damage_changed(damage, changed)
+                        if part is dragging_component:
+                            dragging_component = None
+                        if part is start_component:
+                            connecting = False
+                            start_component = None
+                elif event.key in FAN_IN_KEYS:
+                    # Add or remove an input pin on the gate (or a stage on the register) under the mouse
+                    component = pick_component(spatial_index, camera.to_world(pygame.mouse.get_pos()), (Gate, Sequential))
+                    if component is not None:
+                        damage.add_world(component.bounds())
+                        if isinstance(component, Gate):
+                            changed = component.set_fan_in(component.max_inputs + FAN_IN_KEYS[event.key])
+                        else:
+                            changed = component.set_width(component.width + FAN_IN_KEYS[event.key])
+                        spatial_index.move(component, component.bounds())
+                        for rect in wires.refresh(component):  # Pins moved
+                            damage.add_world(rect)
+                        damage.add_world(component.bounds())
+                        damage_changed(damage, changed)
+                        if autosave is not None:
+                            autosave.mark_changed(component)
+                elif event.key == RUN_KEY:
+                    scheduler.toggle()
+                    update_caption(scheduler, camera)
+                elif event.key == STEP_KEY:
+                    changed = scheduler.step(board)
+                    mark_state_changed(autosave, changed)
+                    damage_changed(damage, changed)
+                elif event.key in RATE_KEYS:
+                    scheduler.set_rate(scheduler.tick_rate * RATE_KEYS[event.key])
+                    update_caption(scheduler, camera)
+                elif event.key == BLOCK_KEY:
+                    library = block_library(block_paths)
+                    if library:
+                        selected_block = (selected_block + 1) % len(library)
+                        print(f"BLOCK places {library[selected_block]}")
+                elif event.key in PAN_KEYS:
+                    dx, dy = PAN_KEYS[event.key]
+                    camera.pan(dx * PAN_STEP, dy * PAN_STEP)
+                    damage.add_all()
+                elif event.key == HOME_KEY:
+                    camera = damage.camera = Camera()
+                    damage.add_all()
+                    update_caption(scheduler, camera)
+                elif event.key == HUD_KEY:
+                    show_hud = not show_hud
+                    damage.add(HUD_RECT)
+                elif event.key == EXPORT_KEY:
+                    export_profile(profiler, as_csv=bool(event.mod & pygame.KMOD_SHIFT))
+
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                damage.add_all()
+
+        # Run the clock ticks that came due since the last frame
+        changed = scheduler.advance(board)
+        mark_state_changed(autosave, changed)
+        damage_changed(damage, changed)
+        profiler.stop("events")
+
+        # Follow the mouse with the connection in progress
+        new_rubber_band = None
         if connecting and start_component:
-            pygame.draw.line(screen, BLUE, (start_component.rect.right + 20, start_component.rect.centery), pygame.mouse.get_pos(), 2)
-
-        pygame.display.flip()
+            new_rubber_band = (camera.to_screen(start_component.output_pin()), pygame.mouse.get_pos())
+        if new_rubber_band != rubber_band:
+            for band in (rubber_band, new_rubber_band):
+                if band:
+                    damage.add(line_rect(*band))
+            rubber_band = new_rubber_band
+
+        if show_hud and pygame.time.get_ticks() - last_hud_refresh >= HUD_REFRESH_MS:
+            damage.add(HUD_RECT)
+            last_hud_refresh = pygame.time.get_ticks()
+
+        if not dirty_rect_rendering and damage:
+            damage.add_all()
+        regions = []
+        if damage:
+            profiler.start()
+            regions = damage.pop()
+            if show_hud and HUD_RECT.collidelist(regions) != -1:
+                regions.append(HUD_RECT)  # Redraw the whole panel over the fresh scene
+            draw_scene(screen, spatial_index, wires, camera, regions, rubber_band, profiler if show_hud else None)
+            if show_hud:
+                draw_hud(screen, profiler)
+            pygame.display.update(regions)
+            profiler.stop("draw")
+        profiler.end_frame(len(regions))
+
+        if autosave is not None and autosave and pygame.time.get_ticks() - last_autosave >= AUTOSAVE_INTERVAL_MS:
+            autosave.flush(board)
+            last_autosave = pygame.time.get_ticks()
+
+        clock.tick(frame_cap)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Interactive logic gate designer")
+    parser.add_argument("netlist", nargs="?", help="netlist file to open")
+    parser.add_argument("--block", action="append", default=[], help=f"netlist the BLOCK button can place as a subcircuit (repeatable; default: every netlist in {BLOCK_DIR})")
+    parser.add_argument("--fps", type=int, default=FRAME_CAP, help=f"frame rate cap (default: {FRAME_CAP})")
+    parser.add_argument("--tick-rate", type=int, default=DEFAULT_TICK_RATE, help=f"clock ticks per second (default: {DEFAULT_TICK_RATE})")
+    args = parser.parse_args()
+    main(args.netlist, frame_cap=args.fps, tick_rate=args.tick_rate, block_paths=args.block)
@@ -0,0 +1,473 @@
+import argparse
+import csv
+from collections import defaultdict
+
+import numpy as np
+
+from bitparallel_truth_table import truth_table
+from circuit import GATE_TYPES, default_fan_in
+from netlist_format import build_circuit, component_record, load_netlist, save_netlist
+
+# Logic minimization: shrink a circuit (or a truth table) to an equivalent netlist with fewer
+# gates, so fewer gates are evaluated per input change.
+#
+# Two-level minimization turns each output column of a truth table into a small sum of
+# products: exact Quine-McCluskey for up to QM_MAX_INPUTS inputs, an Espresso-style
+# expand/irredundant heuristic above that. The cover is then built back into a netlist of
+# NOT gates, one wide AND gate per product term and OUTPUT components (an OUTPUT ORs all of
+# its inputs).
+#
+# simplify_circuit() works on the drawn netlist itself instead: constant propagation,
+# removal of buffers and double inversions, and removal of gates that feed no output.
+# reduce_circuit() tries both and keeps whichever has fewer gates: XOR-heavy logic such as
+# parity trees and adders is far larger as a sum of products than as drawn.
+#
+# A cube is a (value, mask) pair over the row index bits: input i is row bit
+# (num_inputs - 1 - i), the same order as the truth tables. Bits set in `mask` are literals
+# and `value` holds their polarity.
+
+QM_MAX_INPUTS = 10
+LEVEL_SPACING_X = 130
+ROW_SPACING_Y = 80
+
+# Gates without inputs evaluate to a constant (see circuit.Gate.evaluate)
+CONSTANT_TYPES = {0: "AND", 1: "NAND"}
+
+
+# Function to make a netlist record, storing the fan-in only when it is not the default
+def _record(component_id, kind, x, y, inputs):
+    fan_in = None
+    if kind in GATE_TYPES and inputs and len(inputs) != default_fan_in(kind):
+        fan_in = len(inputs)
+    return (component_id, kind, x, y, inputs, fan_in)
+
+
+def _cube_covers(cube, rows):
+    value, mask = cube
+    return (rows & mask) == value
+
+
+# Function to find every prime implicant of a function (Quine-McCluskey merging)
+def prime_implicants(minterms, num_inputs):
+    full = (1 << num_inputs) - 1
+    current = {(int(m), full) for m in minterms}
+    primes = set()
+    while current:
+        by_mask = defaultdict(set)
+        for value, mask in current:
+            by_mask[mask].add(value)
+
+        merged = set()
+        used = set()
+        for mask, values in by_mask.items():
+            for value in values:
+                for bit in range(num_inputs):
+                    b = 1 << bit
+                    if mask & b and not value & b and value | b in values:
+                        merged.add((value, mask & ~b))
+                        used.add((value, mask))
+                        used.add((value | b, mask))
+        primes |= current - used
+        current = merged
+    return primes
+
+
+# Function to pick a small set of primes covering every ON minterm: essential primes first,
+# then greedily the prime covering most of what is left (fewest literals on ties)
+def select_cover(primes, on_minterms):
+    primes = sorted(primes, key=lambda cube: (bin(cube[1]).count("1"), cube))
+    uncovered = set(int(m) for m in on_minterms)
+    covering = defaultdict(list)
+    for prime in primes:
+        for m in uncovered:
+            if (m & prime[1]) == prime[0]:
+                covering[m].append(prime)
+
+    cover = []
+    for candidates in covering.values():
+        if len(candidates) == 1 and candidates[0] not in cover:
+            cover.append(candidates[0])
+    for prime in cover:
+        uncovered = {m for m in uncovered if (m & prime[1]) != prime[0]}
+
+    while uncovered:
+        best = max(
+            primes,
+            key=lambda cube: sum(1 for m in uncovered if (m & cube[1]) == cube[0]),
+        )
+        cover.append(best)
+        uncovered = {m for m in uncovered if (m & best[1]) != best[0]}
+    return cover
+
+
+# Function to minimize with an Espresso-style heuristic: expand each uncovered ON minterm into
+# as large a cube as the OFF set allows, then drop cubes made redundant by the others
+def espresso(on_minterms, off_minterms, num_inputs):
+    on_minterms = np.asarray(on_minterms, dtype=np.int64)
+    off_minterms = np.asarray(off_minterms, dtype=np.int64)
+    covered = np.zeros(len(on_minterms), dtype=bool)
+    cover = []
+
+    while not covered.all():
+        seed = int(on_minterms[np.argmin(covered)])
+        value, mask = seed, (1 << num_inputs) - 1
+        # Drop literals one at a time, keeping each drop that does not reach the OFF set
+        for bit in range(num_inputs - 1, -1, -1):
+            b = 1 << bit
+            wider = (value & ~b, mask & ~b)
+            if not _cube_covers(wider, off_minterms).any():
+                value, mask = wider
+        cover.append((value, mask))
+        covered |= _cube_covers((value, mask), on_minterms)
+
+    # Irredundant: remove cubes whose ON minterms are all covered by other cubes
+    counts = np.zeros(len(on_minterms), dtype=np.int64)
+    hits = [_cube_covers(cube, on_minterms) for cube in cover]
+    for cube_hits in hits:
+        counts += cube_hits
+    kept = []
+    for cube, cube_hits in sorted(zip(cover, hits), key=lambda item: item[1].sum()):
+        if (counts[cube_hits] > 1).all():
+            counts -= cube_hits
+        else:
+            kept.append(cube)
+    return kept
+
+
+# Function to minimize one output column of a truth table (first input = most significant
+# row bit) into a list of cubes. `dont_cares` optionally marks rows that may be either value.
+def minimize(column, num_inputs, dont_cares=None):
+    column = np.asarray(column, dtype=bool)
+    rows = np.arange(len(column), dtype=np.int64)
+    dont_cares = (
+        np.zeros(len(column), dtype=bool)
+        if dont_cares is None
+        else np.asarray(dont_cares, dtype=bool)
+    )
+    on = rows[column & ~dont_cares]
+    off = rows[~column & ~dont_cares]
+    if len(on) == 0:
+        return []
+    if len(off) == 0:
+        return [(0, 0)]  # Constant 1
+    if num_inputs <= QM_MAX_INPUTS:
+        return select_cover(prime_implicants(rows[column | dont_cares], num_inputs), on)
+    return espresso(on, off, num_inputs)
+
+
+# Builds netlist records for sum-of-products covers, sharing inverters and product terms
+class _CoverBuilder:
+    def __init__(self, num_inputs):
+        self.records = []
+        self.next_id = 0
+        self.level_rows = defaultdict(int)
+        self.inputs = [self.add("INPUT", 0, []) for _ in range(num_inputs)]
+        self.inverted = {}
+        self.products = {}
+        self.constants = {}
+
+    def add(self, kind, level, inputs):
+        component_id = self.next_id
+        self.next_id += 1
+        x = 10 + level * LEVEL_SPACING_X
+        y = 10 + self.level_rows[level] * ROW_SPACING_Y
+        self.level_rows[level] += 1
+        self.records.append(_record(component_id, kind, x, y, inputs))
+        return component_id
+
+    def literal(self, position, positive):
+        if positive:
+            return self.inputs[position], 0
+        if position not in self.inverted:
+            self.inverted[position] = self.add("NOT", 1, [self.inputs[position]])
+        return self.inverted[position], 1
+
+    def constant(self, value):
+        if value not in self.constants:
+            self.constants[value] = self.add(CONSTANT_TYPES[value], 1, [])
+        return self.constants[value], 1
+
+    # Function to AND a list of (signal, level) pairs with one gate of that fan-in
+    def and_gate(self, signals):
+        if len(signals) == 1:
+            return signals[0]
+        level = max(level for _, level in signals) + 1
+        return self.add("AND", level, [signal for signal, _ in signals]), level
+
+    def product(self, cube, num_inputs):
+        if cube not in self.products:
+            value, mask = cube
+            if mask == 0:
+                self.products[cube] = self.constant(1)
+            else:
+                literals = [
+                    self.literal(
+                        position, bool(value >> (num_inputs - 1 - position) & 1)
+                    )
+                    for position in range(num_inputs)
+                    if mask >> (num_inputs - 1 - position) & 1
+                ]
+                self.products[cube] = self.and_gate(literals)
+        return self.products[cube]
+
+
+# Function to build netlist records from one cover per output (see minimize)
+def cover_to_records(covers, num_inputs):
+    builder = _CoverBuilder(num_inputs)
+    terms = [[builder.product(cube, num_inputs) for cube in cover] for cover in covers]
+    output_level = 1 + max(
+        (level for products in terms for _, level in products), default=0
+    )
+    for products in terms:
+        builder.add("OUTPUT", output_level, [signal for signal, _ in products])
+    return builder.records
+
+
+# Function to minimize a whole truth table (a 0/1 matrix, input columns then output columns)
+def minimize_truth_table(table, num_inputs, classes=None):
+    table = np.asarray(table)
+    covers = [
+        minimize(table[:, column], num_inputs)
+        for column in range(num_inputs, table.shape[1])
+    ]
+    return build_circuit(cover_to_records(covers, num_inputs), classes)
+
+
+# Function to minimize a loop-free circuit by going through its truth table
+def minimize_circuit(circuit, classes=None):
+    table = truth_table(circuit.inputs, circuit.outputs)
+    return minimize_truth_table(table, len(circuit.inputs), classes)
+
+
+# Function to fold one gate given its resolved input signals. A signal is ("const", value) or
+# ("node", id). Returns ("const", value), ("alias", signal) or ("gate", type, signals).
+def _fold_gate(gate_type, signals, fan_in):
+    constants = [signal[1] for signal in signals if signal[0] == "const"]
+    variables = [signal for signal in signals if signal[0] == "node"]
+    inverted = gate_type in ("NAND", "NOR", "XNOR", "NOT")
+
+    def result(kind, *args):
+        # Apply the gate's output inversion to a folded result
+        if not inverted or (kind == "gate" and args[0] in ("NAND", "NOR", "XNOR")):
+            return (kind,) + args
+        if kind == "const":
+            return ("const", 1 - args[0])
+        return ("gate", "NOT", [args[0]])
+
+    if gate_type in ("AND", "NAND"):
+        if len(signals) != fan_in or 0 in constants:
+            return result("const", 0)
+        unique = list(dict.fromkeys(variables))
+        if not unique:
+            return result("const", 1)
+        if len(unique) == 1:
+            return result("alias", unique[0])
+        return ("gate", gate_type, unique)
+    if gate_type in ("OR", "NOR"):
+        if 1 in constants:
+            return result("const", 1)
+        unique = list(dict.fromkeys(variables))
+        if not unique:
+            return result("const", 0)
+        if len(unique) == 1:
+            return result("alias", unique[0])
+        return ("gate", gate_type, unique)
+    if gate_type in ("XOR", "XNOR"):
+        if len(signals) != fan_in:
+            return ("const", 0)  # Both read 0 until every pin is connected
+        # Constants and pairs of the same signal only flip or keep the parity
+        invert = (sum(constants) + (gate_type == "XNOR")) % 2
+        odd = [
+            signal for signal in dict.fromkeys(variables) if variables.count(signal) % 2
+        ]
+        if not odd:
+            return ("const", invert)
+        if len(odd) == 1:
+            return ("gate", "NOT", odd) if invert else ("alias", odd[0])
+        return ("gate", "XNOR" if invert else "XOR", odd)
+    if gate_type in ("NOT", "BUFFER"):
+        if len(signals) != 1:
+            return ("const", 0)
+        if constants:
+            return result("const", constants[0])
+        return result("alias", variables[0])
+    raise ValueError(f"Unknown gate type: {gate_type}")
+
+
+# Function to simplify a circuit's netlist without changing its behaviour: fold constants,
+# bypass buffers, cancel double inversions and drop gates that feed no output.
+# Components on feedback loops, clocks and clocked components are kept as they are.
+# Returns netlist records.
+def simplify_circuit(circuit):
+    engine = circuit.engine
+    engine.levelize()
+    on_loop = {id(member) for group in engine.loops() for member in group}
+    records = {}
+    resolved = {}  # Component id -> signal
+    next_id = circuit.next_id
+
+    def materialize(signal, near):
+        # Turn a constant into a node (an input-less AND or NAND gate) when something needs a wire
+        nonlocal next_id
+        if signal[0] == "node":
+            return signal[1]
+        key = ("const", signal[1])
+        if key not in records:
+            records[key] = _record(
+                next_id,
+                CONSTANT_TYPES[signal[1]],
+                near[2] - LEVEL_SPACING_X,
+                near[3],
+                [],
+            )
+            next_id += 1
+        return records[key][0]
+
+    def signal_of(component):
+        return resolved.get(component.id, ("node", component.id))
+
+    # Clocked components go last: their inputs may come from anywhere in the netlist
+    order = engine.topological_order()
+    order = [
+        component for component in order if not getattr(component, "clocked", False)
+    ] + [component for component in order if getattr(component, "clocked", False)]
+    for component in order:
+        record = component_record(component)
+        component_id, kind, x, y, inputs, fan_in, state = record
+        if kind == "INPUT":
+            records[component_id] = record
+            continue
+        if kind not in GATE_TYPES or id(component) in on_loop:
+            signals = [signal_of(source) for source in component.inputs]
+            if kind == "OUTPUT":
+                if ("const", 1) in signals:
+                    signals = [("const", 1)]
+                signals = list(
+                    dict.fromkeys(
+                        signal for signal in signals if signal != ("const", 0)
+                    )
+                )
+            inputs = [materialize(signal, record) for signal in signals]
+            records[component_id] = (
+                component_id,
+                kind,
+                x,
+                y,
+                inputs,
+                fan_in if kind != "OUTPUT" else None,
+                state,
+            )
+            continue
+
+        folded = _fold_gate(
+            kind,
+            [signal_of(source) for source in component.inputs],
+            component.max_inputs,
+        )
+        if folded[0] == "gate" and folded[1] == "NOT":
+            source = folded[2][0]
+            source_record = records.get(source[1])
+            if source_record is not None and source_record[1] == "NOT":
+                folded = ("alias", ("node", source_record[4][0]))  # NOT(NOT(x)) is x
+        if folded[0] == "const":
+            resolved[component_id] = folded
+        elif folded[0] == "alias":
+            resolved[component_id] = folded[1]
+        else:
+            records[component_id] = _record(
+                component_id, folded[1], x, y, [signal[1] for signal in folded[2]]
+            )
+
+    # Keep inputs plus everything an output depends on
+    by_id = {record[0]: record for record in records.values()}
+    outputs = [record for record in by_id.values() if record[1] == "OUTPUT"]
+    if not outputs:
+        return list(by_id.values())
+    live = set()
+    stack = [record[0] for record in outputs]
+    while stack:
+        component_id = stack.pop()
+        if component_id not in live:
+            live.add(component_id)
+            stack.extend(by_id[component_id][4])
+    live.update(record[0] for record in by_id.values() if record[1] == "INPUT")
+
+    order = {component.id: n for n, component in enumerate(circuit.components)}
+    kept = [record for record in by_id.values() if record[0] in live]
+    return sorted(kept, key=lambda record: order.get(record[0], len(order)))
+
+
+def _count_gates(circuit):
+    return sum(1 for component in circuit.components if hasattr(component, "gate_type"))
+
+
+# Function to shrink a circuit as far as possible without ever growing it: the simplified
+# netlist, or the two-level cover when that has fewer gates (loop-free circuits only)
+def reduce_circuit(circuit, classes=None):
+    simplified = build_circuit(simplify_circuit(circuit), classes)
+    if circuit.engine.loops() or circuit.sequential:
+        return simplified
+    minimized = minimize_circuit(circuit, classes)
+    return (
+        minimized if _count_gates(minimized) < _count_gates(simplified) else simplified
+    )
+
+
+# Function to read a truth table CSV (input columns then output columns, with a header row).
+# Rows may come in any order, but every input combination must appear exactly once; the
+# table is returned in counting order.
+def read_truth_table_csv(path):
+    with open(path) as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = np.array(
+            [[int(value) for value in row] for row in reader if row], dtype=np.uint8
+        )
+    num_inputs = sum(1 for name in header if name.lower().startswith("input"))
+    expected = 1 << num_inputs
+    if len(rows) != expected:
+        raise ValueError(
+            f"{path}: expected {expected} rows for {num_inputs} inputs, found {len(rows)}"
+        )
+    weights = 1 << np.arange(num_inputs - 1, -1, -1, dtype=np.int64)
+    order = rows[:, :num_inputs].astype(np.int64) @ weights
+    if len(np.unique(order)) != expected:
+        raise ValueError(f"{path}: some input combinations are repeated or missing")
+    table = np.empty_like(rows)
+    table[order] = rows
+    return table, num_inputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Minimize a circuit or truth table into a smaller netlist"
+    )
+    parser.add_argument("source", help="netlist file, or a truth table .csv")
+    parser.add_argument(
+        "-o", "--output", required=True, help="minimized netlist (.json or binary)"
+    )
+    parser.add_argument(
+        "--simplify-only",
+        action="store_true",
+        help="keep the drawn structure, only fold constants, buffers and double inversions",
+    )
+    args = parser.parse_args(argv)
+
+    if args.source.endswith(".csv"):
+        table, num_inputs = read_truth_table_csv(args.source)
+        result = minimize_truth_table(table, num_inputs)
+        print(f"Minimized {len(table)} truth table rows")
+    else:
+        circuit = load_netlist(args.source)
+        if args.simplify_only:
+            result = build_circuit(simplify_circuit(circuit))
+        else:
+            result = reduce_circuit(circuit)
+        print(f"Gates: {_count_gates(circuit)} -> {_count_gates(result)}")
+
+    save_netlist(result, args.output)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
+from waveform_viewer import WaveformViewer
+
 # Time period for the signals
 time = np.linspace(0, 10, 1000)
 
@@ -19,36 +20,19 @@ C = np.where((np.sin(2 * np.pi * 0.25 * time) > 0), 1, 0)  # Signal C (lower fre
 # OR gate output (Z)
 Z_or = A | B | C  # Logical OR operation of A, B, and C
 
-# Plotting the signals
-plt.figure(figsize=(12, 8))
+# Plotting the signals (only the transitions are drawn, re-decimated on zoom)
+viewer = WaveformViewer(4, figsize=(12, 8))
 
 # Plot A
-plt.subplot(4, 1, 1)
-plt.plot(time, A, label='A', color='blue')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal A')
-plt.grid(True)
+viewer.add_signal(0, A, x=time, title='Signal A', label='A', color='blue')
 
 # Plot B
-plt.subplot(4, 1, 2)
-plt.plot(time, B, label='B', color='orange')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal B')
-plt.grid(True)
+viewer.add_signal(1, B, x=time, title='Signal B', label='B', color='orange')
 
 # Plot C
-plt.subplot(4, 1, 3)
-plt.plot(time, C, label='C', color='red')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal C')
-plt.grid(True)
+viewer.add_signal(2, C, x=time, title='Signal C', label='C', color='red')
 
 # Plot Z (output of OR gate)
-plt.subplot(4, 1, 4)
-plt.plot(time, Z_or, label='Z (A OR B OR C)', color='green')
-plt.ylim(-0.5, 1.5)
-plt.title('Output Z (A OR B OR C)')
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
+viewer.add_signal(3, Z_or, x=time, title='Output Z (A OR B OR C)', label='Z (A OR B OR C)', color='green')
+
+viewer.show()
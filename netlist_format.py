@@ -0,0 +1,387 @@
+import json
+import os
+import struct
+
+from circuit import (
+    DEFAULT_REGISTER_WIDTH,
+    GATE_TYPES,
+    SEQUENTIAL_TYPES,
+    Circuit,
+    component_type,
+    create_component,
+    default_fan_in,
+)
+
+# Versioned netlist files for the logic gate designer.
+#
+# JSON form (".json"): one JSON object per line, so files diff cleanly and load as a stream.
+#   {"format": "ee120-netlist", "version": 1}
+#   {"id": 0, "type": "INPUT", "x": 10, "y": 100, "inputs": [], "state": 1}
+#   {"id": 2, "type": "AND", "x": 200, "y": 100, "inputs": [0, 1]}
+#   {"id": 3, "type": "OR", "x": 200, "y": 200, "inputs": [0, 1], "fan_in": 4}
+#   {"id": 5, "type": "REGISTER", "x": 400, "y": 100, "inputs": [3, 4], "fan_in": 8, "state": 37}
+#   {"id": 6, "type": "SUBCIRCUIT", "x": 600, "y": 100, "inputs": [0, 1], "netlist": "blocks/half_adder.json"}
+#   {"id": 7, "type": "PIN", "x": 692, "y": 124, "inputs": [6], "fan_in": 1}
+# "inputs" lists the driving component ids in pin order; "fan_in" (the number of gate input
+# pins, a register's width, or which block output a pin is) is only written when it differs
+# from the type's default. Blocks name the netlist file they wrap in "netlist", relative to
+# the directory of the file that uses them, so a board and its blocks can move together.
+# Inputs, clocks and sequential parts save their "state" (the level, or a flip-flop's or
+# register's contents) when it is not zero, so a board reloads exactly as it was left.
+#
+# Binary form (any other extension, ".eenl" by convention): a header followed by one
+# fixed-size record per component plus its input ids, all little-endian.
+#   header: magic b"EENL", version u16, component count u32
+#   record: id u32, type code u8, x i32, y i32, input count u16, fan-in u8 (0 = default),
+#           input ids u32 * count
+#   INPUT, CLOCK and sequential records are followed by their state (u32).
+# Version 1 files (no fan-in byte, 2-input gates only) are still read. Version 3 added the
+# CLOCK and sequential types; their type codes come after the gates, so the layout is as in 2.
+# Version 4 added SUBCIRCUIT and PIN; a SUBCIRCUIT record is followed by its netlist path
+# (length u16, UTF-8 bytes).
+#
+# Records are (id, type, x, y, input ids, fan-in[, state]) tuples, fan-in None meaning the
+# default and a missing or None state meaning reset; for SUBCIRCUIT records the fan-in slot
+# holds the netlist path (absolute in memory, relative to `base_dir` in files).
+
+FORMAT_NAME = "ee120-netlist"
+FORMAT_VERSION = 4
+BINARY_MAGIC = b"EENL"
+JOURNAL_SUFFIX = ".journal"
+PREVIOUS_SUFFIX = ".prev"
+
+TYPE_CODES = (
+    ("INPUT", "OUTPUT")
+    + GATE_TYPES
+    + ("CLOCK",)
+    + SEQUENTIAL_TYPES
+    + ("SUBCIRCUIT", "PIN")
+)
+_CODE_OF = {name: code for code, name in enumerate(TYPE_CODES)}
+STATE_TYPES = ("INPUT", "CLOCK") + SEQUENTIAL_TYPES  # Types whose state is saved
+
+_HEADER = struct.Struct("<4sHI")
+_RECORD_V1 = struct.Struct("<IBiiH")
+_RECORD = struct.Struct("<IBiiHB")
+_PATH_LENGTH = struct.Struct("<H")
+_STATE = struct.Struct("<I")
+
+
+# Function to describe one component as a (id, type, x, y, input ids, fan-in, state) record.
+# Block paths are made relative to `base_dir` when one is given.
+def component_record(component, base_dir=None):
+    kind = component_type(component)
+    fan_in = None
+    if kind in GATE_TYPES and component.max_inputs != default_fan_in(kind):
+        fan_in = component.max_inputs
+    elif kind == "REGISTER" and component.width != DEFAULT_REGISTER_WIDTH:
+        fan_in = component.width
+    elif kind == "SUBCIRCUIT":
+        if component.definition.path is None:
+            raise ValueError("Only subcircuits loaded from a netlist file can be saved")
+        fan_in = component.definition.path
+        if base_dir is not None:
+            fan_in = os.path.relpath(fan_in, base_dir)
+    elif kind == "PIN" and component.output_index:
+        fan_in = component.output_index
+    state = None
+    if kind in SEQUENTIAL_TYPES:
+        state = component.bits
+    elif kind in STATE_TYPES:
+        state = int(component.state)
+    return (
+        component.id,
+        kind,
+        component.rect.x,
+        component.rect.y,
+        [source.id for source in component.inputs],
+        fan_in,
+        state,
+    )
+
+
+# Function to get the saved state of a record (None for records without one)
+def _record_state(record):
+    return record[6] if len(record) > 6 else None
+
+
+def _record_fields(record):
+    component_id, kind, x, y, inputs, fan_in = record[:6]
+    data = {"id": component_id, "type": kind, "x": x, "y": y, "inputs": inputs}
+    if kind == "SUBCIRCUIT":
+        data["netlist"] = fan_in
+    elif fan_in is not None:
+        data["fan_in"] = fan_in
+    if _record_state(record):
+        data["state"] = _record_state(record)
+    return data
+
+
+def _record_to_json(record):
+    return json.dumps(_record_fields(record))
+
+
+def _record_from_json(data):
+    return (
+        data["id"],
+        data["type"],
+        data["x"],
+        data["y"],
+        data.get("inputs", []),
+        data.get("netlist", data.get("fan_in")),
+        data.get("state"),
+    )
+
+
+# Function to check a file header and refuse versions this code does not understand
+def _check_version(version):
+    if version > FORMAT_VERSION:
+        raise ValueError(
+            f"Netlist version {version} is newer than supported version {FORMAT_VERSION}"
+        )
+
+
+# Function to write a circuit as JSON lines
+def write_json(circuit, f, base_dir=None):
+    f.write(json.dumps({"format": FORMAT_NAME, "version": FORMAT_VERSION}) + "\n")
+    for component in circuit.components:
+        f.write(_record_to_json(component_record(component, base_dir)) + "\n")
+
+
+# Function to write a circuit in the compact binary form
+def write_binary(circuit, f, base_dir=None):
+    f.write(_HEADER.pack(BINARY_MAGIC, FORMAT_VERSION, len(circuit.components)))
+    for component in circuit.components:
+        component_id, kind, x, y, inputs, fan_in, state = component_record(
+            component, base_dir
+        )
+        path = fan_in.encode() if kind == "SUBCIRCUIT" else None
+        f.write(
+            _RECORD.pack(
+                component_id,
+                _CODE_OF[kind],
+                x,
+                y,
+                len(inputs),
+                0 if path else fan_in or 0,
+            )
+        )
+        if inputs:
+            f.write(struct.pack(f"<{len(inputs)}I", *inputs))
+        if path:
+            f.write(_PATH_LENGTH.pack(len(path)) + path)
+        if kind in STATE_TYPES:
+            f.write(_STATE.pack(state))
+
+
+# Function to stream records out of a JSON netlist (versioned lines, or the older single
+# {"components": [...]} document)
+def iter_json_records(f):
+    first = f.readline()
+    header = json.loads(first) if first.strip() else {}
+    if header.get("format") != FORMAT_NAME:
+        # Unversioned document: the whole file is one JSON object
+        document = json.loads(first + f.read())
+        for data in document["components"]:
+            yield _record_from_json(data)
+        return
+
+    _check_version(header["version"])
+    for line in f:
+        if line.strip():
+            yield _record_from_json(json.loads(line))
+
+
+# Function to stream records out of a binary netlist
+def iter_binary_records(f):
+    magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary netlist file")
+    _check_version(version)
+    for _ in range(count):
+        if version == 1:
+            component_id, code, x, y, num_inputs = _RECORD_V1.unpack(
+                f.read(_RECORD_V1.size)
+            )
+            fan_in = 0
+        else:
+            component_id, code, x, y, num_inputs, fan_in = _RECORD.unpack(
+                f.read(_RECORD.size)
+            )
+        inputs = (
+            list(struct.unpack(f"<{num_inputs}I", f.read(4 * num_inputs)))
+            if num_inputs
+            else []
+        )
+        kind = TYPE_CODES[code]
+        if kind == "SUBCIRCUIT":
+            (length,) = _PATH_LENGTH.unpack(f.read(_PATH_LENGTH.size))
+            fan_in = f.read(length).decode()
+        state = None
+        if kind in STATE_TYPES:
+            (state,) = _STATE.unpack(f.read(_STATE.size))
+        yield (component_id, kind, x, y, inputs, fan_in or None, state)
+
+
+# Function to build a circuit from records in a single pass (connections are wired after
+# every component exists, since records may refer to components further down the file).
+# Relative block paths are resolved against `base_dir` (the current directory if None).
+def build_circuit(records, classes=None, base_dir=None):
+    circuit = Circuit()
+    by_id = {}
+    pending = []
+    for record in records:
+        component_id, kind, x, y, inputs, fan_in = record[:6]
+        if kind == "SUBCIRCUIT" and base_dir is not None:
+            fan_in = os.path.join(base_dir, fan_in)  # Unchanged if already absolute
+        component = create_component(kind, x, y, classes, fan_in)
+        component.id = component_id
+        state = _record_state(record)
+        if state:  # Before wiring, so fan-out counts start right
+            if kind in SEQUENTIAL_TYPES:
+                component.load(state & ((1 << component.width) - 1))
+            else:
+                component.set_state(True)
+        by_id[component_id] = component
+        circuit.components.append(component)
+        circuit.engine.add(component)
+        if inputs:
+            pending.append((component, inputs))
+        circuit.next_id = max(circuit.next_id, component_id + 1)
+
+    for target, inputs in pending:
+        for source_id in inputs:
+            by_id[source_id].connect_to(target)
+
+    circuit.engine.invalidate()
+    circuit.engine.settle(circuit.components)
+    return circuit
+
+
+# Function to save a circuit; ".json" files use the JSON form, anything else the binary form
+def save_netlist(circuit, path):
+    temp_path = path + ".tmp"
+    base_dir = os.path.dirname(os.path.abspath(path))
+    if path.endswith(".json"):
+        with open(temp_path, "w") as f:
+            write_json(circuit, f, base_dir)
+    else:
+        with open(temp_path, "wb") as f:
+            write_binary(circuit, f, base_dir)
+    os.replace(temp_path, path)  # Never leave a half-written netlist behind
+
+
+# Function to stream the records of a netlist file, whichever form it is in
+def iter_netlist_records(path):
+    with open(path, "rb") as f:
+        is_binary = f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    if is_binary:
+        with open(path, "rb") as f:
+            yield from iter_binary_records(f)
+    else:
+        with open(path) as f:
+            yield from iter_json_records(f)
+
+
+# Function to load a netlist file, replaying its autosave journal if one sits next to it
+def load_netlist(path, classes=None):
+    records = iter_netlist_records(path)
+    if os.path.exists(path + JOURNAL_SUFFIX):
+        records = _replay_journal(records, path + JOURNAL_SUFFIX)
+    return build_circuit(records, classes, os.path.dirname(os.path.abspath(path)))
+
+
+def _replay_journal(records, journal_path):
+    by_id = {record[0]: record for record in records}
+    with open(journal_path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["op"] == "put":
+                record = _record_from_json(entry)
+                by_id[record[0]] = record
+            elif entry["op"] == "del":
+                by_id.pop(entry["id"], None)
+    return by_id.values()
+
+
+# Incremental autosave: a full snapshot plus an append-only journal of changed components.
+# Each flush only writes the components marked since the previous flush; once the journal
+# grows past the size of the circuit it is folded back into a fresh snapshot.
+# An autosave left by an earlier session is kept (snapshot and journal) as `path + ".prev"`
+# when the first snapshot is written, so it can still be recovered with load_netlist.
+class AutosaveJournal:
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.previous_path = path + PREVIOUS_SUFFIX
+        self.base_dir = os.path.dirname(
+            os.path.abspath(path)
+        )  # Block paths are relative to the snapshot
+        self.changed = {}
+        self.removed = set()
+        self.journal_entries = 0
+        self.has_snapshot = False
+
+    def __bool__(self):
+        return bool(self.changed or self.removed)
+
+    def mark_changed(self, component):
+        self.changed[component.id] = component
+        self.removed.discard(component.id)
+
+    def mark_removed(self, component):
+        self.changed.pop(component.id, None)
+        self.removed.add(component.id)
+
+    # Function to move an earlier session's autosave (and its journal) out of the way
+    def rotate(self):
+        for path in (self.previous_path, self.previous_path + JOURNAL_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.exists(self.path):
+            os.replace(self.path, self.previous_path)
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, self.previous_path + JOURNAL_SUFFIX)
+
+    # Function to write a fresh snapshot and start an empty journal
+    def compact(self, circuit):
+        if not self.has_snapshot:
+            self.rotate()
+        save_netlist(circuit, self.path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.changed.clear()
+        self.removed.clear()
+        self.journal_entries = 0
+        self.has_snapshot = True
+
+    # Function to append only what changed since the last flush
+    def flush(self, circuit):
+        if not self.has_snapshot or self.journal_entries > max(
+            len(circuit.components), 64
+        ):
+            self.compact(circuit)
+            return
+        if not self:
+            return
+
+        with open(self.journal_path, "a") as f:
+            for component in self.changed.values():
+                f.write(
+                    json.dumps(
+                        dict(
+                            op="put",
+                            **_record_fields(
+                                component_record(component, self.base_dir)
+                            ),
+                        )
+                    )
+                    + "\n"
+                )
+            for component_id in self.removed:
+                f.write(json.dumps({"op": "del", "id": component_id}) + "\n")
+        self.journal_entries += len(self.changed) + len(self.removed)
+        self.changed.clear()
+        self.removed.clear()
@@ -1,7 +1,8 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from waveform_viewer import WaveformViewer
+
 # Time period for the signals
 time = np.linspace(0, 10, 1000)
 
@@ -26,29 +27,16 @@ df = pd.DataFrame(data)
 # Display the first few rows of the table
 print(df.head(10))
 
-# Plotting the signals
-plt.figure(figsize=(10, 6))
+# Plotting the signals (only the transitions are drawn, re-decimated on zoom)
+viewer = WaveformViewer(3, figsize=(10, 6))
 
 # Plot A
-plt.subplot(3, 1, 1)
-plt.plot(time, A, label='A', color='blue')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal A')
-plt.grid(True)
+viewer.add_signal(0, A, x=time, title='Signal A', label='A', color='blue')
 
 # Plot B
-plt.subplot(3, 1, 2)
-plt.plot(time, B, label='B', color='orange')
-plt.ylim(-0.5, 1.5)
-plt.title('Signal B')
-plt.grid(True)
+viewer.add_signal(1, B, x=time, title='Signal B', label='B', color='orange')
 
 # Plot Z (output of OR gate)
-plt.subplot(3, 1, 3)
-plt.plot(time, Z_or, label='Z (A OR B)', color='green')
-plt.ylim(-0.5, 1.5)
-plt.title('Output Z (A OR B)')
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+viewer.add_signal(2, Z_or, x=time, title='Output Z (A OR B)', label='Z (A OR B)', color='green')
+
+viewer.show()
@@ -0,0 +1,162 @@
+import collections
+import csv
+import json
+import time
+
+# Frame profiler for the designer.
+# Each frame is split into phases (event handling, simulation, drawing) and logged into a
+# rolling window, together with the engine's evaluation count and the propagation depth of
+# the frame (levels its deepest settle went through). Input toggles are logged with the
+# number of gate evaluations they caused, and per-component draw times are accumulated to
+# find the slowest components to draw. Nothing here imports pygame.
+
+DEFAULT_HISTORY = 600  # Frames kept in the rolling log (10 s at 60 FPS)
+FPS_WINDOW = 1.0  # Seconds of frames the FPS is averaged over
+LOG_FIELDS = (
+    "frame",
+    "time",
+    "events_ms",
+    "sim_ms",
+    "draw_ms",
+    "frame_ms",
+    "evaluations",
+    "max_depth",
+    "regions",
+)
+
+
+class FrameProfiler:
+    def __init__(self, engine=None, history=DEFAULT_HISTORY, timer=time.perf_counter):
+        self.engine = engine
+        self.timer = timer
+        self.frames = collections.deque(maxlen=history)
+        self.toggles = collections.deque(maxlen=history)
+        self.draw_times = {}  # Component -> [total seconds, draws]
+        self.frame_count = 0
+        self.started = timer()
+        self._frame = None
+        self._phase_start = None
+
+    # Function to start timing a frame
+    def begin_frame(self):
+        engine = self.engine
+        self._frame = {
+            "events": 0.0,
+            "draw": 0.0,
+            "start": self.timer(),
+            "settle_seconds": engine.settle_seconds if engine else 0.0,
+            "evaluations": engine.evaluations if engine else 0,
+        }
+        if engine:
+            engine.max_depth = 0
+
+    # Function to start and stop timing a phase ("events" or "draw") of the current frame
+    def start(self):
+        self._phase_start = self.timer()
+
+    def stop(self, phase):
+        self._frame[phase] += self.timer() - self._phase_start
+
+    # Function to finish the frame and append it to the log. Simulation time is the time the
+    # engine spent settling, wherever that happened (event handlers or the clock scheduler),
+    # and is taken out of the events phase.
+    def end_frame(self, regions=0):
+        frame = self._frame
+        self._frame = None
+        now = self.timer()
+        engine = self.engine
+        sim = (engine.settle_seconds - frame["settle_seconds"]) if engine else 0.0
+        self.frames.append(
+            {
+                "frame": self.frame_count,
+                "time": round(frame["start"] - self.started, 6),
+                "events_ms": max(frame["events"] - sim, 0.0) * 1e3,
+                "sim_ms": sim * 1e3,
+                "draw_ms": frame["draw"] * 1e3,
+                "frame_ms": (now - frame["start"]) * 1e3,
+                "evaluations": (
+                    (engine.evaluations - frame["evaluations"]) if engine else 0
+                ),
+                "max_depth": engine.max_depth if engine else 0,
+                "regions": regions,
+            }
+        )
+        self.frame_count += 1
+
+    # Function to log one input toggle: how many evaluations it caused and how deep it went
+    def record_toggle(self, component, evaluations, depth):
+        self.toggles.append(
+            {"component": component.id, "evaluations": evaluations, "depth": depth}
+        )
+
+    # Function to accumulate the time one component took to draw
+    def record_draw(self, component, seconds):
+        entry = self.draw_times.get(component)
+        if entry is None:
+            self.draw_times[component] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    # Function to forget a removed component
+    def forget(self, component):
+        self.draw_times.pop(component, None)
+
+    # Function to list the `count` components with the highest average draw time, as
+    # (component, average seconds) pairs
+    def slowest_components(self, count=5):
+        averages = [
+            (component, total / draws)
+            for component, (total, draws) in self.draw_times.items()
+        ]
+        averages.sort(key=lambda item: item[1], reverse=True)
+        return averages[:count]
+
+    # Function to get the frames per second over the last FPS_WINDOW seconds of frames
+    def fps(self):
+        if len(self.frames) < 2:
+            return 0.0
+        last = self.frames[-1]["time"]
+        recent = [frame for frame in self.frames if last - frame["time"] <= FPS_WINDOW]
+        span = last - recent[0]["time"]
+        return (len(recent) - 1) / span if span > 0 else 0.0
+
+    # Function to average each phase over the frames in the FPS window
+    def phase_averages(self):
+        if not self.frames:
+            return {
+                field: 0.0 for field in ("events_ms", "sim_ms", "draw_ms", "frame_ms")
+            }
+        last = self.frames[-1]["time"]
+        recent = [frame for frame in self.frames if last - frame["time"] <= FPS_WINDOW]
+        return {
+            field: sum(frame[field] for frame in recent) / len(recent)
+            for field in ("events_ms", "sim_ms", "draw_ms", "frame_ms")
+        }
+
+    # Function to get the deepest propagation seen in the log
+    def max_depth(self):
+        return max((frame["max_depth"] for frame in self.frames), default=0)
+
+    # Function to write the rolling frame log; ".csv" paths get CSV, anything else JSON
+    # (with the toggle log and slowest components as well)
+    def export(self, path):
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=LOG_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.frames)
+            return
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "frames": list(self.frames),
+                    "toggles": list(self.toggles),
+                    "slowest_components": [
+                        {"component": component.id, "draw_ms": seconds * 1e3}
+                        for component, seconds in self.slowest_components(20)
+                    ],
+                },
+                f,
+                indent=1,
+            )
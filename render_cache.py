@@ -0,0 +1,239 @@
+from functools import lru_cache
+
+import pygame
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+YELLOW = (255, 255, 0)
+
+# Gate outlines reach 40px left of the body (OR arcs, input stubs), 20px right of it
+# (bubble, output stub) and the 2px strokes spill one pixel over every edge
+SPRITE_MARGIN_LEFT = 42
+SPRITE_MARGIN_RIGHT = 22
+SPRITE_MARGIN_Y = 2
+
+
+# Function to load a font once per size
+@lru_cache(maxsize=None)
+def get_font(size):
+    return pygame.font.Font(None, size)
+
+
+# Function to render a piece of text once per (text, size, color)
+@lru_cache(maxsize=4096)
+def render_text(text, size, color=BLACK):
+    return get_font(size).render(text, True, color)
+
+
+# Function to get the y position of input pin `index` of `fan_in`, spread evenly down the body
+def input_pin_y(rect, index, fan_in):
+    return rect.top + rect.height * (index + 0.5) / fan_in
+
+
+# Function to stroke a gate outline, its pin stubs and its label onto a surface
+def _draw_gate_outline(surface, gate_type, rect, fan_in):
+    if gate_type in ["AND", "NAND"]:
+        pygame.draw.line(
+            surface, BLACK, (rect.left, rect.top), (rect.left, rect.bottom), 2
+        )
+        pygame.draw.line(
+            surface, BLACK, (rect.left, rect.top), (rect.centerx, rect.top), 2
+        )
+        pygame.draw.line(
+            surface, BLACK, (rect.left, rect.bottom), (rect.centerx, rect.bottom), 2
+        )
+        pygame.draw.arc(
+            surface,
+            BLACK,
+            (rect.left, rect.top, rect.width, rect.height),
+            -1.57,
+            1.57,
+            2,
+        )
+        if gate_type == "NAND":
+            pygame.draw.circle(surface, BLACK, (rect.right + 5, rect.centery), 5)
+    elif gate_type in ["OR", "NOR", "XOR", "XNOR"]:
+        pygame.draw.arc(
+            surface,
+            BLACK,
+            (rect.left - 40, rect.top, rect.width + 40, rect.height),
+            -1.57,
+            1.57,
+            2,
+        )
+        pygame.draw.arc(
+            surface, BLACK, (rect.left - 20, rect.top, 40, rect.height), 1.57, 4.71, 2
+        )
+        if gate_type in ["NOR", "XNOR"]:
+            pygame.draw.circle(surface, BLACK, (rect.right + 5, rect.centery), 5)
+        if gate_type in ["XOR", "XNOR"]:
+            pygame.draw.arc(
+                surface,
+                BLACK,
+                (rect.left - 30, rect.top, 40, rect.height),
+                1.57,
+                4.71,
+                2,
+            )
+    elif gate_type in ["NOT", "BUFFER"]:
+        pygame.draw.polygon(
+            surface,
+            BLACK,
+            [
+                (rect.left, rect.top),
+                (rect.left, rect.bottom),
+                (rect.right - 10, rect.centery),
+            ],
+            2,
+        )
+        if gate_type == "NOT":
+            pygame.draw.circle(surface, BLACK, (rect.right, rect.centery), 5)
+
+    # Draw input lines
+    for index in range(fan_in):
+        pin_y = input_pin_y(rect, index, fan_in)
+        pygame.draw.line(surface, BLACK, (rect.left - 20, pin_y), (rect.left, pin_y), 2)
+
+    # Draw output line
+    pygame.draw.line(
+        surface, BLACK, (rect.right, rect.centery), (rect.right + 20, rect.centery), 2
+    )
+
+    # Draw gate label
+    text = render_text(gate_type, 24)
+    surface.blit(text, text.get_rect(center=rect.center))
+
+
+# Function to pre-render one transparent sprite per gate type, size and number of inputs.
+# The sprite is blitted at (rect.left - SPRITE_MARGIN_LEFT, rect.top - SPRITE_MARGIN_Y).
+@lru_cache(maxsize=None)
+def gate_sprite(gate_type, width, height, fan_in):
+    surface = pygame.Surface(
+        (
+            SPRITE_MARGIN_LEFT + width + SPRITE_MARGIN_RIGHT,
+            height + 2 * SPRITE_MARGIN_Y,
+        ),
+        pygame.SRCALPHA,
+    )
+    body = pygame.Rect(SPRITE_MARGIN_LEFT, SPRITE_MARGIN_Y, width, height)
+    _draw_gate_outline(surface, gate_type, body, fan_in)
+    return surface
+
+
+# Function to pre-render the box of a flip-flop or register: body, labelled input pins (the
+# clock pin drawn as a ">" notch) and the output stub, in the same layout as gate_sprite
+@lru_cache(maxsize=None)
+def sequential_sprite(label, pin_labels, width, height):
+    surface = pygame.Surface(
+        (
+            SPRITE_MARGIN_LEFT + width + SPRITE_MARGIN_RIGHT,
+            height + 2 * SPRITE_MARGIN_Y,
+        ),
+        pygame.SRCALPHA,
+    )
+    body = pygame.Rect(SPRITE_MARGIN_LEFT, SPRITE_MARGIN_Y, width, height)
+    pygame.draw.rect(surface, WHITE, body)
+    pygame.draw.rect(surface, BLACK, body, 2)
+    for index, pin_label in enumerate(pin_labels):
+        pin_y = input_pin_y(body, index, len(pin_labels))
+        pygame.draw.line(surface, BLACK, (body.left - 20, pin_y), (body.left, pin_y), 2)
+        if pin_label == ">":
+            pygame.draw.lines(
+                surface,
+                BLACK,
+                False,
+                [
+                    (body.left, pin_y - 6),
+                    (body.left + 8, pin_y),
+                    (body.left, pin_y + 6),
+                ],
+                2,
+            )
+        else:
+            text = render_text(pin_label, 18)
+            surface.blit(text, text.get_rect(midleft=(body.left + 4, pin_y)))
+    pygame.draw.line(
+        surface, BLACK, (body.right, body.centery), (body.right + 20, body.centery), 2
+    )
+    text = render_text(label, 24)
+    surface.blit(text, text.get_rect(midtop=(body.centerx, body.top + 4)))
+    return surface
+
+
+# Function to pre-render the box of a subcircuit block: body, input pin stubs, output stubs
+# running `pin_stub` pixels out to the block's pins, and its name (in a smaller font when it
+# would not fit), in the same layout as gate_sprite
+@lru_cache(maxsize=None)
+def block_sprite(label, num_inputs, num_outputs, width, height, pin_stub):
+    surface = pygame.Surface(
+        (
+            SPRITE_MARGIN_LEFT + width + SPRITE_MARGIN_RIGHT,
+            height + 2 * SPRITE_MARGIN_Y,
+        ),
+        pygame.SRCALPHA,
+    )
+    body = pygame.Rect(SPRITE_MARGIN_LEFT, SPRITE_MARGIN_Y, width, height)
+    pygame.draw.rect(surface, WHITE, body)
+    pygame.draw.rect(surface, BLACK, body, 2)
+    for index in range(num_inputs):
+        pin_y = input_pin_y(body, index, num_inputs)
+        pygame.draw.line(surface, BLACK, (body.left - 20, pin_y), (body.left, pin_y), 2)
+    for index in range(num_outputs):
+        pin_y = input_pin_y(body, index, num_outputs)
+        pygame.draw.line(
+            surface, BLACK, (body.right, pin_y), (body.right + pin_stub, pin_y), 2
+        )
+    for size in (22, 18, 14):
+        text = render_text(label, size)
+        if text.get_width() <= width - 6:
+            break
+    surface.blit(text, text.get_rect(center=body.center))
+    return surface
+
+
+# Function to pre-render a truth table with one (or no) highlighted row
+@lru_cache(maxsize=256)
+def truth_table_surface(rows, highlighted_row, width, height):
+    surface = pygame.Surface((width, height))
+    surface.fill(WHITE)
+
+    row_height = height // len(rows)
+    for i, row in enumerate(rows):
+        bg_color = YELLOW if i == highlighted_row else WHITE
+        pygame.draw.rect(surface, bg_color, (0, i * row_height, width, row_height))
+        text = render_text(row, 20)
+        surface.blit(text, text.get_rect(midleft=(5, (i + 0.5) * height / len(rows))))
+
+    pygame.draw.rect(surface, BLACK, (0, 0, width, height), 1)
+    return surface
+
+
+# Function to pre-render the toolbar strip
+@lru_cache(maxsize=8)
+def toolbar_surface(labels, colors, button_width, height, font_size=24):
+    surface = pygame.Surface((button_width * len(labels), height))
+    for i, (label, color) in enumerate(zip(labels, colors)):
+        pygame.draw.rect(surface, color, (i * button_width, 0, button_width, height))
+        text = render_text(label, font_size, WHITE)
+        surface.blit(
+            text,
+            text.get_rect(center=(i * button_width + button_width // 2, height // 2)),
+        )
+    return surface
+
+
+# Function to get a cached surface scaled for a camera zoom level (the camera only uses a few
+# fixed levels, so every sprite is scaled at most once per level)
+def scaled(surface, zoom):
+    return surface if zoom == 1 else _scaled(surface, zoom)
+
+
+@lru_cache(maxsize=1024)
+def _scaled(surface, zoom):
+    size = (
+        max(1, round(surface.get_width() * zoom)),
+        max(1, round(surface.get_height() * zoom)),
+    )
+    if surface.get_bitsize() in (24, 32):
+        return pygame.transform.smoothscale(surface, size)
+    return pygame.transform.scale(surface, size)
@@ -0,0 +1,161 @@
+import numpy as np
+
+# Edge-driven simulation of clocked registers.
+# Rising edges are found once with a vectorized diff, register state is computed only at
+# those edges, and the per-sample traces are expanded with np.repeat, so the cost grows
+# linearly with the trace length instead of with edges x samples.
+#
+# Register state is packed into one unsigned integer (bit j is Qj). Each register kind is a
+# function (start_state, num_edges, width, edge_data) -> packed state after each edge, so
+# the same code drives whole-trace simulation and the chunked streaming mode.
+
+MAX_WIDTH = 64  # Register state is packed into one uint64 per edge
+
+
+# Function to find the sample indices where the clock goes from low to high
+def rising_edges(clock):
+    clock = np.asarray(clock)
+    return np.flatnonzero(np.diff(clock.astype(np.int8)) > 0) + 1
+
+
+# Function to expand per-edge values into a per-sample trace.
+# The value before the first edge is `initial`; the value set by edge k holds until edge k + 1.
+def expand_edge_values(edges, edge_values, length, initial):
+    values = np.concatenate(([initial], edge_values)).astype(np.uint8)
+    boundaries = np.concatenate(([0], edges, [length]))
+    return np.repeat(values, np.diff(boundaries))
+
+
+# Function to split packed register values into one 0/1 array per bit (bit 0 first)
+def unpack_bits(values, width):
+    shifts = np.arange(width, dtype=np.uint64)[:, None]
+    return (
+        (np.asarray(values, dtype=np.uint64)[None, :] >> shifts) & np.uint64(1)
+    ).astype(np.uint8)
+
+
+# Function to expand packed per-edge states into one per-sample trace per bit
+def expand_edge_states(edges, edge_states, length, start, width):
+    edge_bits = unpack_bits(edge_states, width)
+    return np.stack(
+        [
+            expand_edge_values(edges, edge_bits[bit], length, (start >> bit) & 1)
+            for bit in range(width)
+        ]
+    )
+
+
+def check_width(width):
+    if not 1 <= width <= MAX_WIDTH:
+        raise ValueError(
+            f"Register width must be between 1 and {MAX_WIDTH}, got {width}"
+        )
+
+
+def _mask(width):
+    return (1 << width) - 1
+
+
+# Function to list the register state after each of `num_edges` edges for any next-state rule.
+# The state sequence of a finite register is eventually periodic, so the rule is only applied
+# until a state repeats and the cycle is then tiled out to the requested length.
+def iterate_edge_states(next_state, start, num_edges):
+    states = []
+    seen = {}
+    state = start
+    while len(states) < num_edges:
+        state = next_state(state)
+        if state in seen:
+            prefix = states[: seen[state]]
+            cycle = np.array(states[seen[state] :], dtype=np.uint64)
+            tail = np.resize(cycle, num_edges - len(prefix))
+            return np.concatenate((np.array(prefix, dtype=np.uint64), tail))
+        seen[state] = len(states)
+        states.append(state)
+    return np.array(states, dtype=np.uint64)
+
+
+# Binary up-counter: edge k leaves start + k (mod 2^width)
+def counter_edge_states(start, num_edges, width, edge_data=None):
+    counts = np.arange(1, num_edges + 1, dtype=np.uint64) + np.uint64(start)
+    return counts & np.uint64(_mask(width))
+
+
+# Toggle flip-flop chain from flip_flop.py: on every rising edge Q0 toggles and each later
+# stage toggles when the previous stage's new value is 0
+def toggle_chain_edge_states(start, num_edges, width, edge_data=None):
+    def next_state(state):
+        new_state = (state & 1) ^ 1
+        for bit in range(1, width):
+            toggle = ((new_state >> (bit - 1)) & 1) ^ 1
+            new_state |= (((state >> bit) & 1) ^ toggle) << bit
+        return new_state
+
+    return iterate_edge_states(next_state, start, num_edges)
+
+
+# Serial-in shift register: on every rising edge Q0 takes the data bit for that edge and
+# each later stage takes the previous stage's old value
+def shift_edge_states(start, num_edges, width, edge_data):
+    # ext[m + width - 1] is the bit that entered at edge m (m <= 0: the starting contents),
+    # so after edge k stage j holds ext[k - j + width - 1]
+    start_bits = [(start >> bit) & 1 for bit in range(width)]
+    ext = np.concatenate(
+        (
+            np.array(start_bits[::-1], dtype=np.uint64),
+            np.asarray(edge_data, dtype=np.uint64),
+        )
+    )
+
+    states = np.zeros(num_edges, dtype=np.uint64)
+    for bit in range(width):
+        states |= ext[width - bit : width - bit + num_edges] << np.uint64(bit)
+    return states
+
+
+REGISTER_KINDS = {
+    "counter": counter_edge_states,
+    "toggle_chain": toggle_chain_edge_states,
+    "shift": shift_edge_states,
+}
+
+
+# Function to sample a data input at each rising edge.
+# `data` may be a single value, one value per edge, or a full per-sample trace.
+def sample_at_edges(data, edges, length, dtype=np.uint8):
+    data = np.asarray(data, dtype=dtype)
+    if data.ndim == 0:
+        return np.full(len(edges), data, dtype=dtype)
+    if len(data) == length:
+        # Sample what was on the line just before the edge (setup time)
+        return data[edges - 1]
+    if len(data) < len(edges):
+        raise ValueError(
+            f"Need one data value per rising edge ({len(edges)}), got {len(data)}"
+        )
+    return data[: len(edges)]
+
+
+# Function to simulate any register kind over a whole clock trace, one trace per bit
+def simulate_register(clock, kind, width=4, start=0, data=0):
+    check_width(width)
+    clock = np.asarray(clock)
+    edges = rising_edges(clock)
+    edge_data = sample_at_edges(data, edges, len(clock)) if kind == "shift" else None
+    edge_states = REGISTER_KINDS[kind](start, len(edges), width, edge_data)
+    return expand_edge_states(edges, edge_states, len(clock), start, width)
+
+
+# Function to simulate a binary up-counter, one trace per bit
+def simulate_counter(clock, width=4, start=0):
+    return simulate_register(clock, "counter", width, start)
+
+
+# Function to simulate the toggle flip-flop chain from flip_flop.py, one trace per bit
+def simulate_toggle_chain(clock, width=4, start=0):
+    return simulate_register(clock, "toggle_chain", width, start)
+
+
+# Function to simulate a serial-in shift register, one trace per bit
+def simulate_shift_register(clock, data, width=4, initial=0):
+    return simulate_register(clock, "shift", width, initial, data)
@@ -0,0 +1,201 @@
+import numpy as np
+
+from sequential_sim import (
+    check_width,
+    expand_edge_values,
+    rising_edges,
+    sample_at_edges,
+)
+
+# N-bit shift register engine for the four classic register types.
+#   SISO: serial in, serial out    SIPO: serial in, parallel out
+#   PISO: parallel load, then shift out serially    PIPO: parallel load, parallel out
+# On a shift, Q0 takes the serial input and every later stage takes the previous stage's old
+# value; the serial output is the last stage. On a load (PISO/PIPO) every stage takes its
+# bit of the parallel input; a PIPO register holds its value on edges without a load.
+#
+# State is packed into one uint64 per register (bit j is Qj). A RegisterBank advances many
+# independent registers together, one vectorized step per clock edge. For a handful of
+# registers over many edges, register_edge_states instead works out every edge at once in
+# closed form, one vectorized pass per stage.
+
+REGISTER_TYPES = ("SISO", "SIPO", "PISO", "PIPO")
+STEP_MIN_REGISTERS = 64  # From this many registers up, stepping edge by edge is faster
+
+
+def check_register_type(register_type):
+    if register_type not in REGISTER_TYPES:
+        raise ValueError(
+            f"Unknown register type {register_type!r}, expected one of {', '.join(REGISTER_TYPES)}"
+        )
+
+
+# Function to list which stages a register type exposes as outputs
+def output_stages(register_type, width):
+    if register_type in ("SISO", "PISO"):
+        return [width - 1]  # Serial out is the last stage
+    return list(range(width))
+
+
+def _mask(width):
+    return np.uint64((1 << width) - 1)
+
+
+# Many independent registers of one type and width, advanced together
+class RegisterBank:
+    def __init__(self, count, width=4, register_type="SIPO", start=0):
+        check_width(width)
+        check_register_type(register_type)
+        self.width = width
+        self.register_type = register_type
+        self.state = np.full(count, start, dtype=np.uint64) & _mask(width)
+
+    # Function to apply one rising edge to every register. `serial`, `parallel` and `load`
+    # are scalars or one value per register; `load` defaults to on for PIPO and off otherwise.
+    def step(self, serial=0, parallel=0, load=None):
+        mask = _mask(self.width)
+        if self.register_type == "PIPO":
+            next_state = self.state  # Hold unless loaded
+            load = 1 if load is None else load
+        else:
+            serial = np.asarray(serial, dtype=np.uint64) & np.uint64(1)
+            next_state = ((self.state << np.uint64(1)) | serial) & mask
+            load = 0 if load is None or self.register_type != "PISO" else load
+
+        parallel = np.asarray(parallel, dtype=np.uint64) & mask
+        self.state = np.where(
+            np.asarray(load, dtype=bool), parallel, next_state
+        ).astype(np.uint64)
+        return self.state
+
+    # Function to read the register bits, one row per register and one column per stage
+    def bits(self, use_complement=False):
+        state = ~self.state & _mask(self.width) if use_complement else self.state
+        return (
+            (state[:, None] >> np.arange(self.width, dtype=np.uint64)) & np.uint64(1)
+        ).astype(np.uint8)
+
+    # Function to read just the output stages of every register
+    def outputs(self, use_complement=False):
+        return self.bits(use_complement)[
+            :, output_stages(self.register_type, self.width)
+        ]
+
+
+# Function to compute the packed state after every edge for a batch of registers at once.
+# `serial` and `load` are (registers, edges) 0/1 arrays, `parallel` holds the packed parallel
+# input per edge and `start` the packed starting contents per register (or one for all).
+# Returns a (registers, edges) uint64 array.
+def register_edge_states(
+    register_type, width, start, serial=None, parallel=None, load=None
+):
+    check_width(width)
+    check_register_type(register_type)
+    arrays = [np.asarray(a) for a in (serial, parallel, load) if a is not None]
+    if not arrays:
+        raise ValueError(
+            "Need at least one of serial, parallel or load to know the number of edges"
+        )
+    shape = np.broadcast_shapes(*(np.atleast_2d(a).shape for a in arrays))
+    count, num_edges = shape
+
+    mask = _mask(width)
+    start = np.broadcast_to(np.asarray(start, dtype=np.uint64) & mask, (count,))
+    serial = np.broadcast_to(
+        np.atleast_2d(np.asarray(0 if serial is None else serial, dtype=np.uint64)),
+        shape,
+    )
+    parallel = np.broadcast_to(
+        np.atleast_2d(np.asarray(0 if parallel is None else parallel, dtype=np.uint64)),
+        shape,
+    )
+    if load is None:
+        load = 1 if register_type == "PIPO" else 0
+    if register_type in ("SISO", "SIPO"):
+        load = 0  # Serial-in registers have no parallel load
+    load = np.broadcast_to(np.atleast_2d(np.asarray(load, dtype=bool)), shape)
+
+    if count >= STEP_MIN_REGISTERS:
+        bank = RegisterBank(count, width, register_type)
+        bank.state = start.copy()
+        states = np.empty(shape, dtype=np.uint64)
+        for edge in range(num_edges):
+            states[:, edge] = bank.step(
+                serial[:, edge], parallel[:, edge], load[:, edge]
+            )
+        return states
+
+    # Edge index of the most recent load at or before each edge (-1 when there was none)
+    edge_index = np.arange(num_edges)
+    last_load = np.maximum.accumulate(np.where(load, edge_index, -1), axis=1)
+    loaded_word = np.take_along_axis(parallel, np.maximum(last_load, 0), axis=1)
+    since_load = edge_index - last_load  # Number of shifts since that load
+
+    states = np.zeros(shape, dtype=np.uint64)
+    for bit in range(width):
+        if register_type == "PIPO":
+            bit_value = np.where(
+                last_load >= 0,
+                loaded_word >> np.uint64(bit),
+                start[:, None] >> np.uint64(bit),
+            )
+        else:
+            # Stage `bit` at edge k came from: the loaded word (shifted) if the load was at most
+            # `bit` edges ago, else the serial bit that entered at edge k - bit, else the start
+            from_load = (last_load >= 0) & (since_load <= bit)
+            entered = edge_index - bit
+            serial_bit = np.zeros(shape, dtype=np.uint64)
+            if bit < num_edges:
+                serial_bit[:, bit:] = serial[:, : num_edges - bit]
+            start_shift = np.maximum(bit - edge_index - 1, 0).astype(np.uint64)
+            start_bit = start[:, None] >> start_shift[None, :]
+            load_shift = np.maximum(bit - since_load, 0).astype(np.uint64)
+            bit_value = np.where(
+                from_load,
+                loaded_word >> load_shift,
+                np.where(entered >= 0, serial_bit, start_bit),
+            )
+        states |= (bit_value & np.uint64(1)) << np.uint64(bit)
+    return states
+
+
+# Function to simulate one shift register over a whole clock trace.
+# `serial`, `parallel` and `load` may each be a single value, one value per rising edge, or a
+# full per-sample trace (sampled just before each edge). Returns one trace per stage
+# (Q0 first), complemented when `use_complement` is set.
+def simulate_register_type(
+    clock,
+    register_type,
+    width=4,
+    serial=0,
+    parallel=0,
+    load=None,
+    start=0,
+    use_complement=False,
+):
+    clock = np.asarray(clock)
+    edges = rising_edges(clock)
+    length = len(clock)
+    if load is not None:
+        load = sample_at_edges(load, edges, length)
+    states = register_edge_states(
+        register_type,
+        width,
+        start,
+        sample_at_edges(serial, edges, length),
+        sample_at_edges(parallel, edges, length, dtype=np.uint64),
+        load,
+    )[0]
+
+    if use_complement:
+        states = ~states & _mask(width)
+        start = ~start & ((1 << width) - 1)
+    edge_bits = (
+        states[None, :] >> np.arange(width, dtype=np.uint64)[:, None]
+    ) & np.uint64(1)
+    return np.stack(
+        [
+            expand_edge_values(edges, edge_bits[bit], length, (start >> bit) & 1)
+            for bit in range(width)
+        ]
+    )
@@ -0,0 +1,321 @@
+import heapq
+import time
+from collections import deque
+
+# Maximum number of sweeps used to settle a feedback loop before it is reported as oscillating
+DEFAULT_MAX_ITERATIONS = 64
+# Minimum number of delta cycles one settle may run before the clocked components are reported
+# as re-triggering each other; raised to the number of clocked components plus one for long
+# ripple chains, which need a delta cycle per stage
+DEFAULT_MAX_DELTA_CYCLES = 1024
+
+
+# Function to collect every component reachable (through inputs or outputs) from the given ones
+def collect_netlist(components):
+    seen = set()
+    netlist = []
+    queue = deque(components)
+    while queue:
+        component = queue.popleft()
+        if id(component) in seen:
+            continue
+        seen.add(id(component))
+        netlist.append(component)
+        queue.extend(component.inputs)
+        queue.extend(component.outputs)
+    return netlist
+
+
+# Function to list the outputs a component drives combinationally. Clocked components only
+# react to clock edges, so wires into them never form a combinational path or loop.
+def combinational_outputs(component):
+    return [
+        output for output in component.outputs if not getattr(output, "clocked", False)
+    ]
+
+
+# Function to find the strongly connected components of a netlist (iterative Tarjan),
+# following combinational wires only
+def strongly_connected_components(components):
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    groups = []
+    counter = 0
+
+    for root in components:
+        if id(root) in index_of:
+            continue
+        work = [(root, iter(combinational_outputs(root)))]
+        index_of[id(root)] = lowlink[id(root)] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(id(root))
+
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if id(child) not in index_of:
+                    index_of[id(child)] = lowlink[id(child)] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(id(child))
+                    work.append((child, iter(combinational_outputs(child))))
+                    advanced = True
+                    break
+                if id(child) in on_stack:
+                    lowlink[id(node)] = min(lowlink[id(node)], index_of[id(child)])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[id(parent)] = min(lowlink[id(parent)], lowlink[id(node)])
+            if lowlink[id(node)] == index_of[id(node)]:
+                group = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(id(member))
+                    group.append(member)
+                    if member is node:
+                        break
+                groups.append(group)
+
+    return groups
+
+
+# Levelized, event-driven simulation engine.
+# The netlist is kept in topological levels (feedback loops are collapsed into a single
+# level), and every dirty component is evaluated at most once per change, in level order.
+# Components provide inputs, outputs, state, evaluate(), set_state() and connect_to().
+# Clocked components (clocked = True) provide clock_edge() and load() instead of evaluate():
+# once everything combinational has settled, every dirty clocked component samples its
+# inputs, then they all load the sampled values together and the logic settles again (a
+# delta cycle), until no clock edges are left.
+class SimulationEngine:
+    def __init__(
+        self,
+        components=(),
+        max_iterations=DEFAULT_MAX_ITERATIONS,
+        max_delta_cycles=DEFAULT_MAX_DELTA_CYCLES,
+    ):
+        self.components = []
+        self.max_iterations = max_iterations
+        self.max_delta_cycles = max_delta_cycles
+        self.oscillating = set()
+        self.evaluations = 0
+        self.settle_seconds = 0.0  # Total time spent in settle(), for profiling
+        self.last_depth = 0  # Levels the last settle() went through
+        self.max_depth = 0  # Deepest settle() since the profiler last reset it
+        self.revision = (
+            0  # Bumped on every structural change, for caches built on the netlist
+        )
+        self._level = None
+        self._loop = None
+        self._clocked_count = 0
+        for component in components:
+            self.add(component)
+
+    # Function to build an engine around whatever is connected to the given components
+    @classmethod
+    def for_components(cls, components):
+        engine = cls()
+        engine.components = collect_netlist(components)
+        return engine
+
+    def add(self, component):
+        component.engine = self
+        self.components.append(component)
+        self.invalidate()
+
+    def remove(self, component):
+        fanout = list(component.outputs)
+        component.remove_connections()
+        self.components.remove(component)
+        component.engine = None
+        self.invalidate()
+        return self.settle(fanout)
+
+    def connect(self, source, target):
+        source.connect_to(target)
+        self.invalidate()
+        return self.settle([target])
+
+    # Function to drop the cached levels after the structure of the netlist changes
+    def invalidate(self):
+        self._level = None
+        self._loop = None
+        self.revision += 1
+
+    # Function to assign a topological level to every component, collapsing feedback loops
+    def levelize(self):
+        groups = strongly_connected_components(self.components)
+        group_of = {}
+        loops = {}
+        for number, group in enumerate(groups):
+            for member in group:
+                group_of[id(member)] = number
+            if len(group) > 1 or any(
+                member in combinational_outputs(member) for member in group
+            ):
+                loops[number] = group
+
+        # Tarjan emits groups in reverse topological order, so walk them backwards
+        group_level = [0] * len(groups)
+        for number in range(len(groups) - 1, -1, -1):
+            for member in groups[number]:
+                for output in combinational_outputs(member):
+                    target = group_of.get(id(output))
+                    if target is not None and target != number:
+                        group_level[target] = max(
+                            group_level[target], group_level[number] + 1
+                        )
+
+        self._level = {
+            id(member): group_level[group_of[id(member)]] for member in self.components
+        }
+        self._clocked_count = sum(
+            1 for member in self.components if getattr(member, "clocked", False)
+        )
+        self._loop = {}
+        for group in loops.values():
+            for member in group:
+                self._loop[id(member)] = group
+
+    # Function to report which components sit on a feedback loop
+    def loops(self):
+        if self._level is None:
+            self.levelize()
+        unique = {id(group): group for group in self._loop.values()}
+        return list(unique.values())
+
+    # Function to list the components in level order (sources first)
+    def topological_order(self):
+        if self._level is None:
+            self.levelize()
+        return sorted(self.components, key=lambda component: self._level[id(component)])
+
+    # Function to re-evaluate everything after a source component changed state
+    def propagate(self, source):
+        return self.settle(source.outputs)
+
+    # Function to evaluate the given components and everything downstream of them, once each
+    # per delta cycle. Returns the set of components whose state changed.
+    def settle(self, dirty):
+        started = time.perf_counter()
+        if self._level is None:
+            self.levelize()
+        level = self._level
+        loop = self._loop
+
+        pending = {}
+        heap = []
+        queued = set()
+        settled_loops = set()
+        changed = set()
+        clocked = []
+
+        def mark(component):
+            key = id(component)
+            if key in queued or key not in level:
+                return
+            queued.add(key)
+            if getattr(component, "clocked", False):
+                clocked.append(component)
+                return
+            component_level = level[key]
+            if component_level not in pending:
+                pending[component_level] = []
+                heapq.heappush(heap, component_level)
+            pending[component_level].append(component)
+
+        for component in dirty:
+            mark(component)
+
+        depth = 0
+        delta_cycles = 0
+        max_delta_cycles = max(self.max_delta_cycles, self._clocked_count + 1)
+        while True:
+            while heap:
+                current = heapq.heappop(heap)
+                depth += 1
+                for component in pending.pop(current):
+                    group = loop.get(id(component))
+                    if group is None:
+                        self.evaluations += 1
+                        new_state = component.evaluate()
+                        if new_state != component.state:
+                            component.set_state(new_state)
+                            changed.add(component)
+                            for output in component.outputs:
+                                mark(output)
+                        continue
+
+                    # The whole loop shares a level: settle it once, together
+                    if id(group) in settled_loops:
+                        continue
+                    settled_loops.add(id(group))
+                    for member in group:
+                        queued.add(id(member))
+                    for member in self._settle_loop(group):
+                        changed.add(member)
+                        for output in member.outputs:
+                            if loop.get(id(output)) is not group:
+                                mark(output)
+
+            if not clocked:
+                break
+            if delta_cycles == max_delta_cycles:
+                # Everything combinational has settled; only the pending clock edges are dropped
+                print(
+                    "Warning: clock edges kept re-triggering; stopped after "
+                    f"{max_delta_cycles} delta cycles"
+                )
+                break
+            delta_cycles += 1
+
+            # Clock edges: sample every clocked component first, then update them together
+            sampled = []
+            for component in clocked:
+                self.evaluations += 1
+                sampled.append((component, component.clock_edge()))
+            clocked = []
+            queued.clear()
+            settled_loops.clear()
+            for component, bits in sampled:
+                if bits is None:
+                    continue
+                state = component.state
+                if component.load(bits):
+                    changed.add(component)
+                    if component.state != state:
+                        for output in component.outputs:
+                            mark(output)
+
+        self.last_depth = depth
+        self.max_depth = max(self.max_depth, depth)
+        self.settle_seconds += time.perf_counter() - started
+        return changed
+
+    # Function to settle a feedback loop by bounded fixed-point iteration
+    def _settle_loop(self, group):
+        before = [member.state for member in group]
+        for _ in range(self.max_iterations):
+            stable = True
+            for member in group:
+                self.evaluations += 1
+                new_state = member.evaluate()
+                if new_state != member.state:
+                    member.set_state(new_state)
+                    stable = False
+            if stable:
+                self.oscillating.difference_update(group)
+                break
+        else:
+            # Never reached a fixed point: leave the last state in place and report it
+            self.oscillating.update(group)
+            print(f"Warning: feedback loop of {len(group)} components is oscillating")
+        return [member for member, state in zip(group, before) if member.state != state]
@@ -0,0 +1,101 @@
+# Default grid cell size in pixels, roughly one gate with its truth table
+DEFAULT_CELL_SIZE = 128
+
+
+# Uniform-grid spatial index.
+# Every entry is stored in each grid cell its rect overlaps, so point and rect queries only
+# look at the handful of entries near the query instead of the whole board.
+# Rects only need x, y, width and height; the order key decides stacking (higher is on top).
+class SpatialIndex:
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        first_col = int(rect.x // size)
+        last_col = int((rect.x + max(rect.width, 1) - 1) // size)
+        first_row = int(rect.y // size)
+        last_row = int((rect.y + max(rect.height, 1) - 1) // size)
+        return [
+            (col, row)
+            for col in range(first_col, last_col + 1)
+            for row in range(first_row, last_row + 1)
+        ]
+
+    def insert(self, key, rect, order):
+        if key in self.entries:
+            self.remove(key)
+        cells = self._cells_for(rect)
+        self.entries[key] = (rect, order, cells)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            bucket = self.cells[cell]
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[cell]
+
+    # Function to re-bucket an entry after it moved or changed size
+    def move(self, key, rect):
+        _, order, old_cells = self.entries[key]
+        cells = self._cells_for(rect)
+        if cells != old_cells:
+            for cell in old_cells:
+                bucket = self.cells[cell]
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+            for cell in cells:
+                self.cells.setdefault(cell, set()).add(key)
+        self.entries[key] = (rect, order, cells)
+
+    def rect_of(self, key):
+        return self.entries[key][0]
+
+    def order_of(self, key):
+        return self.entries[key][1]
+
+    # Function to find every entry whose rect contains the point, topmost first
+    def query_point(self, pos):
+        size = self.cell_size
+        bucket = self.cells.get((int(pos[0] // size), int(pos[1] // size)), ())
+        hits = []
+        for key in bucket:
+            rect, order, _ = self.entries[key]
+            if (
+                rect.x <= pos[0] < rect.x + rect.width
+                and rect.y <= pos[1] < rect.y + rect.height
+            ):
+                hits.append((order, key))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [key for _, key in hits]
+
+    # Function to find every entry whose rect overlaps the given rect, bottom first (draw order)
+    def query_rect(self, query):
+        found = {}
+        for cell in self._cells_for(query):
+            for key in self.cells.get(cell, ()):
+                if key in found:
+                    continue
+                rect, order, _ = self.entries[key]
+                if (
+                    rect.x < query.x + query.width
+                    and query.x < rect.x + rect.width
+                    and rect.y < query.y + query.height
+                    and query.y < rect.y + rect.height
+                ):
+                    found[key] = order
+        return sorted(found, key=found.get)
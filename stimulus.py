@@ -0,0 +1,93 @@
+import numpy as np
+
+# Shared clock and stimulus generation for the timing scripts.
+# Waveforms are built as one small period (or pattern) and tiled out with NumPy, one byte
+# per sample, or returned in run-length form (change times and values) without
+# materializing any samples at all.
+
+
+# Function to build a single period of a square wave.
+# Starting low, the low part is int(steps * (1 - duty)) long; starting high, the high part is
+# int(steps * duty) long (the same rounding as the original generate_clock_signal).
+# `phase` delays the wave by that many samples.
+def square_period(
+    steps_per_period, duty_cycle=0.5, start_high=False, phase=0, dtype=np.uint8
+):
+    if start_high:
+        high_steps = int(steps_per_period * duty_cycle)
+        period = np.zeros(steps_per_period, dtype=dtype)
+        period[:high_steps] = 1  # High first, then low
+    else:
+        low_steps = int(steps_per_period * (1 - duty_cycle))
+        period = np.ones(steps_per_period, dtype=dtype)
+        period[:low_steps] = 0  # Low first, then high
+    return np.roll(period, phase % steps_per_period) if phase else period
+
+
+# Function to generate a square wave over a whole number of periods
+def square_wave(
+    periods, steps_per_period, duty_cycle=0.5, start_high=False, phase=0, dtype=np.uint8
+):
+    return np.tile(
+        square_period(steps_per_period, duty_cycle, start_high, phase, dtype), periods
+    )
+
+
+# Function to generate a clock signal, starting in user-defined state (high or low)
+def generate_clock_signal(
+    periods, steps_per_period, duty_cycle=0.5, start_high=False, phase=0, dtype=np.uint8
+):
+    return square_wave(periods, steps_per_period, duty_cycle, start_high, phase, dtype)
+
+
+# Function to turn a bit pattern into a waveform, holding each bit for steps_per_bit samples.
+# With `length` the pattern repeats (or is cut) to exactly that many samples.
+def pattern_signal(bits, steps_per_bit=1, length=None, dtype=np.uint8):
+    signal = np.repeat(np.asarray(bits, dtype=dtype), steps_per_bit)
+    if length is not None:
+        signal = np.resize(signal, length)
+    return signal
+
+
+# Function to generate several clocks that share one time base.
+# `domains` maps a name to the keyword arguments of square_period (steps_per_period required);
+# every clock is repeated or cut to `length` samples.
+def clock_domains(domains, length, dtype=np.uint8):
+    return {
+        name: np.resize(square_period(dtype=dtype, **settings), length)
+        for name, settings in domains.items()
+    }
+
+
+# Function to describe a square wave in run-length form without building its samples.
+# Returns (times, values): the wave holds values[k] from times[k] until times[k + 1];
+# times[0] is always 0.
+def square_wave_edges(
+    periods, steps_per_period, duty_cycle=0.5, start_high=False, phase=0
+):
+    period = square_period(steps_per_period, duty_cycle, start_high, phase)
+    changes = np.flatnonzero(period != np.roll(period, 1))
+    if len(changes) == 0:
+        return np.zeros(1, dtype=np.int64), period[:1].copy()
+
+    starts = np.arange(periods, dtype=np.int64)[:, None] * steps_per_period
+    times = (starts + changes[None, :]).ravel()
+    values = np.tile(period[changes], periods)
+    if times[0] != 0:
+        times = np.concatenate(([0], times))
+        values = np.concatenate((period[:1], values))
+    return times, values
+
+
+# Function to generate samples [start, stop) of a square wave, for chunked simulation
+def square_wave_chunk(
+    start,
+    stop,
+    steps_per_period,
+    duty_cycle=0.5,
+    start_high=False,
+    phase=0,
+    dtype=np.uint8,
+):
+    period = square_period(steps_per_period, duty_cycle, start_high, phase, dtype)
+    return period[np.arange(start, stop) % steps_per_period]
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from sequential_sim import REGISTER_KINDS, check_width, expand_edge_states, rising_edges
+from stimulus import square_wave_chunk
+from trace_store import TraceStore, write_vcd
+
+# Streaming (chunked) register simulation with memory-mapped trace output.
+# The clock and register state are generated a fixed-size chunk at a time; the last clock
+# sample and the register state carry over between chunks, and every trace is written
+# straight into an np.memmap file, so memory stays bounded however long the run is.
+#
+# A trace directory holds one raw uint8 file per signal plus trace.json describing them,
+# and can be reopened later with open_trace() without recomputing anything.
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+METADATA_FILE = "trace.json"
+
+
+# Function to create the memory-mapped output files for a run
+def _create_trace_files(directory, names, length, metadata):
+    os.makedirs(directory, exist_ok=True)
+    traces = {
+        name: np.memmap(
+            os.path.join(directory, f"{name}.u8"),
+            dtype=np.uint8,
+            mode="w+",
+            shape=(length,),
+        )
+        for name in names
+    }
+    with open(os.path.join(directory, METADATA_FILE), "w") as f:
+        json.dump(
+            dict(metadata, length=length, signals=list(names), dtype="uint8"),
+            f,
+            indent=2,
+        )
+    return traces
+
+
+# Function to reopen a trace directory; returns (metadata, {signal name: read-only memmap})
+def open_trace(directory):
+    with open(os.path.join(directory, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    traces = {
+        name: np.memmap(
+            os.path.join(directory, f"{name}.u8"),
+            dtype=metadata["dtype"],
+            mode="r",
+            shape=(metadata["length"],),
+        )
+        for name in metadata["signals"]
+    }
+    return metadata, traces
+
+
+# Function to simulate a register driven by a square-wave clock, streaming the clock and every
+# register bit (Q0, Q1, ...) to memmap files in `directory`.
+# `kind` is one of sequential_sim.REGISTER_KINDS; for "shift", `data` is a single bit or a
+# pattern of bits consumed one per rising edge (repeating).
+def stream_register(
+    directory,
+    periods,
+    steps_per_period,
+    duty_cycle=0.5,
+    start_high=False,
+    kind="toggle_chain",
+    width=4,
+    start=0,
+    data=1,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    check_width(width)
+    length = periods * steps_per_period
+    names = ["clock"] + [f"Q{bit}" for bit in range(width)]
+    metadata = {
+        "periods": periods,
+        "steps_per_period": steps_per_period,
+        "duty_cycle": duty_cycle,
+        "start_high": start_high,
+        "kind": kind,
+        "width": width,
+        "start": start,
+    }
+    traces = _create_trace_files(directory, names, length, metadata)
+    edge_rule = REGISTER_KINDS[kind]
+    data_pattern = np.atleast_1d(np.asarray(data, dtype=np.uint8))
+
+    state = start
+    previous_sample = None
+    edges_so_far = 0
+    for chunk_start in range(0, length, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, length)
+        clock = square_wave_chunk(
+            chunk_start, chunk_stop, steps_per_period, duty_cycle, start_high
+        )
+
+        # Include the last sample of the previous chunk so an edge on the boundary is seen
+        if previous_sample is None:
+            edges = rising_edges(clock)
+        else:
+            edges = rising_edges(np.concatenate(([previous_sample], clock))) - 1
+
+        edge_data = None
+        if kind == "shift":
+            edge_numbers = np.arange(edges_so_far, edges_so_far + len(edges))
+            edge_data = data_pattern[edge_numbers % len(data_pattern)]
+        edge_states = edge_rule(state, len(edges), width, edge_data)
+
+        bits = expand_edge_states(edges, edge_states, len(clock), state, width)
+        traces["clock"][chunk_start:chunk_stop] = clock
+        for bit in range(width):
+            traces[f"Q{bit}"][chunk_start:chunk_stop] = bits[bit]
+
+        if len(edges):
+            state = int(edge_states[-1])
+        edges_so_far += len(edges)
+        previous_sample = clock[-1]
+
+    for trace in traces.values():
+        trace.flush()
+    return open_trace(directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream a long register simulation to memory-mapped trace files"
+    )
+    parser.add_argument("directory", help="output trace directory")
+    parser.add_argument("--periods", type=int, required=True)
+    parser.add_argument("--steps-per-period", type=int, default=10)
+    parser.add_argument("--duty-cycle", type=float, default=0.5)
+    parser.add_argument("--start-high", action="store_true")
+    parser.add_argument(
+        "--kind", choices=sorted(REGISTER_KINDS), default="toggle_chain"
+    )
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--vcd", help="also export the traces as a VCD file")
+    args = parser.parse_args(argv)
+
+    metadata, traces = stream_register(
+        args.directory,
+        args.periods,
+        args.steps_per_period,
+        args.duty_cycle,
+        args.start_high,
+        args.kind,
+        args.width,
+        chunk_size=args.chunk_size,
+    )
+    print(
+        f"Wrote {metadata['length']} samples of {', '.join(metadata['signals'])} to {args.directory}"
+    )
+
+    if args.vcd:
+        # Run-length encoding reads the memmaps chunk by chunk, so this stays bounded too
+        with open(args.vcd, "w") as f:
+            write_vcd(TraceStore.from_dense(traces), f)
+        print(f"Wrote {args.vcd}")
+
+
+if __name__ == "__main__":
+    main()
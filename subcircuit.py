@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+
+from bitparallel_truth_table import evaluate_planes, unpack_plane
+from circuit_compiler import compile_function
+from netlist_format import load_netlist
+
+# Definitions behind subcircuit blocks (circuit.Subcircuit).
+# A definition is a combinational circuit; its inputs and outputs (in creation order) become
+# the block's input pins and output pins. Its behaviour is worked out once, when it is
+# loaded, and shared by every block instance:
+#   - up to TABLE_INPUTS inputs: the full truth table, built with the bit-parallel evaluator
+#     and stored as one packed output vector per packed input vector, so evaluate() is a
+#     list lookup;
+#   - wider blocks: the netlist compiled to a Python function (circuit_compiler), with the
+#     packed outputs memoized per input vector as they are asked for.
+# Input vectors put the first input in the most significant bit, as in truth table rows;
+# output k is bit k of the packed output vector.
+
+TABLE_INPUTS = 16  # 64k-row tables at most
+MEMO_LIMIT = (
+    1 << 16
+)  # Input vectors memoized per wide block before the memo starts over
+
+_definitions = {}  # Absolute path -> (modification time, definition)
+_loading = set()
+
+
+class SubcircuitDefinition:
+    def __init__(self, circuit, name="BLOCK", path=None):
+        if circuit.clocks or circuit.sequential:
+            raise ValueError(
+                "Subcircuits must be combinational (no clocks or flip-flops)"
+            )
+        inputs, outputs = circuit.inputs, circuit.outputs
+        self.name = name
+        self.path = path  # Absolute path of the netlist file the block is saved as a reference to
+        self.num_inputs = len(inputs)
+        self.num_outputs = len(outputs)
+        # Straight-line function of the netlist; also how enclosing circuits fold the block
+        # into their own compiled functions and bit-planes
+        self.function = compile_function(inputs, outputs, "block")
+        self.table = None
+        self.memo = {}
+        if self.num_inputs <= TABLE_INPUTS:
+            rows = 1 << self.num_inputs
+            planes = evaluate_planes(inputs, outputs)
+            table = np.zeros(rows, dtype=object if self.num_outputs > 63 else np.int64)
+            for index, component in enumerate(outputs):
+                table |= (
+                    unpack_plane(planes[id(component)], rows).astype(table.dtype)
+                    << index
+                )
+            self.table = [int(vector) for vector in table]
+
+    # Function to get the packed output vector for a packed input vector
+    def evaluate(self, vector):
+        if self.table is not None:
+            return self.table[vector]
+        outputs = self.memo.get(vector)
+        if outputs is None:
+            if len(self.memo) >= MEMO_LIMIT:
+                self.memo.clear()
+            bits = [
+                (vector >> (self.num_inputs - 1 - position)) & 1
+                for position in range(self.num_inputs)
+            ]
+            outputs = 0
+            for index, value in enumerate(self.function(*bits)):
+                outputs |= value << index
+            self.memo[vector] = outputs
+        return outputs
+
+
+# Function to load the definition saved in a netlist file, reusing it for every block that
+# refers to the same file until the file changes
+def load_definition(path):
+    key = os.path.abspath(path)
+    modified = os.path.getmtime(key)
+    cached = _definitions.get(key)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+    if key in _loading:
+        raise ValueError(f"Subcircuit {path} contains itself")
+    _loading.add(key)
+    try:
+        name = os.path.splitext(os.path.basename(path))[0]
+        definition = SubcircuitDefinition(load_netlist(key), name, key)
+    finally:
+        _loading.discard(key)
+    _definitions[key] = (modified, definition)
+    return definition
@@ -0,0 +1,163 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sequential_sim import REGISTER_KINDS, check_width, rising_edges, simulate_register
+from shift_register import REGISTER_TYPES, simulate_register_type
+from stimulus import generate_clock_signal
+
+# Parameter sweeps for the timing simulators.
+# Instead of typing one configuration into get_user_inputs() per run, a grid of clock and
+# register settings is expanded into every combination and simulated across a process
+# pool. Results come back as one columnar table: a dict of NumPy arrays with one entry per
+# configuration (and optionally a pandas DataFrame).
+
+SWEEP_PARAMETERS = (
+    "periods",
+    "steps_per_period",
+    "duty_cycle",
+    "start_high",
+    "register",
+    "width",
+)
+RESULT_COLUMNS = ("edges", "final_state", "transitions", "seconds")
+# final_state holds up to MAX_WIDTH (64) register bits, past what a default int64 column can hold
+RESULT_DTYPES = {
+    "edges": np.int64,
+    "final_state": np.uint64,
+    "transitions": np.int64,
+    "seconds": np.float64,
+}
+REGISTERS = tuple(sorted(REGISTER_KINDS)) + REGISTER_TYPES
+
+
+# Function to expand a parameter grid ({name: list of values}) into one dict per combination
+def expand_grid(grid):
+    missing = [name for name in SWEEP_PARAMETERS if name not in grid]
+    if missing:
+        raise ValueError(f"Sweep grid is missing {', '.join(missing)}")
+    values = [list(grid[name]) for name in SWEEP_PARAMETERS]
+    return [
+        dict(zip(SWEEP_PARAMETERS, combination))
+        for combination in itertools.product(*values)
+    ]
+
+
+# Function to simulate one configuration and summarize it (runs in a worker process)
+def run_config(config):
+    started = time.perf_counter()
+    width = config["width"]
+    check_width(width)
+    clock = generate_clock_signal(
+        config["periods"],
+        config["steps_per_period"],
+        config["duty_cycle"],
+        start_high=config["start_high"],
+    )
+    register = config["register"]
+    if register in REGISTER_TYPES:
+        bits = simulate_register_type(
+            clock, register, width, serial=1, parallel=(1 << width) - 1
+        )
+    else:
+        bits = simulate_register(clock, register, width, data=1)
+
+    final_state = (
+        sum(int(bits[bit, -1]) << bit for bit in range(width)) if bits.shape[1] else 0
+    )
+    return {
+        "edges": len(rising_edges(clock)),
+        "final_state": final_state,
+        "transitions": int(np.count_nonzero(np.diff(bits, axis=1))),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+# Function to run every configuration of a grid and collect a columnar table.
+# `workers` defaults to one process per core; workers=1 runs in this process.
+def run_sweep(grid, workers=None):
+    configs = expand_grid(grid)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [run_config(config) for config in configs]
+    else:
+        chunksize = max(1, len(configs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_config, configs, chunksize=chunksize))
+
+    table = {
+        name: np.array([config[name] for config in configs])
+        for name in SWEEP_PARAMETERS
+    }
+    table.update(
+        {
+            name: np.array(
+                [result[name] for result in results], dtype=RESULT_DTYPES[name]
+            )
+            for name in RESULT_COLUMNS
+        }
+    )
+    return table
+
+
+# Function to turn a sweep table into a pandas DataFrame (pandas is only needed for this)
+def to_dataframe(table):
+    import pandas as pd
+
+    return pd.DataFrame(table)
+
+
+def _parse_bool(text):
+    return text.lower() in ("1", "y", "yes", "true", "high")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sweep the timing simulators over a grid of clock and register settings"
+    )
+    parser.add_argument("--periods", type=int, nargs="+", default=[10])
+    parser.add_argument("--steps-per-period", type=int, nargs="+", default=[10])
+    parser.add_argument("--duty-cycle", type=float, nargs="+", default=[0.5])
+    parser.add_argument(
+        "--start-high", type=_parse_bool, nargs="+", default=[False], help="y/n values"
+    )
+    parser.add_argument(
+        "--register", choices=REGISTERS, nargs="+", default=["toggle_chain"]
+    )
+    parser.add_argument("--width", type=int, nargs="+", default=[4])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("-o", "--output", help="write the table as CSV")
+    args = parser.parse_args(argv)
+
+    grid = {
+        "periods": args.periods,
+        "steps_per_period": args.steps_per_period,
+        "duty_cycle": args.duty_cycle,
+        "start_high": args.start_high,
+        "register": args.register,
+        "width": args.width,
+    }
+    started = time.perf_counter()
+    table = run_sweep(grid, args.workers)
+    elapsed = time.perf_counter() - started
+
+    columns = SWEEP_PARAMETERS + RESULT_COLUMNS
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(",".join(columns) + "\n")
+            for row in zip(*(table[name] for name in columns)):
+                f.write(",".join(str(value) for value in row) + "\n")
+        print(f"Wrote {len(table['edges'])} configurations to {args.output}")
+    else:
+        print(" ".join(columns))
+        for row in zip(*(table[name] for name in columns)):
+            print(" ".join(str(value) for value in row))
+    print(f"Simulated {len(table['edges'])} configurations in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import random
+
+from circuit import GATE_TYPES, default_fan_in
+
+# Small netlists for the tests, as build_circuit records
+
+
+# Function to generate a random loop-free netlist of 1- to 4-input gates: every gate reads
+# from earlier signals
+def random_records(num_inputs, num_gates, seed):
+    rng = random.Random(seed)
+    records = [(n, "INPUT", 0, 100 * n, [], None) for n in range(num_inputs)]
+    for n in range(num_inputs, num_inputs + num_gates):
+        gate_type = rng.choice(GATE_TYPES)
+        fan_in = default_fan_in(gate_type)
+        if fan_in > 1:
+            fan_in = min(rng.choice((2, 2, 3, 4)), n)
+        inputs = rng.sample(range(n), fan_in)
+        fan_in = fan_in if fan_in != default_fan_in(gate_type) else None
+        records.append((n, gate_type, 100 * (n % 10), 100 * n, inputs, fan_in))
+    last = num_inputs + num_gates
+    records += [
+        (last + k, "OUTPUT", 1000, 100 * k, [last - 1 - k], None) for k in range(4)
+    ]
+    return records
+
+
+# Function to build an n-bit ripple-carry adder; the inputs are a0, b0, a1, b1, ... and the
+# outputs the sum bits followed by the carry out
+def adder_records(bits):
+    records = []
+
+    def add(kind, inputs):
+        records.append((len(records), kind, 100 * len(records), 0, inputs, None))
+        return len(records) - 1
+
+    inputs = [add("INPUT", []) for _ in range(2 * bits)]
+    sums = []
+    carry = None
+    for bit in range(bits):
+        a, b = inputs[2 * bit], inputs[2 * bit + 1]
+        half_sum, half_carry = add("XOR", [a, b]), add("AND", [a, b])
+        if carry is None:
+            sums.append(half_sum)
+            carry = half_carry
+            continue
+        sums.append(add("XOR", [half_sum, carry]))
+        carry = add("OR", [half_carry, add("AND", [half_sum, carry])])
+    for source in sums + [carry]:
+        add("OUTPUT", [source])
+    return records
+
+
+# Function to build a balanced XOR parity tree over `num_inputs` inputs
+def parity_records(num_inputs):
+    records = [(n, "INPUT", 0, 100 * n, [], None) for n in range(num_inputs)]
+    level = list(range(num_inputs))
+    while len(level) > 1:
+        next_level = []
+        for n in range(0, len(level) - 1, 2):
+            records.append((len(records), "XOR", 0, 0, [level[n], level[n + 1]], None))
+            next_level.append(len(records) - 1)
+        level = next_level + level[len(level) - len(level) % 2 :]
+    records.append((len(records), "OUTPUT", 0, 0, [level[0]], None))
+    return records
@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from bitparallel_truth_table import truth_table
+from circuit import GATE_TYPES, Circuit, Gate, Input, Output, default_fan_in
+
+
+# Function to wire up a random loop-free circuit of gates with up to 5 inputs: every gate
+# reads from earlier signals, and some gates are left with unconnected inputs
+def random_circuit(num_inputs, num_gates, seed):
+    rng = random.Random(seed)
+    circuit = Circuit()
+    signals = []
+    for _ in range(num_inputs):
+        signals.append(Input(0, 0))
+        circuit.add(signals[-1])
+    for _ in range(num_gates):
+        gate_type = rng.choice(GATE_TYPES)
+        fan_in = rng.choice((2, 3, 5)) if default_fan_in(gate_type) > 1 else None
+        gate = Gate(0, 0, gate_type, fan_in)
+        circuit.add(gate)
+        connected = gate.max_inputs if rng.random() < 0.9 else gate.max_inputs - 1
+        for source in rng.sample(signals[-8:], min(connected, len(signals[-8:]))):
+            circuit.connect(source, gate)
+        signals.append(gate)
+    for source in signals[-4:]:
+        output = Output(0, 0)
+        circuit.add(output)
+        circuit.connect(source, output)
+    return circuit
+
+
+# Function to build the same table row by row through the engine
+def engine_table(circuit):
+    rows = []
+    for values in itertools.product([0, 1], repeat=len(circuit.inputs)):
+        rows.append(list(values) + [int(value) for value in circuit.evaluate(values)])
+    return np.array(rows, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("num_inputs", range(1, 9))
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_engine(num_inputs, seed):
+    circuit = random_circuit(num_inputs, 30, seed)
+    assert np.array_equal(
+        truth_table(circuit.inputs, circuit.outputs), engine_table(circuit)
+    )
+
+
+def test_feedback_loops_are_rejected():
+    # NOR latch: two cross-coupled NOR gates
+    inputs = [Input(0, 0), Input(0, 0)]
+    gates = [Gate(0, 0, "NOR"), Gate(0, 0, "NOR")]
+    output = Output(0, 0)
+    circuit = Circuit(inputs + gates + [output])
+    for source, target in (
+        (inputs[0], gates[0]),
+        (gates[1], gates[0]),
+        (inputs[1], gates[1]),
+        (gates[0], gates[1]),
+    ):
+        circuit.connect(source, target)
+    circuit.connect(gates[0], output)
+    with pytest.raises(ValueError):
+        truth_table(circuit.inputs, circuit.outputs)
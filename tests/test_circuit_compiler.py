@@ -0,0 +1,38 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from circuit import Gate
+from circuit_compiler import compile_circuit
+from netlist_format import build_circuit
+from tests.netlists import adder_records, parity_records, random_records
+
+
+@pytest.mark.parametrize(
+    "records", [random_records(6, 50, seed=7), adder_records(3), parity_records(5)]
+)
+def test_compiled_function_matches_engine(records):
+    circuit = build_circuit(records)
+    function = compile_circuit(circuit)
+    for values in itertools.product([0, 1], repeat=len(circuit.inputs)):
+        expected = [int(value) for value in circuit.evaluate(values)]
+        assert [int(value) for value in function(*values)] == expected
+
+
+def test_compiled_function_on_arrays():
+    circuit = build_circuit(adder_records(2))
+    rows = np.array(list(itertools.product([0, 1], repeat=4)), dtype=np.uint8)
+    outputs = np.column_stack(compile_circuit(circuit)(*rows.T))
+    for row, output in zip(rows, outputs):
+        assert output.tolist() == [int(value) for value in circuit.evaluate(row)]
+
+
+def test_recompiled_after_rewiring():
+    circuit = build_circuit(parity_records(2))
+    function = compile_circuit(circuit)
+    assert compile_circuit(circuit) is function
+    gate = Gate(0, 0, "NOT")
+    circuit.add(gate)
+    circuit.connect(circuit.outputs[0].inputs[0], gate)
+    assert compile_circuit(circuit) is not function
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from bitparallel_truth_table import truth_table
+from logic_minimize import (
+    _count_gates,
+    minimize_truth_table,
+    read_truth_table_csv,
+    reduce_circuit,
+)
+from netlist_format import build_circuit
+from tests.netlists import adder_records, parity_records, random_records
+
+
+def outputs_of(circuit):
+    table = truth_table(circuit.inputs, circuit.outputs)
+    return table[:, len(circuit.inputs) :]
+
+
+@pytest.mark.parametrize(
+    "records", [random_records(6, 40, seed=3), adder_records(3), parity_records(8)]
+)
+def test_reduce_circuit_is_equivalent_and_never_larger(records):
+    circuit = build_circuit(records)
+    reduced = reduce_circuit(circuit)
+    assert np.array_equal(outputs_of(reduced), outputs_of(circuit))
+    assert _count_gates(reduced) <= _count_gates(circuit)
+
+
+def test_parity_tree_keeps_its_structure():
+    circuit = build_circuit(parity_records(8))
+    assert _count_gates(reduce_circuit(circuit)) == 7
+
+
+def test_truth_table_is_minimized():
+    # Majority of three: three two-input products
+    table = [
+        [a, b, c, int(a + b + c >= 2)] for a in (0, 1) for b in (0, 1) for c in (0, 1)
+    ]
+    circuit = minimize_truth_table(table, 3)
+    assert np.array_equal(outputs_of(circuit), np.array(table)[:, 3:])
+    assert _count_gates(circuit) == 3
+
+
+def write_csv(path, rows):
+    lines = ["Input 1,Input 2,Output"] + [",".join(map(str, row)) for row in rows]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_truth_table_csv_rows_in_any_order(tmp_path):
+    path = tmp_path / "xor.csv"
+    write_csv(path, [[1, 1, 0], [0, 1, 1], [0, 0, 0], [1, 0, 1]])
+    table, num_inputs = read_truth_table_csv(str(path))
+    assert num_inputs == 2
+    assert table.tolist() == [[0, 0, 0], [0, 1, 1], [1, 0, 1], [1, 1, 0]]
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        [[0, 0, 0], [0, 1, 1], [1, 0, 1]],
+        [[0, 0, 0], [0, 1, 1], [0, 1, 1], [1, 1, 0]],
+    ],
+)
+def test_truth_table_csv_must_be_complete(tmp_path, rows):
+    path = tmp_path / "broken.csv"
+    write_csv(path, rows)
+    with pytest.raises(ValueError):
+        read_truth_table_csv(str(path))
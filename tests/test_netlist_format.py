@@ -0,0 +1,217 @@
+import json
+import os
+import struct
+
+import pytest
+
+from benchmarks import full_adder
+from circuit import component_type
+from netlist_format import (
+    AutosaveJournal,
+    build_circuit,
+    component_record,
+    load_netlist,
+    save_netlist,
+)
+from tests.netlists import random_records
+
+
+def records_of(circuit):
+    return [component_record(component) for component in circuit.components]
+
+
+def saved_states(board):
+    return [
+        (component.state, getattr(component, "bits", None))
+        for component in board.components
+    ]
+
+
+# Function to build a random board with some of its inputs switched on
+def toggled_board():
+    board = build_circuit(random_records(6, 60, seed=2))
+    for component in board.inputs[::2]:
+        component.toggle()
+    return board
+
+
+# Function to build a 4-bit register and a TFF fed from an input, clocked a few times
+def clocked_board():
+    records = [
+        (0, "INPUT", 0, 0, [], None),
+        (1, "CLOCK", 0, 100, [], None),
+        (2, "REGISTER", 100, 0, [0, 1], 4),
+        (3, "TFF", 100, 100, [0, 1], None),
+        (4, "OUTPUT", 200, 0, [2], None),
+    ]
+    board = build_circuit(records)
+    source = board.components[0]
+    for value in (1, 0, 1):
+        if source.state != value:
+            source.toggle()
+        board.tick(2)
+    board.tick()  # Leave the clock high
+    return board
+
+
+@pytest.mark.parametrize("name", ["board.json", "board.eenl"])
+def test_round_trip(tmp_path, name):
+    circuit = build_circuit(random_records(6, 60, seed=2))
+    path = str(tmp_path / name)
+    save_netlist(circuit, path)
+    loaded = load_netlist(path)
+    assert records_of(loaded) == records_of(circuit)
+    assert loaded.evaluate([1, 0, 1, 1, 0, 1]) == circuit.evaluate([1, 0, 1, 1, 0, 1])
+
+
+# Function to save a board using a full adder block, both in `directory`
+def save_block_board(directory, name):
+    blocks = directory / "blocks"
+    blocks.mkdir()
+    save_netlist(build_circuit(full_adder()), str(blocks / "full_adder.json"))
+    records = [
+        (0, "INPUT", 0, 0, [], None),
+        (1, "INPUT", 0, 100, [], None),
+        (2, "SUBCIRCUIT", 100, 0, [0, 1], str(blocks / "full_adder.json")),
+        (3, "PIN", 200, 0, [2], None),
+        (4, "PIN", 200, 40, [2], 1),
+        (5, "OUTPUT", 300, 0, [3], None),
+        (6, "OUTPUT", 300, 100, [4], None),
+    ]
+    path = directory / name
+    save_netlist(build_circuit(records), str(path))
+    return path
+
+
+@pytest.mark.parametrize("name", ["board.json", "board.eenl"])
+def test_block_paths_are_relative_to_the_netlist(tmp_path, monkeypatch, name):
+    project = tmp_path / "project"
+    project.mkdir()
+    path = save_block_board(project, name)
+    if name.endswith(".json"):
+        saved = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [
+            data["netlist"] for data in saved if data.get("type") == "SUBCIRCUIT"
+        ] == ["blocks/full_adder.json"]
+
+    # Open the moved project from somewhere else entirely
+    moved = tmp_path / "moved"
+    project.rename(moved)
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    board = load_netlist(str(moved / name))
+    assert [component_type(component) for component in board.components][
+        2
+    ] == "SUBCIRCUIT"
+    assert board.evaluate([1, 1]) == [False, True]
+    assert board.evaluate([1, 0]) == [True, False]
+
+
+def test_block_pins_keep_no_high_input_counts(tmp_path):
+    board = load_netlist(str(save_block_board(tmp_path, "board.json")))
+    block = board.components[2]
+    board.evaluate([1, 1])  # Sum 0, carry 1: the block state is 2
+    assert block.state == 2
+    assert [pin.high_inputs for pin in block.outputs] == [0, 0]
+    board.remove(block)
+    assert [board.components[n].high_inputs for n in (2, 3)] == [0, 0]
+
+
+@pytest.mark.parametrize("name", ["board.json", "board.eenl"])
+def test_input_states_survive_a_round_trip(tmp_path, name):
+    board = toggled_board()
+    path = str(tmp_path / name)
+    save_netlist(board, path)
+    loaded = load_netlist(path)
+    assert saved_states(loaded) == saved_states(board)
+    if name.endswith(".json"):
+        saved = [json.loads(line) for line in open(path).read().splitlines()[1:]]
+        assert [data.get("state") for data in saved[:6]] == [1, None, 1, None, 1, None]
+
+
+@pytest.mark.parametrize("name", ["board.json", "board.eenl"])
+def test_clocked_states_survive_a_round_trip(tmp_path, name):
+    board = clocked_board()
+    assert board.components[2].bits == 0b1011
+    path = str(tmp_path / name)
+    save_netlist(board, path)
+    loaded = load_netlist(path)
+    assert saved_states(loaded) == saved_states(board)
+    # ... and the reloaded board carries on from there
+    for circuit in (board, loaded):
+        circuit.tick(2)
+    assert saved_states(loaded) == saved_states(board)
+
+
+def test_autosave_journal_restores_clocked_states(tmp_path):
+    board = clocked_board()
+    path = str(tmp_path / "autosave.json")
+    journal = AutosaveJournal(path)
+    journal.flush(board)  # Snapshot
+    board.components[0].toggle()
+    journal.mark_changed(board.components[0])
+    for component in board.tick(2):  # As the designer journals ticks
+        journal.mark_changed(component)
+    journal.flush(board)  # Journal entries only
+    assert saved_states(load_netlist(path)) == saved_states(board)
+
+
+def test_version_1_binary_files_load(tmp_path):
+    # Two inputs (the first one high) into an AND gate driving an output, without fan-in bytes
+    records = [(0, 0, []), (1, 0, []), (2, 2, [0, 1]), (3, 1, [2])]
+    data = struct.pack("<4sHI", b"EENL", 1, len(records))
+    for component_id, code, inputs in records:
+        data += struct.pack("<IBiiH", component_id, code, 0, 0, len(inputs))
+        data += struct.pack(f"<{len(inputs)}I", *inputs)
+        if code == 0:
+            data += struct.pack("<I", component_id == 0)
+    path = tmp_path / "old.eenl"
+    path.write_bytes(data)
+    circuit = load_netlist(str(path))
+    assert [record[5] for record in records_of(circuit)] == [None] * 4
+    assert circuit.evaluate([1, 1]) == [True]
+    assert circuit.evaluate([1, 0]) == [False]
+
+
+def test_newer_versions_are_refused(tmp_path):
+    path = tmp_path / "board.json"
+    path.write_text(json.dumps({"format": "ee120-netlist", "version": 99}) + "\n")
+    with pytest.raises(ValueError):
+        load_netlist(str(path))
+
+
+def test_autosave_journal_replays_changes(tmp_path):
+    board = toggled_board()
+    path = str(tmp_path / "autosave.json")
+    journal = AutosaveJournal(path)
+    journal.flush(board)  # Snapshot
+    board.inputs[1].toggle()
+    journal.mark_changed(board.inputs[1])
+    removed = board.outputs[0]
+    board.remove(removed)
+    journal.mark_removed(removed)
+    journal.flush(board)  # Journal entries only
+    assert os.path.exists(journal.journal_path)
+    loaded = load_netlist(path)
+    assert records_of(loaded) == records_of(board)
+    assert saved_states(loaded) == saved_states(board)
+
+
+def test_autosave_keeps_the_previous_session(tmp_path):
+    path = str(tmp_path / "autosave.json")
+    first = toggled_board()
+    journal = AutosaveJournal(path)
+    journal.flush(first)
+    first.inputs[1].toggle()
+    journal.mark_changed(first.inputs[1])
+    journal.flush(first)
+    previous = saved_states(load_netlist(path))
+
+    # A new session's first snapshot moves the old autosave and its journal aside
+    journal = AutosaveJournal(path)
+    fresh = build_circuit(random_records(6, 60, seed=2))
+    journal.flush(fresh)
+    assert saved_states(load_netlist(journal.previous_path)) == previous
+    assert saved_states(load_netlist(path)) == saved_states(fresh)
+    assert not os.path.exists(journal.journal_path)
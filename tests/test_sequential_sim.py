@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from sequential_sim import (
+    simulate_counter,
+    simulate_shift_register,
+    simulate_toggle_chain,
+)
+
+SIMULATORS = {
+    "counter": lambda clock, width, start, data: simulate_counter(clock, width, start),
+    "toggle_chain": lambda clock, width, start, data: simulate_toggle_chain(
+        clock, width, start
+    ),
+    "shift": lambda clock, width, start, data: simulate_shift_register(
+        clock, data, width, start
+    ),
+}
+
+
+# Function to advance a register by one rising edge, one bit at a time
+def next_state(kind, state, width, data):
+    mask = (1 << width) - 1
+    if kind == "counter":
+        return (state + 1) & mask
+    if kind == "shift":
+        return ((state << 1) | data) & mask
+    # Toggle chain (flip_flop.py): Q0 toggles, and each later stage toggles when the stage
+    # before it is low after the edge
+    bits = [(state >> bit) & 1 for bit in range(width)]
+    bits[0] ^= 1
+    for bit in range(1, width):
+        if bits[bit - 1] == 0:
+            bits[bit] ^= 1
+    return sum(value << bit for bit, value in enumerate(bits))
+
+
+# Function to simulate sample by sample: look for a rising edge at every sample and apply it
+def reference_register(clock, kind, width, start, data):
+    state = start & ((1 << width) - 1)
+    traces = np.zeros((width, len(clock)), dtype=np.uint8)
+    for sample in range(len(clock)):
+        if sample and clock[sample - 1] == 0 and clock[sample] == 1:
+            state = next_state(kind, state, width, int(data[sample - 1]))
+        for bit in range(width):
+            traces[bit, sample] = (state >> bit) & 1
+    return traces
+
+
+@pytest.mark.parametrize("kind", sorted(SIMULATORS))
+@pytest.mark.parametrize("width", [1, 2, 3, 5, 8, 17, 64])
+def test_matches_sample_by_sample_reference(kind, width):
+    rng = np.random.default_rng(width)
+    clocks = [
+        np.tile([0, 0, 0, 1, 1, 1], 40),
+        np.tile([1, 1, 0, 0, 0, 0, 0], 25),
+        rng.integers(0, 2, 300),  # Irregular edges, some one sample apart
+    ]
+    start = int(rng.integers(0, 1 << 62)) * 3
+    for clock in clocks:
+        clock = clock.astype(np.uint8)
+        data = rng.integers(0, 2, len(clock)).astype(np.uint8)
+        expected = reference_register(clock, kind, width, start, data)
+        assert np.array_equal(SIMULATORS[kind](clock, width, start, data), expected)
+
+
+def test_width_is_checked():
+    with pytest.raises(ValueError):
+        simulate_counter(np.zeros(10, dtype=np.uint8), 65)
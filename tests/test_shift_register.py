@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from sequential_sim import MAX_WIDTH
+from shift_register import (
+    REGISTER_TYPES,
+    RegisterBank,
+    register_edge_states,
+    simulate_register_type,
+)
+from stimulus import generate_clock_signal
+
+NUM_EDGES = (
+    150  # More edges than stages, so every stage sees the start, loads and serial data
+)
+
+
+# Function to step a RegisterBank edge by edge, one row of packed states per register
+def stepped_states(register_type, width, start, serial, parallel, load):
+    bank = RegisterBank(len(start), width, register_type)
+    bank.state = np.asarray(start, dtype=np.uint64) & np.uint64((1 << width) - 1)
+    states = np.empty(serial.shape, dtype=np.uint64)
+    for edge in range(serial.shape[1]):
+        edge_load = None if load is None else load[:, edge]
+        states[:, edge] = bank.step(serial[:, edge], parallel[:, edge], edge_load)
+    return states
+
+
+@pytest.mark.parametrize("register_type", REGISTER_TYPES)
+@pytest.mark.parametrize("width", range(1, MAX_WIDTH + 1))
+def test_closed_form_matches_stepping(register_type, width):
+    rng = np.random.default_rng(width)
+    count = 3
+    start = rng.integers(0, 1 << 63, count, dtype=np.uint64) << np.uint64(
+        1
+    ) | np.uint64(1)
+    serial = rng.integers(0, 2, (count, NUM_EDGES), dtype=np.uint64)
+    parallel = rng.integers(
+        0, 1 << 63, (count, NUM_EDGES), dtype=np.uint64
+    ) << np.uint64(1)
+    load = rng.random((count, NUM_EDGES)) < 0.05
+    load[0] = (
+        False  # One register is never loaded: PISO shifts throughout, PIPO keeps its start
+    )
+    for edge_load in (load, None):
+        expected = stepped_states(
+            register_type, width, start, serial, parallel, edge_load
+        )
+        states = register_edge_states(
+            register_type, width, start, serial, parallel, edge_load
+        )
+        assert np.array_equal(states, expected)
+
+
+def test_many_registers_match_closed_form():
+    rng = np.random.default_rng(1)
+    count = 80  # Past STEP_MIN_REGISTERS, so the bank is stepped
+    serial = rng.integers(0, 2, (count, NUM_EDGES))
+    parallel = rng.integers(0, 1 << 12, (count, NUM_EDGES))
+    load = rng.random((count, NUM_EDGES)) < 0.1
+    for register_type in REGISTER_TYPES:
+        stepped = register_edge_states(register_type, 12, 5, serial, parallel, load)
+        closed = np.concatenate(
+            [
+                register_edge_states(
+                    register_type,
+                    12,
+                    5,
+                    serial[n : n + 1],
+                    parallel[n : n + 1],
+                    load[n : n + 1],
+                )
+                for n in range(count)
+            ]
+        )
+        assert np.array_equal(stepped, closed)
+
+
+def test_register_traces_follow_the_clock():
+    clock = generate_clock_signal(6, 4)
+    edges = [4 * n + 2 for n in range(6)]
+    serial = [1, 0, 1, 1, 0, 0]
+    traces = simulate_register_type(clock, "SIPO", width=3, serial=serial, start=0b100)
+    expected = [[0] * 24, [0] * 24, [1] * 24]
+    state = 0b100
+    for n, edge in enumerate(edges):
+        state = ((state << 1) | serial[n]) & 0b111
+        for bit in range(3):
+            expected[bit][edge:] = [(state >> bit) & 1] * (24 - edge)
+    assert traces.tolist() == expected
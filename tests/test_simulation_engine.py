@@ -0,0 +1,102 @@
+from circuit import Circuit, Clock, Gate, Input, Sequential
+from netlist_format import build_circuit
+from tests.netlists import adder_records
+
+
+# Function to build an n-stage TFF ripple counter: T tied high, each stage clocked by the
+# output of the one before it
+def ripple_counter(stages):
+    circuit = Circuit()
+    high, clock = Input(0, 0), Clock(0, 100)
+    circuit.add(high)
+    circuit.add(clock)
+    high.toggle()
+    flip_flops = []
+    source = clock
+    for stage in range(stages):
+        flip_flop = Sequential(100 * (stage + 1), 0, "TFF")
+        circuit.add(flip_flop)
+        circuit.connect(high, flip_flop)
+        circuit.connect(source, flip_flop)
+        flip_flops.append(flip_flop)
+        source = flip_flop
+    return circuit, flip_flops
+
+
+def counter_value(flip_flops):
+    return sum(flip_flop.bits << stage for stage, flip_flop in enumerate(flip_flops))
+
+
+def test_adder_settles_to_sum():
+    circuit = build_circuit(adder_records(4))
+    for a in range(16):
+        for b in range(16):
+            values = [(value >> bit) & 1 for bit in range(4) for value in (a, b)]
+            outputs = circuit.evaluate(values)
+            assert sum(bit << position for position, bit in enumerate(outputs)) == a + b
+
+
+def test_each_gate_evaluated_once_per_change():
+    circuit = Circuit()
+    source = Input(0, 0)
+    circuit.add(source)
+    previous = source
+    for position in range(10):
+        gate = Gate(100 * (position + 1), 0, "BUFFER")
+        circuit.add(gate)
+        circuit.connect(previous, gate)
+        previous = gate
+    before = circuit.engine.evaluations
+    source.toggle()
+    assert circuit.engine.evaluations - before == 10
+    assert previous.state
+
+
+def test_oscillating_loop_is_reported(capsys):
+    circuit = Circuit()
+    inverter = Gate(0, 0, "NOT")
+    circuit.add(inverter)
+    circuit.connect(inverter, inverter)
+    assert circuit.engine.oscillating == {inverter}
+    assert "oscillating" in capsys.readouterr().out
+
+
+def test_long_ripple_counter_counts(capsys):
+    circuit, flip_flops = ripple_counter(70)
+    # The ripple counter counts down: the first rising edge toggles every stage
+    circuit.tick()
+    assert counter_value(flip_flops) == (1 << 70) - 1
+    for _ in range(5):
+        circuit.tick(2)
+    assert counter_value(flip_flops) == (1 << 70) - 6
+    assert "re-triggering" not in capsys.readouterr().out
+
+
+def test_clocked_oscillation_stops_after_settling_logic(capsys):
+    # Two TFFs clocking each other: every toggle of one raises the other's clock
+    circuit = Circuit()
+    high, kick = Input(0, 0), Input(0, 100)
+    first, second = Sequential(200, 0, "TFF"), Sequential(200, 100, "TFF")
+    first_clock, second_clock = Gate(100, 0, "XNOR", 3), Gate(100, 100, "XOR")
+    for component in (high, kick, first, second, first_clock, second_clock):
+        circuit.add(component)
+    high.toggle()
+    kick.toggle()
+    for source, target in (
+        (first, first_clock),
+        (second, first_clock),
+        (kick, first_clock),
+        (first, second_clock),
+        (second, second_clock),
+        (high, first),
+        (first_clock, first),
+        (high, second),
+        (second_clock, second),
+    ):
+        circuit.connect(source, target)
+    circuit.engine.max_delta_cycles = 8
+    kick.toggle()
+    assert "re-triggering" in capsys.readouterr().out
+    # The clock gates were still evaluated after the last delta cycle
+    assert first_clock.state == ((first.state + second.state) % 2 == 0)
+    assert second_clock.state == (first.state != second.state)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from sequential_sim import rising_edges, simulate_register
+from stimulus import generate_clock_signal
+from streaming_sim import open_trace, stream_register
+
+PERIODS = 12
+STEPS_PER_PERIOD = 5
+DATA = [1, 0, 0, 1, 1]
+
+
+@pytest.mark.parametrize("kind", ["counter", "toggle_chain", "shift"])
+@pytest.mark.parametrize("start_high", [False, True])
+def test_chunked_output_matches_whole_trace(tmp_path, kind, start_high):
+    length = PERIODS * STEPS_PER_PERIOD
+    clock = generate_clock_signal(PERIODS, STEPS_PER_PERIOD, 0.4, start_high=start_high)
+    data = np.resize(DATA, len(rising_edges(clock)))
+    expected = simulate_register(clock, kind, 6, start=0b101101, data=data)
+
+    # Every chunk size, so edges fall on chunk boundaries, just after them and in between
+    for chunk_size in range(1, length + 2):
+        directory = str(tmp_path / f"chunk{chunk_size}")
+        _, traces = stream_register(
+            directory,
+            PERIODS,
+            STEPS_PER_PERIOD,
+            0.4,
+            start_high,
+            kind,
+            6,
+            0b101101,
+            DATA,
+            chunk_size,
+        )
+        assert np.array_equal(traces["clock"], clock), chunk_size
+        assert np.array_equal(
+            np.stack([traces[f"Q{bit}"] for bit in range(6)]), expected
+        ), chunk_size
+
+
+def test_reopened_trace(tmp_path):
+    stream_register(str(tmp_path), PERIODS, STEPS_PER_PERIOD, chunk_size=7)
+    metadata, traces = open_trace(str(tmp_path))
+    assert metadata["kind"] == "toggle_chain"
+    clock = generate_clock_signal(PERIODS, STEPS_PER_PERIOD)
+    expected = simulate_register(clock, "toggle_chain", 4)
+    assert np.array_equal(np.stack([traces[f"Q{bit}"] for bit in range(4)]), expected)
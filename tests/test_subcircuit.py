@@ -0,0 +1,84 @@
+import itertools
+
+import pytest
+
+from benchmarks import block_adder, full_adder, parity_tree, ripple_carry_adder
+from netlist_format import build_circuit, load_netlist, save_netlist
+from subcircuit import TABLE_INPUTS, load_definition
+
+
+@pytest.fixture
+def adder_block(tmp_path):
+    path = tmp_path / "blocks" / "full_adder.json"
+    path.parent.mkdir()
+    save_netlist(build_circuit(full_adder()), str(path))
+    return path
+
+
+# Function to list every component that is a subcircuit block
+def blocks_of(circuit):
+    return [
+        component
+        for component in circuit.components
+        if hasattr(component, "definition")
+    ]
+
+
+@pytest.mark.parametrize("bits", [1, 2, 4])
+def test_block_adder_matches_flat_adder(adder_block, bits):
+    flat = build_circuit(ripple_carry_adder(bits))
+    hierarchical = build_circuit(block_adder(bits, str(adder_block)))
+    assert len(blocks_of(hierarchical)) == bits
+    for values in itertools.product([0, 1], repeat=2 * bits):
+        assert hierarchical.evaluate(values) == flat.evaluate(values), values
+
+
+def test_definition_is_shared_across_instances(adder_block):
+    circuit = build_circuit(block_adder(4, str(adder_block)))
+    definitions = {id(block.definition) for block in blocks_of(circuit)}
+    assert len(definitions) == 1
+    assert load_definition(str(adder_block)) is blocks_of(circuit)[0].definition
+    assert blocks_of(circuit)[0].definition.table is not None
+
+
+def test_wide_block_memo_is_shared_across_instances(tmp_path):
+    path = tmp_path / "parity.json"
+    save_netlist(build_circuit(parity_tree(TABLE_INPUTS + 2)), str(path))
+    records = [(n, "INPUT", 0, 100 * n, [], None) for n in range(TABLE_INPUTS + 2)]
+    inputs = [record[0] for record in records]
+    for block in range(2):
+        block_id = len(records)
+        records.append((block_id, "SUBCIRCUIT", 100, 400 * block, inputs, str(path)))
+        records.append((block_id + 1, "PIN", 200, 400 * block, [block_id], None))
+        records.append((block_id + 2, "OUTPUT", 300, 400 * block, [block_id + 1], None))
+    circuit = build_circuit(records)
+    first, second = blocks_of(circuit)
+    assert first.definition is second.definition
+    assert first.definition.table is None
+
+    values = [1] * 3 + [0] * (TABLE_INPUTS - 1)
+    assert circuit.evaluate(values) == [True, True]
+    assert first.input_vector() in first.definition.memo
+
+    # Blocks built later start from the vectors the first ones already worked out
+    memoized = len(first.definition.memo)
+    again = build_circuit(records)
+    assert blocks_of(again)[0].definition is first.definition
+    assert again.evaluate(values) == [True, True]
+    assert len(first.definition.memo) == memoized
+
+
+def test_reload_from_another_directory(tmp_path, monkeypatch, adder_block):
+    monkeypatch.chdir(tmp_path)
+    records = block_adder(
+        2, "blocks/full_adder.json"
+    )  # Relative to the working directory
+    save_netlist(build_circuit(records), "adder.json")
+
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    loaded = load_netlist(str(tmp_path / "adder.json"))
+    flat = build_circuit(ripple_carry_adder(2))
+    for values in itertools.product([0, 1], repeat=4):
+        assert loaded.evaluate(values) == flat.evaluate(values), values
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from sequential_sim import simulate_register
+from stimulus import generate_clock_signal
+from sweep import RESULT_COLUMNS, SWEEP_PARAMETERS, expand_grid, run_sweep
+
+GRID = {
+    "periods": [3, 8],
+    "steps_per_period": [4, 10],
+    "duty_cycle": [0.5],
+    "start_high": [False, True],
+    "register": ["counter", "toggle_chain", "shift", "SISO", "PIPO"],
+    "width": [1, 5, 64],
+}
+
+
+def test_expand_grid():
+    configs = expand_grid(GRID)
+    assert len(configs) == 2 * 2 * 2 * 5 * 3
+    assert all(set(config) == set(SWEEP_PARAMETERS) for config in configs)
+    with pytest.raises(ValueError):
+        expand_grid({"periods": [1]})
+
+
+def test_final_state_holds_64_bit_registers():
+    grid = dict(
+        GRID,
+        periods=[70],
+        register=["PIPO"],
+        width=[64],
+        start_high=[False],
+        steps_per_period=[4],
+    )
+    table = run_sweep(grid, workers=1)
+    assert table["final_state"].dtype == np.uint64
+    assert table["final_state"][0] == (1 << 64) - 1
+
+
+def test_final_state_matches_register_simulation():
+    grid = dict(GRID, register=["counter"], width=[5])
+    table = run_sweep(grid, workers=1)
+    for row, config in enumerate(expand_grid(grid)):
+        clock = generate_clock_signal(
+            config["periods"],
+            config["steps_per_period"],
+            config["duty_cycle"],
+            start_high=config["start_high"],
+        )
+        bits = simulate_register(clock, "counter", 5, data=1)
+        assert table["final_state"][row] == sum(
+            int(bits[bit, -1]) << bit for bit in range(5)
+        )
+
+
+def test_worker_count_does_not_change_results():
+    serial = run_sweep(GRID, workers=1)
+    parallel = run_sweep(GRID, workers=3)
+    for name in SWEEP_PARAMETERS + RESULT_COLUMNS:
+        assert serial[name].dtype == parallel[name].dtype
+        if name != "seconds":
+            assert np.array_equal(serial[name], parallel[name]), name
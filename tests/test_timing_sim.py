@@ -0,0 +1,92 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from benchmarks import block_adder, full_adder
+from netlist_format import build_circuit, save_netlist
+from tests.netlists import adder_records, parity_records, random_records
+from timing_sim import TimingSimulator, counter_stimulus, main
+from trace_store import read_vcd
+
+PERIOD = 500  # Longer than any path through the test netlists, so every vector settles
+
+
+@pytest.mark.parametrize(
+    "records",
+    [random_records(5, 80, seed=seed) for seed in range(4)]
+    + [adder_records(2), parity_records(5)],
+)
+def test_steady_state_matches_evaluate(records):
+    circuit = build_circuit(records)
+    num_inputs = len(circuit.inputs)
+    until = PERIOD << num_inputs
+    stimulus = counter_stimulus(num_inputs, PERIOD, until)
+    store = TimingSimulator(circuit).run(stimulus, until)
+    outputs = [store[f"O{n}"].to_dense() for n in range(len(circuit.outputs))]
+
+    reference = build_circuit(records)
+    for row, values in enumerate(itertools.product([0, 1], repeat=num_inputs)):
+        settled = (row + 1) * PERIOD - 1  # Last step before the next input change
+        expected = [int(value) for value in reference.evaluate(values)]
+        assert [int(output[settled]) for output in outputs] == expected, values
+
+
+def test_reconvergent_fanout_glitches():
+    # AND(A, NOT A) is always low once settled, but when A rises the AND sees both inputs
+    # high until the inverter catches up (NOT delay 1, AND delay 2)
+    records = [
+        (0, "INPUT", 0, 0, [], None),
+        (1, "NOT", 100, 100, [0], None),
+        (2, "AND", 200, 0, [0, 1], None),
+        (3, "OUTPUT", 300, 0, [2], None),
+    ]
+    stimulus = {0: ([0, 10, 30], [0, 1, 0])}
+    store = TimingSimulator(build_circuit(records)).run(stimulus, 50)
+    assert store["O0"].times.tolist() == [0, 12, 13]
+    assert store["O0"].values.tolist() == [0, 1, 0]
+
+    # With the inverter slower than the AND the pulse widens to the difference
+    store = TimingSimulator(build_circuit(records), {"NOT": (3, 3)}).run(stimulus, 50)
+    assert store["O0"].times.tolist() == [0, 12, 15]
+
+
+def test_clocked_netlist_is_rejected():
+    records = [
+        (0, "INPUT", 0, 0, [], None),
+        (1, "CLOCK", 0, 100, [], None),
+        (2, "DFF", 100, 0, [0, 1], None),
+        (3, "OUTPUT", 200, 0, [2], None),
+    ]
+    with pytest.raises(ValueError):
+        TimingSimulator(build_circuit(records))
+
+
+def test_subcircuit_netlist_is_rejected(tmp_path):
+    block_path = str(tmp_path / "full_adder.json")
+    save_netlist(build_circuit(full_adder()), block_path)
+    with pytest.raises(ValueError):
+        TimingSimulator(build_circuit(block_adder(2, block_path)))
+
+
+def test_delays_must_be_positive():
+    with pytest.raises(ValueError):
+        TimingSimulator(build_circuit(adder_records(1)), {"XOR": (0, 1)})
+
+
+def test_vcd_export_matches_the_run(tmp_path):
+    records = adder_records(2)
+    netlist_path = str(tmp_path / "adder.json")
+    vcd_path = str(tmp_path / "adder.vcd")
+    save_netlist(build_circuit(records), netlist_path)
+    main([netlist_path, "--period", "40", "--gates", "--vcd", vcd_path])
+
+    circuit = build_circuit(records)
+    until = 40 << len(circuit.inputs)
+    stimulus = counter_stimulus(len(circuit.inputs), 40, until)
+    store = TimingSimulator(circuit).run(stimulus, until, record_gates=True)
+    with open(vcd_path) as f:
+        loaded = read_vcd(f)
+    assert list(loaded) == list(store)
+    for name in store:
+        assert np.array_equal(loaded[name].to_dense(), store[name].to_dense()), name
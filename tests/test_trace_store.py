@@ -0,0 +1,45 @@
+import io
+
+import numpy as np
+
+from streaming_sim import stream_register
+from trace_store import ChangeTrace, TraceStore, read_vcd, write_vcd
+
+
+def vcd_round_trip(store):
+    f = io.StringIO()
+    write_vcd(store, f)
+    f.seek(0)
+    return read_vcd(f)
+
+
+def assert_same_traces(loaded, store):
+    assert list(loaded) == list(store)
+    for name in store:
+        assert loaded[name].length == store[name].length
+        assert loaded[name].width == store[name].width
+        assert np.array_equal(loaded[name].to_dense(), store[name].to_dense())
+
+
+def test_vcd_round_trip():
+    rng = np.random.default_rng(0)
+    store = TraceStore.from_dense(
+        {
+            "clock": np.arange(1000) // 5 % 2,
+            "data": rng.integers(0, 2, 1000),
+            "constant": np.ones(1000, dtype=np.uint8),
+        }
+    )
+    store["count"] = ChangeTrace(
+        [0, 10, 250, 999], np.array([0, 5, 200, 13], dtype=np.uint64), 1000, width=8
+    )
+    assert_same_traces(vcd_round_trip(store), store)
+
+
+def test_streamed_register_vcd_round_trip(tmp_path):
+    _, traces = stream_register(
+        str(tmp_path), 50, 8, kind="counter", width=6, chunk_size=64
+    )
+    store = TraceStore.from_dense(traces)
+    assert_same_traces(vcd_round_trip(store), store)
+    assert np.array_equal(store["Q0"].to_dense(), traces["Q0"])
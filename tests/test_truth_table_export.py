@@ -0,0 +1,55 @@
+import itertools
+
+import pytest
+
+from truth_table_export import (
+    MAX_INPUTS,
+    expression_function,
+    gate_function,
+    iter_truth_table,
+    main,
+    write_packed,
+)
+
+
+def test_expression_matches_python_operators():
+    rows = list(itertools.product([0, 1], repeat=3))
+    outputs = [
+        int(output)
+        for _, block in iter_truth_table(
+            3, expression_function("(I1 | I2) & ~I3 ^ 1"), 4
+        )
+        for output in block
+    ]
+    assert outputs == [((a | b) & (1 - c)) ^ 1 for a, b, c in rows]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('true')",
+        "I1 + I2",
+        "I0",
+        "I1.real",
+        "2",
+        "I1 if I2 else I3",
+    ],
+)
+def test_expression_rejects_anything_but_bitwise_logic(expression):
+    with pytest.raises(ValueError):
+        expression_function(expression)
+
+
+def test_expression_needs_its_inputs():
+    with pytest.raises(ValueError):
+        list(iter_truth_table(2, expression_function("I1 & I3")))
+
+
+@pytest.mark.parametrize("num_inputs", [0, -1, MAX_INPUTS + 1, 256])
+def test_input_count_out_of_range(num_inputs, tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_truth_table(num_inputs, gate_function("OR")))
+    with open(tmp_path / "table.bin", "wb") as f, pytest.raises(ValueError):
+        write_packed(f, num_inputs, gate_function("OR"))
+    with pytest.raises(SystemExit):
+        main([str(num_inputs), "-o", str(tmp_path / "table.csv")])
@@ -0,0 +1,82 @@
+import time
+
+# Simulation scheduler for clocked circuits, decoupled from the frame rate.
+# The circuit ticks at `tick_rate` ticks per second of wall time (every CLOCK flips once per
+# tick, so a full clock cycle takes two ticks). Once per frame the GUI calls advance(), which
+# runs however many ticks are due in batches, checking the time after each batch. Ticks that
+# do not fit into the frame's time budget are dropped rather than carried over, so a rate the
+# machine cannot keep up with runs as fast as it can instead of stalling the UI.
+
+DEFAULT_TICK_RATE = 2  # One clock cycle per second
+MIN_TICK_RATE = 1
+MAX_TICK_RATE = 10_000_000
+DEFAULT_BUDGET_MS = (
+    8  # Simulation time per frame, leaving the rest of a 60 Hz frame to drawing
+)
+TICK_BATCH = 64  # Ticks run between two looks at the clock
+
+
+class TickScheduler:
+    def __init__(
+        self,
+        tick_rate=DEFAULT_TICK_RATE,
+        budget_ms=DEFAULT_BUDGET_MS,
+        timer=time.perf_counter,
+    ):
+        self.set_rate(tick_rate)
+        self.budget = budget_ms / 1000
+        self.timer = timer
+        self.running = False
+        self.ticks = 0  # Ticks run so far
+        self.dropped = 0  # Ticks skipped because they did not fit in the budget
+        self._owed = 0.0
+        self._last = None
+
+    def start(self):
+        self.running = True
+        self._owed = 0.0
+        self._last = self.timer()
+
+    def stop(self):
+        self.running = False
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    # Function to change the tick rate, e.g. by a factor of 10 for fast-forward
+    def set_rate(self, tick_rate):
+        self.tick_rate = max(MIN_TICK_RATE, min(int(tick_rate), MAX_TICK_RATE))
+
+    # Function to run one tick by hand (single-stepping while paused)
+    def step(self, circuit, count=1):
+        self.ticks += count
+        return circuit.tick(count)
+
+    # Function to run the ticks that came due since the last call. Returns the set of
+    # components whose state changed.
+    def advance(self, circuit):
+        if not self.running:
+            return set()
+        now = self.timer()
+        self._owed += (now - self._last) * self.tick_rate
+        self._last = now
+        due = int(self._owed)
+        self._owed -= due
+        if not due:
+            return set()
+
+        changed = set()
+        deadline = now + self.budget
+        done = 0
+        while done < due:
+            batch = min(TICK_BATCH, due - done)
+            changed |= circuit.tick(batch)
+            done += batch
+            if self.timer() >= deadline:
+                break
+        self.ticks += done
+        self.dropped += due - done
+        return changed
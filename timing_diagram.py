@@ -1,44 +1,5 @@
-import matplotlib.pyplot as plt
-import numpy as np
-
-
-# Function to generate a clock signal starting in the low state
-def generate_clock_signal(periods, steps_per_period, duty_cycle=0.5):
-    clock = []
-    low_steps = int(steps_per_period * (1 - duty_cycle))  # Low part comes first
-    high_steps = steps_per_period - low_steps  # Remaining part is high
-    for _ in range(periods):
-        clock.extend([0] * low_steps + [1] * high_steps)  # Low state first, then high
-    return clock
-
-
-# Function to create a timing diagram for the given signals
-def plot_timing_diagram(clock, signals, signal_names):
-    t = np.arange(len(clock))  # Time steps
-    num_signals = len(signals)
-
-    fig, axs = plt.subplots(
-        num_signals + 1, 1, figsize=(10, 2 * (num_signals + 1)), sharex=True
-    )
-
-    # Plot clock signal
-    axs[0].step(t, clock, where="mid", label="Clock", color="blue")
-    axs[0].set_ylim([-0.5, 1.5])
-    axs[0].set_yticks([0, 1])
-    axs[0].set_ylabel("Clock")
-    axs[0].grid(True)
-
-    # Plot each output signal
-    for i, signal in enumerate(signals):
-        axs[i + 1].step(t, signal, where="mid", label=signal_names[i], color="green")
-        axs[i + 1].set_ylim([-0.5, 1.5])
-        axs[i + 1].set_yticks([0, 1])
-        axs[i + 1].set_ylabel(signal_names[i])
-        axs[i + 1].grid(True)
-
-    axs[-1].set_xlabel("Time")
-    plt.tight_layout()
-    plt.show()
+from stimulus import generate_clock_signal
+from waveform_viewer import plot_timing_diagram
 
 
 # Function to get user inputs for clock parameters
@@ -1,77 +1,58 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
+from sequential_sim import rising_edges
+from shift_register import check_register_type, output_stages, simulate_register_type
+from stimulus import generate_clock_signal
+from waveform_viewer import plot_timing_diagram
 
-# Function to generate a clock signal, starting in user-defined state (high or low)
-def generate_clock_signal(periods, steps_per_period, duty_cycle=0.5, start_high=False):
-    clock = []
-    if start_high:
-        high_steps = int(steps_per_period * duty_cycle)
-        low_steps = steps_per_period - high_steps
-        for _ in range(periods):
-            clock.extend([1] * high_steps + [0] * low_steps)  # High first, then low
-    else:
-        low_steps = int(steps_per_period * (1 - duty_cycle))  # Low part comes first
-        high_steps = steps_per_period - low_steps  # Remaining part is high
-        for _ in range(periods):
-            clock.extend([0] * low_steps + [1] * high_steps)  # Low first, then high
-    return clock
-
-
-# Function to create the timing diagram for the shift register
-def plot_timing_diagram(clock, signals, signal_names):
-    t = np.arange(len(clock))  # Time steps
-    num_signals = len(signals)
-
-    fig, axs = plt.subplots(
-        num_signals + 1, 1, figsize=(10, 2 * (num_signals + 1)), sharex=True
-    )
-
-    # Plot clock signal
-    axs[0].step(t, clock, where="mid", label="Clock", color="blue")
-    axs[0].set_ylim([-0.5, 1.5])
-    axs[0].set_yticks([0, 1])
-    axs[0].set_ylabel("Clock")
-    axs[0].grid(True)
-
-    # Plot each output signal (Q0, Q1, Q2, Q3)
-    for i, signal in enumerate(signals):
-        axs[i + 1].step(t, signal, where="mid", label=signal_names[i], color="green")
-        axs[i + 1].set_ylim([-0.5, 1.5])
-        axs[i + 1].set_yticks([0, 1])
-        axs[i + 1].set_ylabel(signal_names[i])
-        axs[i + 1].grid(True)
-
-    axs[-1].set_xlabel("Time")
-    plt.tight_layout()
-    plt.show()
+WIDTH = 4  # Number of register stages (Q0..Q3)
+PARALLEL_WORD = 0b1011  # Word loaded by the parallel-in register types
 
 
 # Function to simulate the behavior of the shift register based on its type
 def simulate_shift_register(
     clock, periods, steps_per_period, register_type, use_complement
 ):
-    # Initialize Q0, Q1, Q2, Q3 as low (0)
-    Q0 = [0] * len(clock)
-    Q1 = [0] * len(clock)
-    Q2 = [0] * len(clock)
-    Q3 = [0] * len(clock)
+    check_register_type(register_type)
 
     # Initial data input to Q0
     data_input = 1  # This is the data we are shifting through the register
 
-    for i in range(1, len(clock)):
-        if clock[i - 1] == 0 and clock[i] == 1:  # Rising edge detected
-            # Shift the values from Q0 to Q3 on the rising edge
-            for j in range(
-                i, len(clock)
-            ):  # Update from the current clock step to the end
-                Q3[j] = Q2[i - 1]  # Q3 takes the value of Q2
-                Q2[j] = Q1[i - 1]  # Q2 takes the value of Q1
-                Q1[j] = Q0[i - 1]  # Q1 takes the value of Q0
-                Q0[j] = data_input  # Q0 takes the new data input (assumed to be 1 here)
+    # One load flag or parallel word per rising edge (a clock starting high has one fewer
+    # edge than periods)
+    num_edges = len(rising_edges(clock))
+    if register_type == "PISO":
+        # Load the word, then shift it out over the next WIDTH - 1 edges (one value per edge)
+        load = np.arange(num_edges) % WIDTH == 0
+        parallel = PARALLEL_WORD
+    elif register_type == "PIPO":
+        # Load a new word on every edge (a count, so the outputs visibly change)
+        load = None
+        parallel = np.arange(num_edges) % (1 << WIDTH)
+    else:
+        load = None
+        parallel = 0
+
+    return tuple(
+        simulate_register_type(
+            clock,
+            register_type,
+            WIDTH,
+            serial=data_input,
+            parallel=parallel,
+            load=load,
+            use_complement=use_complement,
+        )
+    )
+
 
-    return Q0, Q1, Q2, Q3
+# Function to name the plotted stages, marking complements and the serial output
+def signal_names_for(register_type, use_complement):
+    names = [f"~Q{stage}" if use_complement else f"Q{stage}" for stage in range(WIDTH)]
+    if register_type in ("SISO", "PISO"):
+        serial_out = output_stages(register_type, WIDTH)[0]
+        names[serial_out] += " (out)"
+    return names
 
 
 # Function to get user inputs for clock parameters and register type, with added descriptions
@@ -118,24 +99,30 @@ def get_user_inputs():
     )
 
 
-# Get user inputs for the clock and register parameters
-periods, steps_per_period, duty_cycle, clock_start, register_type, use_complement = (
-    get_user_inputs()
-)
+if __name__ == "__main__":
+    # Get user inputs for the clock and register parameters
+    (
+        periods,
+        steps_per_period,
+        duty_cycle,
+        clock_start,
+        register_type,
+        use_complement,
+    ) = get_user_inputs()
 
-# Generate the clock signal (starting in the user-defined state, high or low)
-clock = generate_clock_signal(
-    periods, steps_per_period, duty_cycle, start_high=clock_start
-)
+    # Generate the clock signal (starting in the user-defined state, high or low)
+    clock = generate_clock_signal(
+        periods, steps_per_period, duty_cycle, start_high=clock_start
+    )
 
-# Simulate the shift register behavior based on the user-selected type
-Q0, Q1, Q2, Q3 = simulate_shift_register(
-    clock, periods, steps_per_period, register_type, use_complement
-)
+    # Simulate the shift register behavior based on the user-selected type
+    Q0, Q1, Q2, Q3 = simulate_shift_register(
+        clock, periods, steps_per_period, register_type, use_complement
+    )
 
-# Signals list
-signals = [Q0, Q1, Q2, Q3]
-signal_names = ["Q0", "Q1", "Q2", "Q3"]
+    # Signals list
+    signals = [Q0, Q1, Q2, Q3]
+    signal_names = signal_names_for(register_type, use_complement)
 
-# Plot the timing diagram
-plot_timing_diagram(clock, signals, signal_names)
+    # Plot the timing diagram
+    plot_timing_diagram(clock, signals, signal_names)
@@ -0,0 +1,337 @@
+import argparse
+from collections import deque
+
+import numpy as np
+
+from circuit import Gate, Input, Output, component_type
+from trace_store import ChangeTrace, TraceStore, write_vcd
+
+# Delay-aware, event-driven timing simulation.
+# Every gate type has a rise and a fall delay (in integer time steps). When a gate's inputs
+# change it is re-evaluated and its new value is scheduled for now + delay, so hazards and
+# glitches show up the way they would in hardware instead of being hidden by zero-delay
+# evaluation. Delays are transport delays: a newly scheduled value cancels any value the
+# gate had scheduled for the same time or later, but short pulses still get through.
+#
+# Events live on a timing wheel: one bucket per time step, modulo a power-of-two size larger
+# than the longest delay, so scheduling is an append and popping is taking the next bucket.
+# The netlist is flattened into plain lists indexed by component number beforehand, and gates
+# keep a count of their high inputs, so each event costs O(fan-out).
+#
+# Outputs and every gate can be recorded as ChangeTraces for the waveform viewer or VCD.
+
+# (rise, fall) delays per gate type. Inverting CMOS gates are the fastest; AND/OR are a
+# NAND/NOR followed by an inverter; a NOR's series pull-up makes it slower to rise.
+DEFAULT_DELAYS = {
+    "NOT": (1, 1),
+    "BUFFER": (2, 2),
+    "NAND": (1, 1),
+    "NOR": (2, 1),
+    "AND": (2, 2),
+    "OR": (3, 2),
+    "XOR": (3, 3),
+    "XNOR": (3, 3),
+}
+
+# Gate functions over (connected inputs, fan-in, high inputs), as in circuit.Gate.evaluate
+_GATE_FUNCTIONS = {
+    "AND": lambda connected, fan_in, high: connected == fan_in and high == connected,
+    "OR": lambda connected, fan_in, high: high > 0,
+    "NOT": lambda connected, fan_in, high: connected == 1 and high == 0,
+    "NAND": lambda connected, fan_in, high: not (
+        connected == fan_in and high == connected
+    ),
+    "NOR": lambda connected, fan_in, high: high == 0,
+    "XOR": lambda connected, fan_in, high: connected == fan_in and high % 2 == 1,
+    "XNOR": lambda connected, fan_in, high: connected == fan_in and high % 2 == 0,
+    "BUFFER": lambda connected, fan_in, high: connected == 1 and high == 1,
+}
+
+
+# Function to name every component for traces: I0.. for inputs, O0.. for outputs and
+# <TYPE><id> for everything else
+def signal_names(circuit):
+    names = {}
+    inputs = outputs = 0
+    for component in circuit.components:
+        if isinstance(component, Input):
+            names[id(component)] = f"I{inputs}"
+            inputs += 1
+        elif isinstance(component, Output):
+            names[id(component)] = f"O{outputs}"
+            outputs += 1
+        else:
+            names[id(component)] = f"{component_type(component)}{component.id}"
+    return names
+
+
+# Function to turn a stimulus (ChangeTrace, (times, values) pair or dense per-step array)
+# into change times and values
+def _stimulus_changes(stimulus):
+    if isinstance(stimulus, ChangeTrace):
+        return stimulus.times, stimulus.values
+    if isinstance(stimulus, tuple):
+        return np.asarray(stimulus[0], dtype=np.int64), np.asarray(stimulus[1])
+    trace = ChangeTrace.from_dense(np.asarray(stimulus))
+    return trace.times, trace.values
+
+
+class TimingSimulator:
+    def __init__(self, circuit, delays=None):
+        delays = dict(DEFAULT_DELAYS, **(delays or {}))
+        self.circuit = circuit
+        self.components = list(circuit.components)
+        self.names = signal_names(circuit)
+        index_of = {id(component): n for n, component in enumerate(self.components)}
+
+        self.fanout = [
+            [index_of[id(output)] for output in component.outputs]
+            for component in self.components
+        ]
+        self.is_output = [
+            isinstance(component, Output) for component in self.components
+        ]
+        # Connections are fixed for a run, so each gate's function becomes a lookup table from
+        # its number of high inputs to its output, and its delays a (fall, rise) pair
+        self.table = [None] * len(self.components)
+        self.delay = [None] * len(self.components)
+        for n, component in enumerate(self.components):
+            if getattr(component, "clocked", False):
+                raise ValueError(
+                    "Timing simulation supports combinational circuits only"
+                )
+            if hasattr(component, "definition"):
+                raise ValueError(
+                    "Timing simulation does not look inside subcircuits; use the flat netlist"
+                )
+            connected = len(component.inputs)
+            if isinstance(component, Gate):
+                function = _GATE_FUNCTIONS[component.gate_type]
+                self.table[n] = [
+                    function(connected, component.max_inputs, high)
+                    for high in range(connected + 1)
+                ]
+                rise, fall = delays[component.gate_type]
+                if min(rise, fall) < 1:
+                    raise ValueError(
+                        f"{component.gate_type} delays must be at least one time step"
+                    )
+                self.delay[n] = (fall, rise)
+            elif isinstance(component, Output) and connected:
+                self.table[n] = [high > 0 for high in range(connected + 1)]
+
+        longest = max([max(delay) for delay in self.delay if delay] + [1])
+        self.wheel_size = (
+            1 << longest.bit_length()
+        )  # Power of two larger than any delay
+        self.events = 0
+
+    # Function to run the circuit from time 0 until `until`, driving the inputs from `stimulus`
+    # ({input index or name "I<n>": ChangeTrace, (times, values) or dense array}). The circuit
+    # first settles (zero delay) on the time-0 input values. Returns a TraceStore with the
+    # outputs, plus every gate when `record_gates` is set.
+    def run(self, stimulus, until, record_gates=False):
+        inputs = [
+            n
+            for n, component in enumerate(self.components)
+            if isinstance(component, Input)
+        ]
+        input_changes = {}
+        for key, value in stimulus.items():
+            position = int(key[1:]) if isinstance(key, str) else key
+            input_changes[inputs[position]] = _stimulus_changes(value)
+
+        # Settle the starting state
+        initial = [self.components[n].state for n in inputs]
+        for position, n in enumerate(inputs):
+            change_times, change_values = input_changes.get(n, ((), ()))
+            if len(change_times) and change_times[0] == 0:
+                initial[position] = change_values[0]
+        self.circuit.set_inputs(initial)
+        state = [component.state for component in self.components]
+        high = [component.high_inputs for component in self.components]
+
+        # All input changes after time 0, merged in time order. Samples that repeat the
+        # previous value are dropped here rather than in the event loop.
+        times, nodes, values = [], [], []
+        for node, (change_times, change_values) in input_changes.items():
+            change_values = np.asarray(change_values).astype(bool)
+            previous = np.concatenate(([state[node]], change_values[:-1]))
+            later = (change_times > 0) & (change_values != previous)
+            times.append(change_times[later])
+            nodes.append(np.full(np.count_nonzero(later), node))
+            values.append(change_values[later])
+        if times:
+            times, nodes, values = (
+                np.concatenate(part) for part in (times, nodes, values)
+            )
+            order = np.argsort(times, kind="stable")
+            changes = list(
+                zip(
+                    times[order].tolist(), nodes[order].tolist(), values[order].tolist()
+                )
+            )
+        else:
+            changes = []
+
+        recorded = [
+            record_gates or self.is_output[n] or n in input_changes
+            for n in range(len(self.components))
+        ]
+        trace_times = [
+            [0] if recorded[n] else None for n in range(len(self.components))
+        ]
+        trace_values = [
+            [state[n]] if recorded[n] else None for n in range(len(self.components))
+        ]
+
+        fanout, table, delay, is_output = (
+            self.fanout,
+            self.table,
+            self.delay,
+            self.is_output,
+        )
+        mask = self.wheel_size - 1
+        wheel = [[] for _ in range(self.wheel_size)]
+        pending = [deque() for _ in self.components]  # (time, value) scheduled per node
+        stamp = [-1] * len(
+            self.components
+        )  # Last time step each node was queued for evaluation
+        scheduled = 0
+        events = 0
+        next_change = 0
+        num_changes = len(changes)
+        now = 0
+        changed = []  # Nodes that changed this time step
+        touched = []  # Components to re-evaluate this time step
+        # Both are emptied at the end of every step rather than reallocated
+
+        while now <= until:
+            if not scheduled:
+                # Nothing in flight: jump straight to the next input change
+                if next_change >= num_changes or changes[next_change][0] > until:
+                    break
+                now = changes[next_change][0]
+
+            while next_change < num_changes and changes[next_change][0] == now:
+                _, node, value = changes[next_change]
+                next_change += 1
+                if state[node] != value:
+                    state[node] = value
+                    changed.append(node)
+
+            bucket = wheel[now & mask]
+            if bucket:
+                wheel[now & mask] = []
+                scheduled -= len(bucket)
+                for node in bucket:
+                    queue = pending[node]
+                    if not queue or queue[0][0] != now:
+                        continue  # Cancelled by a later schedule
+                    value = queue.popleft()[1]
+                    events += 1
+                    if state[node] != value:
+                        state[node] = value
+                        changed.append(node)
+
+            # Update the high-input counts downstream of every change
+            for node in changed:
+                delta = 1 if state[node] else -1
+                for target in fanout[node]:
+                    high[target] += delta
+                    if stamp[target] != now:
+                        stamp[target] = now
+                        touched.append(target)
+                if recorded[node]:
+                    trace_times[node].append(now)
+                    trace_values[node].append(state[node])
+
+            # Re-evaluate each affected component once for this time step
+            for node in touched:
+                value = table[node][high[node]]
+                if is_output[node]:
+                    if value != state[node]:
+                        state[node] = value
+                        trace_times[node].append(now)
+                        trace_values[node].append(value)
+                    continue
+                when = now + delay[node][value]
+                queue = pending[node]
+                while queue and queue[-1][0] >= when:
+                    queue.pop()
+                if (queue[-1][1] if queue else state[node]) != value:
+                    queue.append((when, value))
+                    wheel[when & mask].append(node)
+                    scheduled += 1
+            changed.clear()
+            touched.clear()
+            now += 1
+
+        self.events += events
+        store = TraceStore()
+        for node, component in enumerate(self.components):
+            if recorded[node]:
+                store[self.names[id(component)]] = ChangeTrace(
+                    trace_times[node],
+                    np.array(trace_values[node], dtype=np.uint8),
+                    until + 1,
+                )
+        return store
+
+
+# Function to build a counting stimulus: input k toggles every period * 2^k time steps,
+# so every input combination is visited and several inputs change at once on carries
+def counter_stimulus(num_inputs, period, until):
+    stimulus = {}
+    for position in range(num_inputs):
+        step = period << (
+            num_inputs - 1 - position
+        )  # First input is the most significant
+        times = np.arange(0, until + 1, step, dtype=np.int64)
+        stimulus[position] = (times, (np.arange(len(times)) % 2).astype(np.uint8))
+    return stimulus
+
+
+def main(argv=None):
+    from netlist_format import load_netlist
+
+    parser = argparse.ArgumentParser(
+        description="Timing simulation with per-gate rise/fall delays"
+    )
+    parser.add_argument("circuit", help="circuit netlist file (JSON or binary)")
+    parser.add_argument(
+        "--period", type=int, default=20, help="time steps between input changes"
+    )
+    parser.add_argument(
+        "--until",
+        type=int,
+        default=None,
+        help="last time step (default: one full count)",
+    )
+    parser.add_argument("--gates", action="store_true", help="also record every gate")
+    parser.add_argument(
+        "--vcd", help="write the traces to a VCD file instead of plotting them"
+    )
+    args = parser.parse_args(argv)
+
+    circuit = load_netlist(args.circuit)
+    num_inputs = len(circuit.inputs)
+    until = args.until if args.until is not None else args.period * (1 << num_inputs)
+    simulator = TimingSimulator(circuit)
+    store = simulator.run(
+        counter_stimulus(num_inputs, args.period, until), until, args.gates
+    )
+    print(f"Processed {simulator.events} events up to time {until}")
+
+    if args.vcd:
+        with open(args.vcd, "w") as f:
+            write_vcd(store, f)
+        print(f"Wrote {args.vcd}")
+    else:
+        from waveform_viewer import plot_trace_store
+
+        plot_trace_store(store)
+
+
+if __name__ == "__main__":
+    main()
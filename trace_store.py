@@ -0,0 +1,270 @@
+import heapq
+import string
+
+import numpy as np
+
+# Compact trace storage: each signal keeps only its value changes as (time, value) pairs.
+# Digital signals change rarely compared to how often they are sampled, so this is orders
+# of magnitude smaller than dense per-timestep arrays, while random access stays O(log n)
+# through a binary search over the change times.
+#
+# Traces can be written to and read back from Value Change Dump (VCD) files, which open in
+# standard waveform viewers such as GTKWave.
+
+RUN_LENGTH_CHUNK = 1 << 22
+
+
+# Function to find where a dense signal changes value, a chunk at a time (works on memmaps).
+# Returns (starts, values): sample index where each run starts and the value of that run.
+def run_length(signal, chunk_size=RUN_LENGTH_CHUNK):
+    signal = np.asarray(signal)
+    if len(signal) == 0:
+        return np.zeros(0, dtype=np.int64), signal[:0]
+
+    starts = [np.zeros(1, dtype=np.int64)]
+    for chunk_start in range(1, len(signal), chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, len(signal))
+        window = signal[chunk_start - 1 : chunk_stop]
+        starts.append(np.flatnonzero(window[1:] != window[:-1]) + chunk_start)
+    starts = np.concatenate(starts)
+    return starts, signal[starts]
+
+
+# One signal stored as value changes: values[k] holds from times[k] until times[k + 1]
+# (the last one until `length`)
+class ChangeTrace:
+    def __init__(self, times, values, length, width=1):
+        self.times = np.asarray(times, dtype=np.int64)
+        self.values = np.asarray(values)
+        self.length = int(length)
+        self.width = width
+
+    def __len__(self):
+        return len(self.times)
+
+    # Function to build a trace from a dense per-timestep array
+    @classmethod
+    def from_dense(cls, signal, width=1):
+        times, values = run_length(signal)
+        return cls(times, values, len(signal), width)
+
+    # Function to expand back into a dense per-timestep array
+    def to_dense(self):
+        return np.repeat(self.values, np.diff(np.append(self.times, self.length)))
+
+    # Function to read the value at one time step (binary search over the change times)
+    def value_at(self, time):
+        return self.values[np.searchsorted(self.times, time, side="right") - 1]
+
+    # Function to read the values at many time steps at once
+    def values_at(self, times):
+        return self.values[
+            np.searchsorted(self.times, np.asarray(times), side="right") - 1
+        ]
+
+    # Function to cut out the part of the trace between two time steps, re-based to start at 0
+    def window(self, start, stop):
+        first = max(np.searchsorted(self.times, start, side="right") - 1, 0)
+        last = np.searchsorted(self.times, stop, side="left")
+        times = np.maximum(self.times[first:last], start) - start
+        return ChangeTrace(times, self.values[first:last], stop - start, self.width)
+
+
+# Builds a ChangeTrace from dense chunks arriving one after another (streaming simulation)
+class ChangeTraceBuilder:
+    def __init__(self, width=1):
+        self.width = width
+        self.times = []
+        self.values = []
+        self.length = 0
+        self.last_value = None
+
+    def append(self, chunk):
+        chunk = np.asarray(chunk)
+        if len(chunk) == 0:
+            return
+        starts, values = run_length(chunk)
+        if self.last_value is not None and values[0] == self.last_value:
+            starts, values = starts[1:], values[1:]
+        self.times.append(starts + self.length)
+        self.values.append(values)
+        self.length += len(chunk)
+        self.last_value = chunk[-1]
+
+    def build(self):
+        if not self.times:
+            return ChangeTrace([], [], 0, self.width)
+        return ChangeTrace(
+            np.concatenate(self.times),
+            np.concatenate(self.values),
+            self.length,
+            self.width,
+        )
+
+
+# A named set of change traces sharing one time base
+class TraceStore:
+    def __init__(self, traces=None):
+        self.traces = dict(traces or {})
+
+    def __getitem__(self, name):
+        return self.traces[name]
+
+    def __setitem__(self, name, trace):
+        self.traces[name] = trace
+
+    def __iter__(self):
+        return iter(self.traces)
+
+    def items(self):
+        return self.traces.items()
+
+    @property
+    def length(self):
+        return max((trace.length for trace in self.traces.values()), default=0)
+
+    # Function to build a store from dense signals, e.g. {"clock": clock, "Q0": Q0, ...}
+    @classmethod
+    def from_dense(cls, signals):
+        return cls(
+            {name: ChangeTrace.from_dense(signal) for name, signal in signals.items()}
+        )
+
+    # Function to save the store as a compressed .npz file
+    def save(self, path):
+        arrays = {}
+        for name, trace in self.traces.items():
+            arrays[f"{name}/times"] = trace.times
+            arrays[f"{name}/values"] = trace.values
+            arrays[f"{name}/shape"] = np.array(
+                [trace.length, trace.width], dtype=np.int64
+            )
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with np.load(path) as data:
+            names = sorted({key.rsplit("/", 1)[0] for key in data.files})
+            for name in names:
+                length, width = data[f"{name}/shape"]
+                store[name] = ChangeTrace(
+                    data[f"{name}/times"], data[f"{name}/values"], length, int(width)
+                )
+        return store
+
+
+# Function to make the short printable identifiers VCD uses for each signal
+def _vcd_identifier(index):
+    characters = string.ascii_letters + string.digits + "!#$%&'()*+,-./:;<=>?@[]^_`{|}~"
+    identifier = ""
+    while True:
+        identifier += characters[index % len(characters)]
+        index //= len(characters)
+        if index == 0:
+            return identifier
+
+
+def _vcd_value(value, width):
+    if width == 1:
+        return f"{int(value)}"
+    return f"b{int(value):b} "
+
+
+# Function to stream a trace store to a VCD file. Changes from every signal are merged in
+# time order without ever expanding a trace to dense samples.
+def write_vcd(store, f, timescale="1ns", module="top"):
+    names = list(store)
+    identifiers = {name: _vcd_identifier(i) for i, name in enumerate(names)}
+
+    f.write(f"$timescale {timescale} $end\n")
+    f.write(f"$scope module {module} $end\n")
+    for name in names:
+        kind = "wire" if store[name].width == 1 else "reg"
+        f.write(f"$var {kind} {store[name].width} {identifiers[name]} {name} $end\n")
+    f.write("$upscope $end\n$enddefinitions $end\n")
+
+    def changes(name):
+        trace = store[name]
+        for time, value in zip(trace.times.tolist(), trace.values.tolist()):
+            yield time, name, value
+
+    current_time = None
+    for time, name, value in heapq.merge(*(changes(name) for name in names)):
+        if time != current_time:
+            if current_time == 0:
+                f.write("$end\n")  # Closes the initial $dumpvars block
+            f.write(f"#{time}\n")
+            if time == 0:
+                f.write("$dumpvars\n")
+            current_time = time
+        f.write(f"{_vcd_value(value, store[name].width)}{identifiers[name]}\n")
+    if current_time == 0:
+        f.write("$end\n")
+    f.write(f"#{store.length}\n")
+
+
+# Function to stream the value changes out of a VCD file as (time, signal name, value)
+# tuples, after reading the signal declarations. Returns (declarations, changes) where
+# declarations maps each name to its width.
+def iter_vcd(f):
+    by_identifier = {}
+    declarations = {}
+    for line in f:
+        tokens = line.split()
+        if not tokens:
+            continue
+        if tokens[0] == "$var":
+            width, identifier, name = int(tokens[2]), tokens[3], tokens[4]
+            by_identifier[identifier] = name
+            declarations[name] = width
+        elif tokens[0] == "$enddefinitions":
+            break
+
+    def changes():
+        time = 0
+        for line in f:
+            token = line.strip()
+            if not token or token.startswith("$"):
+                continue
+            if token[0] == "#":
+                time = int(token[1:])
+                yield time, None, None  # Marks the end of the trace
+            elif token[0] in "bB":
+                value, identifier = token[1:].split()
+                yield time, by_identifier[identifier], int(
+                    value.replace("x", "0").replace("z", "0"), 2
+                )
+            elif token[0] in "01xXzZ":
+                yield time, by_identifier[token[1:]], 1 if token[0] == "1" else 0
+
+    return declarations, changes()
+
+
+# Function to read a VCD file into a trace store
+def read_vcd(f):
+    declarations, changes = iter_vcd(f)
+    times = {name: [] for name in declarations}
+    values = {name: [] for name in declarations}
+    end = 0
+    for time, name, value in changes:
+        end = max(end, time)
+        if name is None:
+            continue
+        if times[name] and times[name][-1] == time:
+            values[name][-1] = value  # Later change at the same time wins
+        elif not values[name] or values[name][-1] != value:
+            times[name].append(time)
+            values[name].append(value)
+
+    return TraceStore(
+        {
+            name: ChangeTrace(
+                times[name],
+                np.array(values[name], dtype=np.uint8 if width == 1 else np.uint64),
+                end,
+                width,
+            )
+            for name, width in declarations.items()
+        }
+    )
@@ -0,0 +1,253 @@
+import argparse
+import ast
+import re
+import struct
+from functools import reduce
+
+import numpy as np
+
+# Streaming truth-table export for wide gates and expressions.
+# Rows are produced in fixed-size NumPy blocks straight from the bits of a row counter
+# (the first input is the most significant bit, the same order as
+# itertools.product([0, 1], repeat=N)), evaluated a whole block at a time and written out
+# before the next block is built, so memory stays bounded at any input count.
+# Block sizes are rounded down to a power of two.
+#
+# Output formats:
+#   CSV: "Input 1,...,Input N,Output" header, then one 0/1 row per combination
+#   packed binary: header (magic b"EETT", version u16, input count u8) followed by the output
+#   bit of every row in row order, eight rows per byte (np.packbits, first row in the high bit).
+#   The inputs are implied by the row number, so 30 inputs take 128 MiB.
+
+DEFAULT_BLOCK_ROWS = 1 << 16
+PACKED_MAGIC = b"EETT"
+PACKED_VERSION = 1
+_PACKED_HEADER = struct.Struct("<4sHB")
+MAX_INPUTS = 64  # Rows are counted in uint64 (and the packed header stores the count in one byte)
+
+
+# Function to apply a gate of any type to a list of 0/1 input columns (any number of inputs)
+def gate_function(gate_type):
+    def AND(columns):
+        return reduce(np.bitwise_and, columns)
+
+    def OR(columns):
+        return reduce(np.bitwise_or, columns)
+
+    def XOR(columns):
+        return reduce(np.bitwise_xor, columns)
+
+    def single(columns):
+        if len(columns) != 1:
+            raise ValueError(
+                f"{gate_type} gates take exactly one input, got {len(columns)}"
+            )
+        return columns[0]
+
+    functions = {
+        "AND": AND,
+        "OR": OR,
+        "XOR": XOR,
+        "NAND": lambda columns: AND(columns) ^ 1,
+        "NOR": lambda columns: OR(columns) ^ 1,
+        "XNOR": lambda columns: XOR(columns) ^ 1,
+        "NOT": lambda columns: single(columns) ^ 1,
+        "BUFFER": single,
+    }
+    if gate_type not in functions:
+        raise ValueError(f"Unknown gate type: {gate_type}")
+    return functions[gate_type]
+
+
+# Operators allowed in expressions, applied to whole columns
+_BINARY_OPERATORS = {
+    ast.BitAnd: np.bitwise_and,
+    ast.BitOr: np.bitwise_or,
+    ast.BitXor: np.bitwise_xor,
+}
+
+
+# Function to turn one node of a parsed expression into a column function, refusing anything
+# but the bitwise operators, input names and the constants 0 and 1
+def _expression_node(node, expression):
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        operator = _BINARY_OPERATORS[type(node.op)]
+        left, right = _expression_node(node.left, expression), _expression_node(
+            node.right, expression
+        )
+        return lambda columns: operator(left(columns), right(columns))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert):
+        operand = _expression_node(node.operand, expression)
+        return lambda columns: np.invert(operand(columns))
+    if isinstance(node, ast.Name) and re.fullmatch(r"I[1-9][0-9]*", node.id):
+        position = int(node.id[1:]) - 1
+
+        def column(columns):
+            if position >= len(columns):
+                raise ValueError(
+                    f"{expression!r} uses {node.id} but there are only {len(columns)} inputs"
+                )
+            return columns[position]
+
+        return column
+    if (
+        isinstance(node, ast.Constant)
+        and type(node.value) is int
+        and node.value in (0, 1)
+    ):
+        return lambda columns: np.uint8(node.value)
+    raise ValueError(
+        f"{expression!r}: only & | ^ ~, parentheses, I1..IN and 0/1 are allowed"
+    )
+
+
+# Function to turn an expression over I1..IN (Python bitwise operators: & | ^ ~) into a
+# column function, e.g. "(I1 | I2) & ~I3". The expression is parsed, never evaluated as code.
+def expression_function(expression):
+    function = _expression_node(
+        ast.parse(expression, "<expression>", mode="eval").body, expression
+    )
+
+    def evaluate(columns):
+        return np.asarray(function(columns)) & 1
+
+    return evaluate
+
+
+# Function to generate the input bits of rows [start, stop), one row per combination
+def row_block(num_inputs, start, stop):
+    rows = np.arange(start, stop, dtype=np.uint64)
+    shifts = np.arange(num_inputs - 1, -1, -1, dtype=np.uint64)
+    return ((rows[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+# Function to reject input counts the row counter (and packed header) can't represent
+def check_num_inputs(num_inputs):
+    if not 1 <= num_inputs <= MAX_INPUTS:
+        raise ValueError(
+            f"Number of inputs must be between 1 and {MAX_INPUTS}, got {num_inputs}"
+        )
+
+
+# Function to stream (high input bits, low input columns, output bits) per block.
+# Blocks are a power of two long and aligned, so within a block the high inputs are
+# constants and the low inputs repeat the same pattern: the low columns are built once and
+# the function gets plain 0/1 scalars for the high inputs.
+def _iter_blocks(num_inputs, function, block_rows):
+    check_num_inputs(num_inputs)
+    low_bits = min(num_inputs, max(block_rows, 1).bit_length() - 1)
+    block_rows = 1 << low_bits
+    low = row_block(low_bits, 0, block_rows)
+    low_columns = list(low.T)
+    for start in range(0, 1 << num_inputs, block_rows):
+        high = [
+            np.uint8((start >> shift) & 1)
+            for shift in range(num_inputs - 1, low_bits - 1, -1)
+        ]
+        outputs = np.broadcast_to(function(high + low_columns), (block_rows,)).astype(
+            np.uint8
+        )
+        yield high, low, outputs
+
+
+# Function to stream a truth table as (input bits, output bits) blocks.
+# `function` takes a list of input columns (first input first) and returns the output column.
+def iter_truth_table(num_inputs, function, block_rows=DEFAULT_BLOCK_ROWS):
+    for high, low, outputs in _iter_blocks(num_inputs, function, block_rows):
+        inputs = np.empty((len(low), num_inputs), dtype=np.uint8)
+        inputs[:, : len(high)] = high
+        inputs[:, len(high) :] = low
+        yield inputs, outputs
+
+
+def csv_header(num_inputs):
+    return ",".join([f"Input {i + 1}" for i in range(num_inputs)] + ["Output"]) + "\n"
+
+
+# Function to format a block of 0/1 rows as CSV text in one vectorized pass
+def _csv_block(inputs, outputs):
+    table = np.column_stack((inputs, outputs))
+    text = np.full((table.shape[0], 2 * table.shape[1]), ord(","), dtype=np.uint8)
+    text[:, 0::2] = table + ord("0")
+    text[:, -1] = ord("\n")
+    return text.tobytes()
+
+
+# Function to write a truth table as CSV (f is a binary file)
+def write_csv(f, num_inputs, function, block_rows=DEFAULT_BLOCK_ROWS):
+    f.write(csv_header(num_inputs).encode())
+    for inputs, outputs in iter_truth_table(num_inputs, function, block_rows):
+        f.write(_csv_block(inputs, outputs))
+
+
+# Function to write just the output column, bit-packed (f is a binary file)
+def write_packed(f, num_inputs, function, block_rows=DEFAULT_BLOCK_ROWS):
+    check_num_inputs(num_inputs)
+    block_rows = max(8, block_rows)  # Blocks must pack into whole bytes
+    f.write(_PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, num_inputs))
+    for _, _, outputs in _iter_blocks(num_inputs, function, block_rows):
+        f.write(np.packbits(outputs).tobytes())
+
+
+# Function to open a packed truth table without reading it; returns (num_inputs, packed bytes)
+def open_packed(path):
+    with open(path, "rb") as f:
+        magic, version, num_inputs = _PACKED_HEADER.unpack(f.read(_PACKED_HEADER.size))
+    if magic != PACKED_MAGIC:
+        raise ValueError("Not a packed truth table file")
+    if version > PACKED_VERSION:
+        raise ValueError(
+            f"Truth table version {version} is newer than supported version {PACKED_VERSION}"
+        )
+    packed = np.memmap(path, dtype=np.uint8, mode="r", offset=_PACKED_HEADER.size)
+    return num_inputs, packed
+
+
+# Function to look up the output of one row of a packed truth table
+def packed_output(packed, row):
+    return (int(packed[row >> 3]) >> (7 - (row & 7))) & 1
+
+
+# Function to export a truth table; ".csv" paths get CSV, anything else the packed form
+def export_truth_table(path, num_inputs, function, block_rows=DEFAULT_BLOCK_ROWS):
+    with open(path, "wb") as f:
+        if path.endswith(".csv"):
+            write_csv(f, num_inputs, function, block_rows)
+        else:
+            write_packed(f, num_inputs, function, block_rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export the truth table of a wide gate or expression"
+    )
+    parser.add_argument("num_inputs", type=int)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--gate",
+        default="OR",
+        help="gate type (AND, OR, XOR, NAND, NOR, XNOR, NOT, BUFFER)",
+    )
+    group.add_argument("--expr", help='expression over I1..IN, e.g. "(I1 | I2) & ~I3"')
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help=".csv for CSV, anything else for packed binary",
+    )
+    parser.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS)
+    args = parser.parse_args(argv)
+    if not 1 <= args.num_inputs <= MAX_INPUTS:
+        parser.error(f"num_inputs must be between 1 and {MAX_INPUTS}")
+
+    function = (
+        expression_function(args.expr)
+        if args.expr
+        else gate_function(args.gate.upper())
+    )
+    export_truth_table(args.output, args.num_inputs, function, args.block_rows)
+    print(f"Wrote {1 << args.num_inputs} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from trace_store import ChangeTrace, run_length
+
+# Waveform viewer backend shared by the timing and gate scripts.
+# Signals are kept as transitions only (the x position where each new value starts), and
+# every redraw draws just the part inside the visible x-range, decimated to the screen:
+# when a pixel column holds more transitions than can be seen, it is drawn as one vertical
+# bar instead. Zooming or panning re-queries the transitions, so million-sample traces open
+# quickly and stay interactive.
+
+
+# One signal as run-length data plus the artists that draw it
+class _Trace:
+    def __init__(self, ax, times, values, end, line_kwargs):
+        self.ax = ax
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values)
+        self.end = end
+        (self.line,) = ax.plot([], [], drawstyle="steps-post", **line_kwargs)
+        self.bars = LineCollection(
+            [], colors=self.line.get_color(), linewidths=self.line.get_linewidth()
+        )
+        ax.add_collection(self.bars)
+
+    # Function to redraw only what is visible, at most a couple of points per pixel column
+    def refresh(self, x0, x1, columns):
+        times, values = self.times, self.values
+        if not len(times):
+            x0 = x1 = 0  # A signal with no samples draws nothing
+        else:
+            x0 = max(x0, times[0])
+            x1 = min(x1, self.end)
+        if x1 <= x0:
+            self.line.set_data([], [])
+            self.bars.set_segments([])
+            return
+
+        first = max(np.searchsorted(times, x0, side="right") - 1, 0)
+        last = np.searchsorted(times, x1, side="right")
+
+        if last - first <= 2 * columns:
+            # Few enough transitions to draw exactly
+            xs = np.concatenate(([x0], times[first + 1 : last], [x1]))
+            ys = np.concatenate((values[first:last], values[last - 1 : last]))
+            self.line.set_data(xs, ys)
+            self.bars.set_segments([])
+            return
+
+        # Decimate: one step per pixel column, plus a bar wherever a column hides transitions
+        edges = np.linspace(x0, x1, columns + 1)
+        at_column = np.searchsorted(times, edges, side="right") - 1
+        ys = values[at_column]
+        busy = np.flatnonzero(np.diff(at_column) > 1)
+        self.line.set_data(edges, ys)
+        low, high = values.min(), values.max()
+        centers = (edges[busy] + edges[busy + 1]) / 2
+        self.bars.set_segments([[(x, low), (x, high)] for x in centers])
+
+
+# A stack of waveform rows sharing one x axis
+class WaveformViewer:
+    def __init__(self, num_rows, figsize=None, xlabel=None):
+        figsize = figsize or (10, 2 * num_rows)
+        self.fig, axes = plt.subplots(
+            num_rows, 1, figsize=figsize, sharex=True, squeeze=False
+        )
+        self.axes = list(axes[:, 0])
+        self.traces = []
+        self.x_range = None
+        if xlabel:
+            self.axes[-1].set_xlabel(xlabel)
+        self.axes[0].callbacks.connect("xlim_changed", self._on_xlim_changed)
+        self.fig.canvas.mpl_connect("resize_event", lambda event: self.refresh())
+
+    # Function to add a signal to a row. `signal` is a dense array, a ChangeTrace, or a
+    # (starts, values) run-length pair covering `length` samples; `x` maps sample indices to
+    # x positions (for example a time axis).
+    def add_signal(
+        self, row, signal, x=None, title=None, ylabel=None, length=None, **line_kwargs
+    ):
+        ax = self.axes[row]
+        if isinstance(signal, ChangeTrace):
+            starts, values = signal.times, signal.values
+            length = signal.length
+        elif isinstance(signal, tuple):
+            starts, values = signal
+            length = length or (int(starts[-1]) + 1 if len(starts) else 0)
+        else:
+            starts, values = run_length(signal)
+            length = len(signal)
+
+        if x is None:
+            times, end = starts, length
+        else:
+            x = np.asarray(x)
+            times, end = x[starts], x[length - 1]
+
+        self.traces.append(_Trace(ax, times, values, end, line_kwargs))
+        start = float(times[0]) if len(times) else 0.0
+        if self.x_range is None:
+            self.x_range = [start, float(end)]
+        else:
+            self.x_range = [
+                min(self.x_range[0], start),
+                max(self.x_range[1], float(end)),
+            ]
+
+        ax.set_ylim([-0.5, 1.5])
+        ax.set_yticks([0, 1])
+        ax.grid(True)
+        if title:
+            ax.set_title(title)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        return ax
+
+    def _on_xlim_changed(self, ax):
+        self.refresh()
+
+    def refresh(self):
+        x0, x1 = self.axes[0].get_xlim()
+        for trace in self.traces:
+            columns = max(int(trace.ax.bbox.width), 1)
+            trace.refresh(x0, x1, columns)
+        self.fig.canvas.draw_idle()
+
+    def show(self):
+        if self.x_range is not None:
+            self.axes[0].set_xlim(self.x_range)
+        plt.tight_layout()
+        self.refresh()  # Layout changes the pixel width of every row
+        plt.show()
+
+
+# Function to create the timing diagram for a clock and its output signals
+def plot_timing_diagram(clock, signals, signal_names):
+    viewer = WaveformViewer(len(signals) + 1, xlabel="Time")
+
+    # Plot clock signal
+    viewer.add_signal(0, clock, ylabel="Clock", label="Clock", color="blue")
+
+    # Plot each output signal
+    for i, signal in enumerate(signals):
+        viewer.add_signal(
+            i + 1, signal, ylabel=signal_names[i], label=signal_names[i], color="green"
+        )
+
+    viewer.show()
+    return viewer
+
+
+# Function to plot every trace of a TraceStore (or the given names) on its own row
+def plot_trace_store(store, names=None):
+    names = list(names or store)
+    viewer = WaveformViewer(len(names), xlabel="Time")
+    for row, name in enumerate(names):
+        viewer.add_signal(
+            row,
+            store[name],
+            ylabel=name,
+            label=name,
+            color="blue" if row == 0 else "green",
+        )
+
+    viewer.show()
+    return viewer
@@ -0,0 +1,161 @@
+import pygame
+
+from circuit import SubcircuitPin
+from dirty_rects import polyline_rect
+
+# Connection layer for the designer.
+# Every wire is keyed by ("wire", source, target, pin), so a source wired twice into the same
+# component gets one wire per pin. Its route is computed once from the two pin positions and
+# cached in world coordinates, together with its bounding rect in the spatial index; it is
+# only recomputed when one of its components moves, changes its pins or is rewired.
+#
+# Wires are drawn under every component, from a screen-sized surface holding all the wires in
+# view on a white background. The surface is rendered once per camera position and then only
+# patched where wires were rerouted or removed, so redrawing a damaged region is one blit
+# instead of a pygame.draw.lines call per wire. Panning or zooming renders it afresh.
+#
+# Components provide output_pin() and input_pin(index) for the pin positions. The pins of a
+# subcircuit block are drawn as part of the block, so block-to-pin connections get no wire.
+
+WIRE_COLOR = (0, 0, 0)
+BACKGROUND_COLOR = (255, 255, 255)
+WIRE_WIDTH = 2
+STUB = 10  # How far a wire runs out of a pin before turning when it has to double back
+
+
+# Function to route a wire orthogonally from an output pin to an input pin: across to halfway,
+# then up or down, then across into the pin. When the input pin is behind the output pin the
+# wire leaves rightwards, crosses over halfway between the two pins and comes in from the left.
+def route(start, end):
+    (x0, y0), (x1, y1) = start, end
+    if y0 == y1 and x1 >= x0:
+        return [start, end]
+    if x1 - x0 >= 2 * STUB:
+        middle = (x0 + x1) // 2
+        return [start, (middle, y0), (middle, y1), end]
+    middle = (y0 + y1) // 2
+    return [
+        start,
+        (x0 + STUB, y0),
+        (x0 + STUB, middle),
+        (x1 - STUB, middle),
+        (x1 - STUB, y1),
+        end,
+    ]
+
+
+class WireLayer:
+    def __init__(self, index):
+        self.index = index
+        self.points = {}  # Wire key -> cached route
+        self.attached = {}  # Component -> keys of the wires into and out of it
+        self.surface = None  # Every wire in view, rendered for `view`
+        self.view = (
+            None  # (camera x, camera y, zoom, screen size) the surface was rendered for
+        )
+        self.stale = (
+            []
+        )  # World areas where wires changed since the surface was last patched
+
+    def __len__(self):
+        return len(self.points)
+
+    # Function to list the current wires into and out of a component, from its connections
+    def _wires_of(self, component):
+        keys = []
+        if not isinstance(component, SubcircuitPin):
+            keys = [
+                ("wire", source, component, pin)
+                for pin, source in enumerate(component.inputs)
+            ]
+        for target in dict.fromkeys(component.outputs):
+            if isinstance(target, SubcircuitPin):
+                continue
+            keys.extend(
+                ("wire", component, target, pin)
+                for pin, source in enumerate(target.inputs)
+                if source is component
+            )
+        return keys
+
+    def _add(self, key):
+        _, source, target, pin = key
+        points = route(source.output_pin(), target.input_pin(pin))
+        self.points[key] = points
+        # Stacked just above the source component
+        self.index.insert(
+            key, polyline_rect(points, WIRE_WIDTH), (self.index.order_of(source)[0], 1)
+        )
+        self.attached.setdefault(source, set()).add(key)
+        self.attached.setdefault(target, set()).add(key)
+
+    def _remove(self, key):
+        rect = self.index.rect_of(key)
+        self.index.remove(key)
+        del self.points[key]
+        for component in key[1:3]:
+            keys = self.attached.get(component)
+            if keys is not None:
+                keys.discard(key)
+        return rect
+
+    # Function to reroute every wire attached to a component after it moved, changed pins or
+    # was rewired. Returns the world areas to redraw (old and new routes).
+    def refresh(self, component):
+        damaged = [self._remove(key) for key in list(self.attached.get(component, ()))]
+        for key in self._wires_of(component):
+            self._add(key)
+            damaged.append(self.index.rect_of(key))
+        self.stale.extend(damaged)
+        return damaged
+
+    # Function to drop every wire attached to a component that is about to be deleted.
+    # Returns the world areas they covered.
+    def remove_component(self, component):
+        damaged = [self._remove(key) for key in list(self.attached.get(component, ()))]
+        self.attached.pop(component, None)
+        self.stale.extend(damaged)
+        return damaged
+
+    # Function to get the world areas of the wires attached to a component
+    def rects_of(self, component):
+        return [self.index.rect_of(key) for key in self.attached.get(component, ())]
+
+    # Function to render the wires crossing a screen area of the cached surface
+    def _render(self, area, camera):
+        surface = self.surface
+        surface.set_clip(area)
+        surface.fill(BACKGROUND_COLOR)
+        # Camera transform inlined: zoomed out, thousands of wires are drawn per frame
+        left, top, zoom = camera.x, camera.y, camera.zoom
+        width = WIRE_WIDTH if camera.detailed else 1
+        for key in self.index.query_rect(camera.to_world_rect(area)):
+            if isinstance(key, tuple):
+                points = [
+                    ((x - left) * zoom, (y - top) * zoom) for x, y in self.points[key]
+                ]
+                pygame.draw.lines(surface, WIRE_COLOR, False, points, width)
+        surface.set_clip(None)
+
+    # Function to paint the wire layer into the given screen regions, replacing whatever was
+    # there (it doubles as the background fill)
+    def draw(self, screen, regions, camera):
+        size = screen.get_size()
+        view = (camera.x, camera.y, camera.zoom, size)
+        if view != self.view:
+            if self.surface is None or self.surface.get_size() != size:
+                self.surface = pygame.Surface(size)
+            self.view = view
+            self.stale = []
+            self._render(self.surface.get_rect(), camera)
+        elif self.stale:
+            bounds = self.surface.get_rect()
+            for rect in self.stale:
+                area = (
+                    camera.to_screen_rect(pygame.Rect(rect)).inflate(2, 2).clip(bounds)
+                )
+                if area.width and area.height:
+                    self._render(area, camera)
+            self.stale = []
+        for region in regions:
+            screen.blit(self.surface, region, region)